@@ -18,6 +18,8 @@ load_dotenv()
 
 # Import security utilities
 from api.utils.security import setup_rate_limiting, require_api_key, is_public_endpoint
+from api.utils.json_provider import init_json_provider
+from api.utils.compression import init_compression
 
 # Import all blueprints
 from api.routes.health import health_bp
@@ -28,6 +30,9 @@ from api.routes.admin import admin_bp
 # Setup Flask app with production configuration
 app = Flask(__name__)
 
+# Faster JSON encoding (orjson when installed, stdlib json otherwise)
+init_json_provider(app)
+
 # Production CORS configuration
 cors_origins = os.getenv('CORS_ORIGINS', '*')
 if cors_origins != '*':
@@ -109,6 +114,9 @@ logging.basicConfig(
 # Setup rate limiting
 limiter = setup_rate_limiting(app)
 
+# gzip/br response compression negotiated from Accept-Encoding
+init_compression(app)
+
 # Daftarkan blueprint
 app.register_blueprint(health_bp)
 app.register_blueprint(permits_bp)
@@ -192,12 +200,16 @@ def home():
             '/permits/active': 'Get active permits only',
             '/permits/company/<company_name>': 'Get permits for specific company',
             '/permits/type/<permit_type>': 'Get permits by type',
+            '/permits/export': 'Stream all permits (format=ndjson|csv|parquet)',
             '/global/emissions': 'EPA emissions (filters: state, year, pollutant, page, limit)',
             '/global/emissions/stats': 'EPA emissions statistics',
+            '/global/emissions/export': 'Stream EPA emissions (format=ndjson|csv|parquet; filters: state, year, pollutant)',
             '/global/iso': 'ISO 14001 certifications (filters: country, limit)',
-            '/global/eea': 'EEA indicators (filters: country, indicator, year, limit)',
-            '/global/cevs/<company_name>': 'Compute CEVS score for a company (filters: country)',
-            '/global/edgar': 'EDGAR series+trend (params: country, pollutant=PM2.5, window=3)'
+            '/global/iso/export': 'Stream ISO 14001 certifications (format=ndjson|csv|parquet; filter: country)',
+            '/global/eea': 'EEA indicators (filters: country, indicator, year, limit; format=json|arrow|parquet)',
+            '/global/cevs/<company_name>': 'Compute CEVS score for a company (filters: country; detail=none|summary|full)',
+            '/global/edgar': 'EDGAR series+trend (params: country, pollutant=PM2.5, window=3, format=json|arrow|parquet)',
+            '/global/edgar/batch': 'EDGAR series+trend for many countries (params: countries, pollutants=PM2.5, window=3)'
         },
         'usage_examples': {
             'get_all_permits': '/permits',
@@ -229,12 +241,16 @@ def not_found(error):
             '/permits/company/<company_name>',
             '/permits/type/<permit_type>',
             '/permits/stats'
+            , '/permits/export'
             , '/global/emissions'
             , '/global/emissions/stats'
+            , '/global/emissions/export'
             , '/global/iso'
+            , '/global/iso/export'
             , '/global/eea'
             , '/global/cevs/<company_name>'
             , '/global/edgar'
+            , '/global/edgar/batch'
         ]
     }), 404
 
@@ -263,5 +279,8 @@ if __name__ == '__main__':
     print("  GET  /permits/type/<type>  - Get permits by type")
     print("  GET  /permits/stats        - Get permit statistics")
     print("="*60)
+
+    from api.services.dataset_scheduler import start_dataset_scheduler
+    start_dataset_scheduler()
     
     app.run(host='0.0.0.0', port=port, debug=debug_mode)
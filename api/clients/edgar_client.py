@@ -8,6 +8,7 @@ from functools import lru_cache
 from openpyxl import load_workbook  # type: ignore
 
 from api.utils.mappings import normalize_country_name
+from api.utils.trend import DEFAULT_WINDOW, compute_trends, empty_trend
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,8 @@ class EDGARClient:
       - Granularity is urban; totals reflect urban emissions only.
     """
 
-    # Global cache shared across instances: key -> {agg_by_country, header, colmap, country_col_idx}
+    # Global cache shared across instances:
+    # key -> {agg_by_country, series_by_country, trends_by_country, header, colmap, country_col_idx}
     _GLOBAL_CACHE: Dict[str, Dict[str, Any]] = {}
 
     def __init__(self, xlsx_path: Optional[str] = None) -> None:
@@ -39,6 +41,10 @@ class EDGARClient:
         self._colmap: Optional[Dict[Tuple[str, int], List[int]]] = None
         self._country_col_idx: Optional[int] = None
         self._agg_by_country: Optional[Dict[str, Dict[str, Dict[int, float]]]] = None
+        # country -> pollutant -> (years, values), sorted ascending by year once per aggregation
+        self._series_by_country: Optional[Dict[str, Dict[str, Tuple[List[int], List[float]]]]] = None
+        # country -> pollutant -> trend dict for DEFAULT_WINDOW, precomputed per aggregation
+        self._trends_by_country: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
 
     # ---- Internal helpers ----
     def _cache_key(self) -> str:
@@ -102,6 +108,8 @@ class EDGARClient:
         cached = self._GLOBAL_CACHE.get(key)
         if cached is not None:
             self._agg_by_country = cached.get("agg_by_country")
+            self._series_by_country = cached.get("series_by_country")
+            self._trends_by_country = cached.get("trends_by_country")
             self._header = cached.get("header")
             self._colmap = cached.get("colmap")
             self._country_col_idx = cached.get("country_col_idx")
@@ -153,9 +161,13 @@ class EDGARClient:
                         polmap[year] = polmap.get(year, 0.0) + total
 
             self._agg_by_country = agg
+            self._series_by_country = self._build_sorted_series(agg)
+            self._trends_by_country = self._precompute_trends(self._series_by_country, DEFAULT_WINDOW)
             # Save to global cache
             self._GLOBAL_CACHE[key] = {
                 "agg_by_country": self._agg_by_country,
+                "series_by_country": self._series_by_country,
+                "trends_by_country": self._trends_by_country,
                 "header": self._header,
                 "colmap": self._colmap,
                 "country_col_idx": self._country_col_idx,
@@ -166,7 +178,66 @@ class EDGARClient:
             except Exception:
                 pass
 
+    @staticmethod
+    def _build_sorted_series(
+        agg: Dict[str, Dict[str, Dict[int, float]]]
+    ) -> Dict[str, Dict[str, Tuple[List[int], List[float]]]]:
+        """Convert {country: {pollutant: {year: value}}} into year-sorted parallel arrays."""
+        out: Dict[str, Dict[str, Tuple[List[int], List[float]]]] = {}
+        for country, polmap in agg.items():
+            per_pol: Dict[str, Tuple[List[int], List[float]]] = {}
+            for pollutant, yearmap in polmap.items():
+                years = sorted(int(y) for y in yearmap.keys())
+                per_pol[pollutant] = (years, [float(yearmap[y]) for y in years])
+            out[country] = per_pol
+        return out
+
+    def _sorted_series(self, normalized_country: str, pollutant: str) -> Tuple[List[int], List[float]]:
+        """Return pre-sorted (years, values) for an already normalized country key."""
+        self._ensure_aggregated()
+        by_pol = (self._series_by_country or {}).get(normalized_country) or {}
+        return by_pol.get(pollutant) or ([], [])
+
+    @staticmethod
+    def _precompute_trends(
+        series_by_country: Dict[str, Dict[str, Tuple[List[int], List[float]]]], window: int
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Vectorized trend pass over every (country, pollutant) series."""
+        keys = [(c, p) for c, per_pol in series_by_country.items() for p in per_pol]
+        trends = compute_trends([series_by_country[c][p] for c, p in keys], window=window)
+        out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (c, p), tr in zip(keys, trends):
+            out.setdefault(c, {})[p] = tr
+        return out
+
+    def _trends_for(self, pairs: List[Tuple[Optional[str], str]], window: int) -> List[Dict[str, Any]]:
+        """Trends for (normalized_country, pollutant) pairs; precomputed when window is the default."""
+        self._ensure_aggregated()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+        missing: List[int] = []
+        for i, (country, pollutant) in enumerate(pairs):
+            if not country:
+                results[i] = empty_trend()
+            elif window == DEFAULT_WINDOW:
+                results[i] = ((self._trends_by_country or {}).get(country) or {}).get(pollutant) or empty_trend()
+            else:
+                missing.append(i)
+        if missing:
+            computed = compute_trends([self._sorted_series(*pairs[i]) for i in missing], window=window)
+            for i, tr in zip(missing, computed):
+                results[i] = tr
+        return [dict(tr, pollutant=pollutant) for tr, (_, pollutant) in zip(results, pairs)]
+
     # ---- Public API ----
+    def version(self) -> str:
+        """Version token of the workbook (path + mtime); changes when the file is replaced."""
+        return self._cache_key()
+
+    def warm(self) -> str:
+        """Aggregate the workbook into the shared cache (scheduler prefetch) and return its version."""
+        self._ensure_aggregated()
+        return self.version()
+
     def get_country_series(self, country: str, pollutant: str) -> List[Dict[str, Any]]:
         """Return sorted series for a country and pollutant: [{year, value}]."""
         if not country:
@@ -176,38 +247,66 @@ class EDGARClient:
         normalized_country = normalize_country_name(country)
         if not normalized_country:
             return []
-            
+
+        years, values = self._sorted_series(normalized_country, pollutant)
+        return [{"year": y, "value": v} for y, v in zip(years, values)]
+
+    def get_country_series_columns(self, country: str, pollutant: str) -> Tuple[List[int], List[float]]:
+        """Same series as get_country_series, as (years, values) columns."""
+        normalized_country = normalize_country_name(country) if country else None
+        if not normalized_country:
+            return [], []
+        return self._sorted_series(normalized_country, pollutant)
+
+    def get_series_batch(
+        self,
+        countries: List[str],
+        pollutants: List[str],
+        *,
+        window: Optional[int] = None,
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Return pre-sorted series for many countries and pollutants in one pass.
+
+        Output is keyed by the country string as given by the caller:
+          {country: {pollutant: {"years": [...], "values": [...]}}}
+        When `window` is given, each entry also carries a "trend" dict in the same
+        shape as `compute_country_trend`.
+        """
         self._ensure_aggregated()
-        series: List[Dict[str, Any]] = []
-        agg = self._agg_by_country or {}
-        data = (agg.get(normalized_country) or {}).get(pollutant) or {}
-        for y, v in data.items():
-            series.append({"year": int(y), "value": float(v)})
-        series.sort(key=lambda r: r["year"])  # ascending
-        return series
-
-    def compute_country_trend(self, country: str, pollutant: str = "PM2.5", window: int = 3) -> Dict[str, Any]:
-        """Compute simple trend over the last `window` points for a pollutant.
-
-        Returns {"pollutant": pollutant, "slope": float, "increase": bool, "years": [..]}
+        out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        pairs: List[Tuple[Optional[str], str]] = []
+        entries: List[Dict[str, Any]] = []
+        for country in countries:
+            if not country or country in out:
+                continue
+            normalized_country = normalize_country_name(country)
+            per_pol: Dict[str, Dict[str, Any]] = {}
+            for pollutant in pollutants:
+                years, values = self._sorted_series(normalized_country, pollutant) if normalized_country else ([], [])
+                entry: Dict[str, Any] = {"years": list(years), "values": list(values)}
+                per_pol[pollutant] = entry
+                pairs.append((normalized_country, pollutant))
+                entries.append(entry)
+            out[country] = per_pol
+        if window is not None:
+            for entry, tr in zip(entries, self._trends_for(pairs, window)):
+                entry["trend"] = tr
+        return out
+
+    def compute_country_trend(self, country: str, pollutant: str = "PM2.5", window: int = DEFAULT_WINDOW) -> Dict[str, Any]:
+        """Trend over the last `window` points for a pollutant (see api.utils.trend).
+
+        Returns {"pollutant", "slope" (OLS, per year), "delta", "pct_change", "cagr", "r2",
+        "increase", "years"}; trends for the default window are precomputed at aggregation.
         """
-        series = self.get_country_series(country, pollutant)
-        if len(series) < 2:
-            return {"pollutant": pollutant, "slope": 0.0, "increase": False, "years": []}
-        sel = series[-window:] if len(series) >= window else series
-        slope = float(sel[-1]["value"] - sel[0]["value"])  # simple delta
-        return {
-            "pollutant": pollutant,
-            "slope": slope,
-            "increase": slope > 0.0,
-            "years": [r["year"] for r in sel],
-        }
+        normalized_country = normalize_country_name(country) if country else None
+        return self._trends_for([(normalized_country, pollutant)], window)[0]
 
     # Backward/explicit helper name requested in requirements
-    def get_country_emissions_trend(self, country: str, pollutant: str = "PM2.5", window: int = 3) -> Dict[str, Any]:
+    def get_country_emissions_trend(self, country: str, pollutant: str = "PM2.5", window: int = DEFAULT_WINDOW) -> Dict[str, Any]:
         """Alias helper returning trend dict for country and pollutant.
 
-        Example output: {"pollutant": "PM2.5", "slope": 12.3, "increase": True, "years": [2015, 2020, 2022]}
+        Example output: {"pollutant": "PM2.5", "slope": 6.1, "delta": 12.3, "increase": True, "years": [2015, 2020, 2022], ...}
         """
         return self.compute_country_trend(country, pollutant=pollutant, window=window)
 
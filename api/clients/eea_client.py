@@ -1,20 +1,56 @@
 from __future__ import annotations
 
 import os
+import json
 import logging
-from typing import Any, Dict, List, Optional
-import io
+import tempfile
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 import requests
 import pandas as pd
-from functools import lru_cache
+import pyarrow.parquet as pq
 
+from api.utils.dataset_cache import dataset_cache, file_version
 from api.utils.mappings import normalize_country_name
+from api.utils.trend import DEFAULT_WINDOW, compute_trends
 
-# Pastikan Anda telah menambahkan 'pyarrow' ke requirements.txt
-# pip install pyarrow
+# Membutuhkan 'pyarrow' (lihat requirements.txt) untuk pembacaan memory-mapped
 
 logger = logging.getLogger(__name__)
 
+# Dataset EEA hanya berubah beberapa kali per tahun; setelah TTL ini kita hanya
+# melakukan permintaan kondisional (ETag/Last-Modified) ke server
+EEA_CACHE_TTL = int(os.getenv("EEA_CACHE_TTL", "86400"))
+
+# Salinan lokal file Parquet + metadata (dibuat juga oleh run_server.py)
+DEFAULT_EEA_DATA_DIR = os.path.join(os.getcwd(), "data", "eea")
+RENEWABLES_DATASET = "share-of-energy-from-renewable-sources"
+POLLUTION_DATASET = "industrial-releases-of-pollutants-to-water"
+DATASET_DIRS: Dict[str, str] = {
+    RENEWABLES_DATASET: "renewable-energy",
+    POLLUTION_DATASET: "pollution",
+}
+
+# Proyeksi kolom (nama sudah dinormalisasi) yang benar-benar dipakai per dataset
+RENEWABLES_COLUMNS = ["country", "renewable_energy_share_2020", "renewable_energy_share_2021_(proxy)", "2020_target"]
+POLLUTION_COLUMNS = ["year", "country", "cd_hg_ni_pb", "toc", "total_n", "total_p", "gva"]
+
+# Kolom keluaran publik (kolom berawalan "_" bersifat internal dan tidak diserialisasi)
+RENEWABLES_OUTPUT = ["country", "renewable_energy_share_2020", "renewable_energy_share_2021_proxy", "target_2020"]
+POLLUTION_OUTPUT = ["year", "cd_hg_ni_pb", "toc", "total_n", "total_p", "gva"]
+
+# Label baris agregat EU-27 pada dataset renewables
+EU_AGGREGATE_LABELS = ("eu-27", "eu27", "eu 27", "eu")
+
+
+class RenewablesData(NamedTuple):
+    """Dataset renewables yang disiapkan sekali per versi file."""
+    frame: pd.DataFrame
+    by_country: Dict[str, Dict[str, Any]]  # negara kanonik -> baris pertama
+    eu_row: Optional[Dict[str, Any]]
+
+
+_EMPTY_RENEWABLES = RenewablesData(pd.DataFrame(columns=RENEWABLES_OUTPUT + ["_country_norm"]), {}, None)
+
 class EEAClient:
     """
     Klien untuk berinteraksi dengan EEA Downloads API (Parquet).
@@ -22,196 +58,356 @@ class EEAClient:
     """
     BASE_URL = "https://eeadmz1-downloads-api-appservice.azurewebsites.net/api/v1/public"
 
-    def __init__(self) -> None:
+    def __init__(self, data_dir: Optional[str] = None) -> None:
+        self.data_dir = data_dir or os.getenv("EEA_DATA_DIR") or DEFAULT_EEA_DATA_DIR
         self.session = requests.Session()
         self.session.headers.update({
             "Accept": "application/json, application/octet-stream",
             "User-Agent": f"project-permit-api/1.0 (+{os.getenv('GITHUB_REPO_URL', 'https://github.com/hk-dev13')})"
         })
 
-    @lru_cache(maxsize=10) # Cache sederhana untuk menghindari pengunduhan berulang
-    def _get_parquet_data(self, dataset_id: str) -> List[Dict[str, Any]]:
+    def _get_dataset(self, dataset_id: str, columns: Optional[List[str]] = None,
+                     prepare: Optional[Callable[[pd.DataFrame], Any]] = None) -> Any:
         """
-        Menemukan, mengunduh, dan mengurai dataset Parquet dari EEA API.
-        Ini menerapkan alur kerja 2 langkah:
-        1. Dapatkan metadata file untuk menemukan URL unduhan.
-        2. Unduh dan baca file Parquet.
+        Mengambil dataset Parquet EEA dalam bentuk kolumnar (DataFrame) melalui cache dataset
+        bersama (lintas instance/request). `prepare` dijalankan sekali per versi file untuk
+        menyiapkan kolom siap-saji (mis. negara ternormalisasi, tahun) atau indeks turunan.
+        Mengembalikan None bila dataset tidak tersedia.
+        Sinkronisasi ke server dilakukan paling sering sekali per EEA_CACHE_TTL; hasil parse
+        di-cache per versi file (ETag/Last-Modified) sehingga 304 tidak memicu parse ulang.
+        Kegagalan tidak di-cache sehingga request berikutnya akan mencoba lagi.
+        DataFrame yang dikembalikan dibagi bersama dan tidak boleh dimodifikasi.
         """
+        try:
+            path, version = dataset_cache.get_or_load(
+                self._sync_key(dataset_id),
+                lambda: self._sync_parquet(dataset_id),
+                ttl=EEA_CACHE_TTL,
+            )
+
+            def load() -> Any:
+                df = self._read_parquet(path, columns)
+                return prepare(df) if prepare else df
+
+            return dataset_cache.get_or_load(
+                ("eea", os.path.abspath(self.data_dir), dataset_id, tuple(columns) if columns else None),
+                load,
+                version=version,
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Kesalahan jaringan saat mengambil data EEA untuk {dataset_id}: {e}")
+        except Exception as e:
+            logger.error(f"Kesalahan saat memproses data Parquet untuk {dataset_id}: {e}")
+        return None
+
+    # ---- Penyimpanan lokal + metadata ----
+    def _sync_key(self, dataset_id: str) -> Tuple[str, str, str]:
+        """Kunci cache status sinkronisasi; per direktori data agar salinan lokal tidak tertukar."""
+        return ("eea:sync", os.path.abspath(self.data_dir), dataset_id)
+
+    def _local_paths(self, dataset_id: str) -> Tuple[str, str]:
+        folder = os.path.join(self.data_dir, DATASET_DIRS.get(dataset_id, dataset_id))
+        return os.path.join(folder, f"{dataset_id}.parquet"), os.path.join(folder, f"{dataset_id}.meta.json")
+
+    @staticmethod
+    def _load_meta(meta_path: str) -> Dict[str, Any]:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            return meta if isinstance(meta, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_meta(meta_path: str, meta: Dict[str, Any]) -> None:
+        # File sementara unik per penulis: proses/thread lain tidak saling menimpa
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(meta_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(meta, fh, indent=2, sort_keys=True)
+            os.replace(tmp, meta_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _sync_parquet(self, dataset_id: str) -> Tuple[str, str]:
+        """
+        Memastikan salinan lokal Parquet terbaru tersedia dan mengembalikan (path, versi).
+        Alur kerja:
+        1. Dapatkan metadata file untuk menemukan URL unduhan (fallback ke metadata tersimpan).
+        2. Unduh secara kondisional (If-None-Match / If-Modified-Since); 304 memakai salinan lokal.
+        """
+        parquet_path, meta_path = self._local_paths(dataset_id)
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        meta = self._load_meta(meta_path)
+        have_local = os.path.exists(parquet_path)
+
+        # Langkah 1: Dapatkan URL unduhan
         logger.info(f"Mencari file untuk dataset EEA: {dataset_id}")
         files_url = f"{self.BASE_URL}/datasets/{dataset_id}/files"
-        
         try:
-            # Langkah 1: Dapatkan URL unduhan
             resp_files = self.session.get(files_url, timeout=30)
             resp_files.raise_for_status()
             files_metadata = resp_files.json()
-            
             # Cari file Parquet pertama yang tersedia
-            download_url = next((f['links']['download'] for f in files_metadata if f['name'].endswith('.parquet')), None)
-
-            if not download_url:
-                logger.error(f"Tidak ada file Parquet yang ditemukan untuk dataset {dataset_id}")
-                return []
-
-            # Langkah 2: Unduh dan baca file Parquet
-            logger.info(f"Mengunduh data Parquet dari: {download_url}")
-            resp_data = self.session.get(download_url, timeout=90) # Timeout lebih lama untuk unduhan
-            resp_data.raise_for_status()
-            
-            # Gunakan pandas untuk membaca konten biner
-            df = pd.read_parquet(io.BytesIO(resp_data.content))
-            
-            # Bersihkan nama kolom untuk konsistensi (opsional tapi disarankan)
-            df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
-            
-            return df.to_dict(orient="records")
+            file_meta = next((f for f in files_metadata if f['name'].endswith('.parquet')), None)
+            if not file_meta:
+                raise ValueError(f"Tidak ada file Parquet yang ditemukan untuk dataset {dataset_id}")
+            if file_meta['links']['download'] != meta.get("download_url"):
+                # File berganti: validator lama tidak berlaku
+                meta.pop("etag", None)
+                meta.pop("last_modified", None)
+            meta["file"] = file_meta
+            meta["download_url"] = file_meta['links']['download']
+        except requests.exceptions.RequestException as e:
+            if not (have_local and meta.get("download_url")):
+                raise
+            logger.warning(f"Metadata EEA {dataset_id} tidak tersedia ({e}), memakai metadata tersimpan")
 
+        # Langkah 2: Unduhan kondisional
+        headers: Dict[str, str] = {}
+        if have_local:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        download_url = meta["download_url"]
+        try:
+            resp_data = self.session.get(download_url, headers=headers, timeout=90, stream=True) # Timeout lebih lama untuk unduhan
+            if resp_data.status_code == 304 and have_local:
+                logger.info(f"Dataset EEA {dataset_id} tidak berubah (304), memakai salinan lokal")
+                resp_data.close()
+            else:
+                resp_data.raise_for_status()
+                logger.info(f"Mengunduh data Parquet dari: {download_url}")
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(parquet_path), suffix=".part")
+                try:
+                    with os.fdopen(fd, "wb") as fh:
+                        for chunk in resp_data.iter_content(chunk_size=1 << 20):
+                            if chunk:
+                                fh.write(chunk)
+                    os.replace(tmp_path, parquet_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                meta["etag"] = resp_data.headers.get("ETag")
+                meta["last_modified"] = resp_data.headers.get("Last-Modified")
         except requests.exceptions.RequestException as e:
-            logger.error(f"Kesalahan jaringan saat mengambil data EEA untuk {dataset_id}: {e}")
-        except Exception as e:
-            logger.error(f"Kesalahan saat memproses data Parquet untuk {dataset_id}: {e}")
-        
-        return []
+            if not have_local:
+                raise
+            logger.warning(f"Unduhan EEA {dataset_id} gagal ({e}), memakai salinan lokal")
+
+        self._save_meta(meta_path, meta)
+        version = meta.get("etag") or meta.get("last_modified") or file_version(parquet_path) or ""
+        return parquet_path, version
 
-    def get_countries_renewables(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _normalize_column(col: str) -> str:
+        return col.strip().lower().replace(' ', '_')
+
+    @classmethod
+    def _read_parquet(cls, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
-        Mengambil dan menormalkan data pangsa energi terbarukan per negara.
+        Membaca file Parquet lokal lewat memory-map pyarrow menjadi DataFrame dengan nama
+        kolom ternormalisasi. Jika `columns` diberikan (nama kolom ternormalisasi), hanya
+        kolom tersebut yang dimaterialisasi.
         """
+        selected = None
+        if columns:
+            wanted = set(columns)
+            schema = pq.read_schema(path, memory_map=True)
+            selected = [name for name in schema.names if cls._normalize_column(name) in wanted]
+        table = pq.read_table(path, columns=selected, memory_map=True)
+
+        # Bersihkan nama kolom untuk konsistensi
+        table = table.rename_columns([cls._normalize_column(c) for c in table.column_names])
+        return table.to_pandas()
+
+    # ---- Persiapan kolumnar (sekali per versi dataset) ----
+    @staticmethod
+    def _normalized_country_column(values: pd.Series) -> pd.Series:
+        """Normalisasi negara sekali per nilai unik, bukan per baris."""
+        lookup = {v: normalize_country_name(str(v)) for v in values.dropna().unique()}
+        return values.map(lookup)
+
+    @classmethod
+    def _prepare_renewables(cls, df: pd.DataFrame) -> pd.DataFrame:
+        if "country" not in df.columns:
+            return pd.DataFrame(columns=RENEWABLES_OUTPUT + ["_country_norm"])
+        df = df[df["country"].notna() & (df["country"].astype(str) != "")]
+        out = pd.DataFrame({
+            "country": df["country"],
+            "renewable_energy_share_2020": df.get("renewable_energy_share_2020"),
+            "renewable_energy_share_2021_proxy": df.get("renewable_energy_share_2021_(proxy)"), # Sesuaikan dengan nama kolom yang sebenarnya
+            "target_2020": df.get("2020_target"),
+        }, index=df.index, columns=RENEWABLES_OUTPUT)
+        out["_country_norm"] = cls._normalized_country_column(out["country"])
+        return out.reset_index(drop=True)
+
+    @classmethod
+    def _prepare_renewables_index(cls, df: pd.DataFrame) -> RenewablesData:
+        """Frame + indeks negara kanonik + baris agregat EU, dibangun sekali per versi."""
+        frame = cls._prepare_renewables(df)
+        by_country: Dict[str, Dict[str, Any]] = {}
+        eu_row: Optional[Dict[str, Any]] = None
+        for key, record in zip(frame["_country_norm"].tolist(), cls._records(frame)):
+            if key is not None and key not in by_country:
+                by_country[key] = record
+            if eu_row is None and str(record.get("country") or "").strip().lower() in EU_AGGREGATE_LABELS:
+                eu_row = record
+        return RenewablesData(frame, by_country, eu_row)
+
+    @classmethod
+    def _prepare_pollution(cls, df: pd.DataFrame) -> pd.DataFrame:
+        if "year" not in df.columns:
+            return pd.DataFrame(columns=POLLUTION_OUTPUT + ["_country_norm"])
+        years = pd.to_numeric(df["year"], errors="coerce")
+        keep = years.notna() & (years != 0)
+        df = df[keep]
+        out = pd.DataFrame({"year": years[keep].astype(int)}, index=df.index)
+        for col in POLLUTION_OUTPUT[1:]:
+            out[col] = pd.to_numeric(df[col], errors="coerce") if col in df.columns else float("nan")
+        out["_country_norm"] = cls._normalized_country_column(df["country"]) if "country" in df.columns else None
+        # Sort by year
+        return out.sort_values("year", kind="mergesort").reset_index(drop=True)
+
+    @staticmethod
+    def _records(df: pd.DataFrame, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Konversi hanya baris hasil ke list of dict; kolom internal (_*) dibuang, NaN -> None."""
+        if df is None or df.empty:
+            return []
+        if limit is not None:
+            df = df.head(limit)
+        cols = [c for c in df.columns if not str(c).startswith("_")]
+        view = df[cols]
+        return view.astype(object).where(view.notna(), None).to_dict(orient="records")
+
+    def _renewables(self) -> RenewablesData:
         # ID ini harus diverifikasi dari API, ini adalah contoh
-        dataset_id = "share-of-energy-from-renewable-sources" 
-        raw_data = self._get_parquet_data(dataset_id)
-        
-        normalized_data = []
-        for record in raw_data:
-            # Kolom di-lowercase dan underscore oleh _get_parquet_data
-            country = record.get("country")
-            if not country:
-                continue
-
-            normalized_data.append({
-                "country": country,
-                "renewable_energy_share_2020": record.get("renewable_energy_share_2020"),
-                "renewable_energy_share_2021_proxy": record.get("renewable_energy_share_2021_(proxy)"), # Sesuaikan dengan nama kolom yang sebenarnya
-                "target_2020": record.get("2020_target"),
-            })
-        return normalized_data
+        data = self._get_dataset(RENEWABLES_DATASET, RENEWABLES_COLUMNS, self._prepare_renewables_index)
+        return data if data is not None else _EMPTY_RENEWABLES
+
+    def _pollution_frame(self) -> pd.DataFrame:
+        # ID ini harus diverifikasi dari API, ini adalah contoh
+        df = self._get_dataset(POLLUTION_DATASET, POLLUTION_COLUMNS, self._prepare_pollution)
+        return df if df is not None else pd.DataFrame()
+
+    def warm(self, dataset_id: str, *, revalidate: bool = False) -> Optional[str]:
+        """
+        Memuat dataset ke cache bersama (dipakai scheduler prefetch) dan mengembalikan versinya.
+        revalidate=True memaksa permintaan kondisional ke server walau TTL belum habis.
+        """
+        loaders = {RENEWABLES_DATASET: lambda: self._renewables().frame, POLLUTION_DATASET: self._pollution_frame}
+        if revalidate:
+            dataset_cache.invalidate(self._sync_key(dataset_id))
+        if loaders[dataset_id]().empty:
+            raise RuntimeError(f"Dataset EEA {dataset_id} tidak tersedia")
+        synced = dataset_cache.get(self._sync_key(dataset_id))
+        return synced[1] if synced else None
+
+    def get_countries_renewables(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Mengambil dan menormalkan data pangsa energi terbarukan per negara.
+        """
+        return self._records(self._renewables().frame, limit)
 
     def get_country_renewables(self, country: Optional[str]) -> Optional[Dict[str, Any]]:
         """
-        Mengambil data energi terbarukan untuk negara tertentu.
+        Mengambil data energi terbarukan untuk negara tertentu (lookup indeks negara kanonik).
         """
         if not country:
             return None
-        
-        all_countries = self.get_countries_renewables()
-        normalized_country = normalize_country_name(country)
-        
-        for record in all_countries:
-            if normalize_country_name(record.get("country", "")) == normalized_country:
-                return record
-        return None
+        record = self._renewables().by_country.get(normalize_country_name(country))
+        return dict(record) if record else None
 
-    def get_industrial_pollution(self) -> List[Dict[str, Any]]:
+    def get_eu_renewables(self) -> Optional[Dict[str, Any]]:
         """
-        Mengambil dan menormalkan data tren polusi industri.
+        Baris agregat EU-27 dari dataset renewables, jika ada.
         """
-        # ID ini harus diverifikasi dari API, ini adalah contoh
-        dataset_id = "industrial-releases-of-pollutants-to-water"
-        raw_data = self._get_parquet_data(dataset_id)
-        
-        normalized_data = []
-        for record in raw_data:
-            year = record.get("year")
-            if not year:
-                continue
-                
-            def to_float(v):
-                try:
-                    return float(v) if v not in (None, "") else None
-                except Exception:
-                    return None
-                    
-            normalized_data.append({
-                "year": int(year),
-                "cd_hg_ni_pb": to_float(record.get("cd_hg_ni_pb")),
-                "toc": to_float(record.get("toc")),
-                "total_n": to_float(record.get("total_n")),
-                "total_p": to_float(record.get("total_p")),
-                "gva": to_float(record.get("gva")),
-            })
-        
-        # Sort by year
-        normalized_data.sort(key=lambda x: x.get("year", 0))
-        return normalized_data
-
-    def compute_pollution_trend(self, records: List[Dict[str, Any]], window: int = 3) -> Dict[str, Any]:
-        """
-        Menghitung tren sederhana berdasarkan data polusi.
-        """
-        def slope_for(key: str) -> Dict[str, Any]:
-            vals = [r.get(key) for r in records if isinstance(r.get(key), (int, float))]
-            if len(vals) < 2:
-                return {"slope": 0.0, "increase": False}
-            sel = vals[-window:] if len(vals) >= window else vals
-            s = float(sel[-1] - sel[0])
-            return {"slope": s, "increase": s > 0.0}
-            
-        return {
-            "total_n": slope_for("total_n"),
-            "total_p": slope_for("total_p")
-        }
-
-    def get_indicator(self, *, indicator: Optional[str] = "GHG", country: Optional[str] = None, 
+        record = self._renewables().eu_row
+        return dict(record) if record else None
+
+    def get_industrial_pollution(self, *, country: Optional[str] = None, year: Optional[int] = None,
+                                 limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Mengambil dan menormalkan data tren polusi industri (urut tahun).
+        Filter negara/tahun dan limit diterapkan secara vektor sebelum konversi ke dict.
+        """
+        return self._records(self._pollution_filtered(country, year), limit)
+
+    def _pollution_filtered(self, country: Optional[str], year: Optional[int]) -> pd.DataFrame:
+        df = self._pollution_frame()
+        if df.empty:
+            return df
+        if country:
+            df = df[df["_country_norm"] == normalize_country_name(country)]
+        if year:
+            df = df[df["year"] == year]
+        return df
+
+    def compute_pollution_trend(self, records: List[Dict[str, Any]], window: int = DEFAULT_WINDOW,
+                                keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Menghitung tren (OLS slope, delta, persen, CAGR, r2) untuk beberapa kolom polusi sekaligus.
+        Default kolom: total_n dan total_p.
+        """
+        keys = keys or ["total_n", "total_p"]
+        series = []
+        for key in keys:
+            pts = [(r.get("year"), r.get(key)) for r in records
+                   if isinstance(r.get(key), (int, float)) and isinstance(r.get("year"), (int, float))]
+            series.append(([p[0] for p in pts], [p[1] for p in pts]))
+        return dict(zip(keys, compute_trends(series, window=window)))
+
+    @staticmethod
+    def _indicator_dataset(indicator: Optional[str]) -> str:
+        """
+        Dataset untuk sebuah indikator: "pollution" untuk GHG/emisi, selain itu "renewables".
+        """
+        indicator_lower = (indicator or "GHG").lower()
+        # Route renewable energy indicators
+        if "renewable" in indicator_lower or indicator_lower in ["res", "share_res"]:
+            return "renewables"
+        # Route GHG/pollution indicators
+        if indicator_lower in ["ghg", "greenhouse", "pollution", "emissions"]:
+            return "pollution"
+        # Default fallback - return renewable energy data
+        logger.warning(f"Unknown indicator '{indicator}', defaulting to renewable energy")
+        return "renewables"
+
+    def get_indicator(self, *, indicator: Optional[str] = "GHG", country: Optional[str] = None,
                      year: Optional[int] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """
         Generic indicator method for backward compatibility.
         Handles different types of indicators by routing to appropriate methods.
         """
         try:
-            if not indicator:
-                indicator = "GHG"
-                
-            indicator_lower = indicator.lower()
-            
-            # Route renewable energy indicators
-            if "renewable" in indicator_lower or indicator_lower in ["res", "share_res"]:
-                if country:
-                    result = self.get_country_renewables(country)
-                    return [result] if result else []
-                else:
-                    results = self.get_countries_renewables()
-                    return results[:limit] if results else []
-            
-            # Route GHG/pollution indicators  
-            elif indicator_lower in ["ghg", "greenhouse", "pollution", "emissions"]:
-                results = self.get_industrial_pollution()
-                
-                # Apply country filter if specified
-                if country:
-                    normalized_country = normalize_country_name(country)
-                    results = [r for r in results 
-                             if normalize_country_name(r.get('country', '')) == normalized_country or
-                                normalize_country_name(r.get('countryName', '')) == normalized_country]
-                
-                # Apply year filter if specified  
-                if year:
-                    results = [r for r in results 
-                             if r.get('year') == year or r.get('reportingYear') == year]
-                
-                return results[:limit] if results else []
-            
-            # Default fallback - return renewable energy data
-            else:
-                logger.warning(f"Unknown indicator '{indicator}', defaulting to renewable energy")
-                if country:
-                    result = self.get_country_renewables(country)
-                    return [result] if result else []
-                else:
-                    results = self.get_countries_renewables()
-                    return results[:limit] if results else []
-                    
+            if self._indicator_dataset(indicator) == "pollution":
+                # Country/year filters and limit are applied on the columnar dataset
+                return self.get_industrial_pollution(country=country, year=year, limit=limit)
+            if country:
+                result = self.get_country_renewables(country)
+                return [result] if result else []
+            return self.get_countries_renewables(limit=limit)
         except Exception as e:
             logger.error(f"Error in get_indicator: {e}")
             return []
 
+    def get_indicator_frame(self, *, indicator: Optional[str] = "GHG", country: Optional[str] = None,
+                            year: Optional[int] = None, limit: Optional[int] = 50) -> pd.DataFrame:
+        """
+        Baris yang sama dengan get_indicator, tetapi sebagai DataFrame kolumnar (tanpa kolom
+        internal) untuk keluaran Arrow/Parquet tanpa konversi ke dict.
+        """
+        if self._indicator_dataset(indicator) == "pollution":
+            df = self._pollution_filtered(country, year)
+        else:
+            df = self._renewables().frame
+            if country:
+                # Sama seperti indeks negara: baris pertama per negara kanonik
+                df = df[df["_country_norm"] == normalize_country_name(country)].head(1)
+        if limit is not None:
+            df = df.head(limit)
+        return df[[c for c in df.columns if not str(c).startswith("_")]].reset_index(drop=True)
+
 __all__ = ["EEAClient"]
\ No newline at end of file
@@ -14,7 +14,7 @@ from typing import Any, Dict, List, Optional
 
 import requests
 
-from api.utils.schema import ensure_epa_emission_schema
+from api.utils.schema import normalize_many, now_iso
 
 logger = logging.getLogger(__name__)
 
@@ -75,11 +75,29 @@ class EPAClient:
 		"""
 		return list(data or [])
 
-	def format_permit_data(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-		"""Normalisasi record EPA ke skema standar Permit + extras (EPA)."""
+	def format_permit_data(self, data: List[Dict[str, Any]], *, retrieved_at: Optional[str] = None) -> List[Dict[str, Any]]:
+		"""Normalisasi record EPA ke skema standar Permit + extras (EPA).
+
+		Semua record dalam satu batch memakai satu stempel `retrieved_at`.
+		"""
 		if not data:
 			return []
-		return [ensure_epa_emission_schema(rec) for rec in data if isinstance(rec, dict)]
+		return normalize_many(data, "epa", retrieved_at=retrieved_at)
+
+	def fetch_normalized(self) -> List[Dict[str, Any]]:
+		"""
+		Ambil data EPA terbaru dan normalisasi ke skema Permit (fetcher untuk cache EPA).
+		Bila EPA gagal atau kosong, data sample dipakai sebagai fallback.
+		"""
+		logger.info("Fetching fresh EPA emissions data")
+		retrieved_at = now_iso()
+		try:
+			raw = self.get_status_sk(plain=False)
+			data = raw if (raw and isinstance(raw, list)) else self.create_sample_data()
+		except Exception as e:
+			logger.error(f"Error fetching EPA data: {e}")
+			data = self.create_sample_data()
+		return self.format_permit_data(data, retrieved_at=retrieved_at)
 
 	def create_sample_data(self) -> List[Dict[str, Any]]:
 		"""
@@ -156,4 +174,10 @@ class EPAClient:
 # Export with legacy name for compatibility
 KLHKClient = EPAClient
 
-__all__ = ["KLHKClient", "EPAClient"]
+
+def fetch_epa_permits() -> List[Dict[str, Any]]:
+	"""Fetcher untuk `cache.get_or_set`: data EPA ternormalisasi dari klien baru."""
+	return EPAClient().fetch_normalized()
+
+
+__all__ = ["KLHKClient", "EPAClient", "fetch_epa_permits"]
@@ -2,19 +2,202 @@ from __future__ import annotations
 
 import os
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+from datetime import datetime
 import csv
+import gzip
 import io
-from functools import lru_cache
+import json
+import time
 
+import pandas as pd
 import requests
 from openpyxl import load_workbook
 
-from api.utils.schema import ensure_iso_cert_schema
+from api.utils.schema import normalize_many
 from api.utils.mappings import normalize_country_name
+from api.utils.projection import compact_records
+from api.utils.dataset_cache import DATASET_CACHE_TTL, dataset_cache, file_version
+
+try:  # optional: incremental JSON parsing for large exports
+    import ijson
+except ImportError:  # pragma: no cover - depends on environment
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# Remote CSV/JSON exports have no cheap version token; re-fetch after this many seconds
+ISO_REMOTE_TTL = int(os.getenv("ISO_REMOTE_TTL", "3600"))
+# Seconds before a failed remote fetch is retried
+ISO_REMOTE_RETRY = int(os.getenv("ISO_REMOTE_RETRY", "300"))
+
+
+class RemoteRows(NamedTuple):
+    """Rows of the remote ISO export plus the validators used to revalidate it."""
+
+    rows: Tuple[Dict[str, Any], ...]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    @property
+    def version(self) -> str:
+        return self.etag or self.last_modified or str(self.fetched_at)
+
+
+# Date layouts seen in ISO exports, in order of preference for ambiguous values
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S")
+
+
+def _parse_date_scalar(text: str) -> str:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return text
+
+
+def parse_date_column(values: Sequence[Any]) -> List[Optional[str]]:
+    """Format a column of date cells as YYYY-MM-DD strings.
+
+    Date/datetime cells are formatted directly. Text cells are parsed in bulk with
+    pandas, one format at a time over the values still unparsed, so each value
+    gets the first matching format of DATE_FORMATS; the rare leftovers (e.g.
+    years outside pandas' range) go through strptime, and unparseable text is
+    returned as-is. Empty cells become None.
+    """
+    out: List[Optional[str]] = [None] * len(values)
+    text_idx: List[int] = []
+    texts: List[str] = []
+    for i, val in enumerate(values):
+        if val is None:
+            continue
+        if hasattr(val, "strftime"):
+            out[i] = val.strftime("%Y-%m-%d")
+            continue
+        text = str(val).strip()
+        if text:
+            text_idx.append(i)
+            texts.append(text)
+    if not texts:
+        return out
+
+    remaining = pd.Series(texts, index=text_idx, dtype=object)
+    for fmt in DATE_FORMATS:
+        if remaining.empty:
+            break
+        parsed = pd.to_datetime(remaining, format=fmt, errors="coerce")
+        ok = parsed.notna()
+        if ok.any():
+            for i, formatted in parsed[ok].dt.strftime("%Y-%m-%d").items():
+                out[i] = formatted
+            remaining = remaining[~ok]
+    for i, text in remaining.items():
+        out[i] = _parse_date_scalar(text)
+    return out
+
+
+def normalize_company_name(name: Optional[str]) -> str:
+    """Company name key used for ISO matching (trimmed, lower-case)."""
+    return (name or "").strip().lower()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ISOStore:
+    """Normalized ISO 14001 records indexed for lookups by country and company name.
+
+    Built once per source version and shared through the dataset cache. Country
+    lookups use a canonical-country index; company matching keeps the substring
+    semantics of CEVS ("query is contained in the certified name") but resolves it
+    through an exact-name hash and a trigram index instead of scanning every row.
+    The record tuple is shared by every request; callers get new lists and must
+    treat the records themselves as read-only.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]], *, version: str = "") -> None:
+        # Source version the store was built from, and when (stable per build)
+        self.version = version
+        self.loaded_at = time.time()
+        self.records: Tuple[Dict[str, Any], ...] = tuple(normalize_many(records, "iso"))
+        # view=compact variant (no extras.raw), built with the store instead of per request
+        self.compact_records: Tuple[Dict[str, Any], ...] = tuple(compact_records(self.records))
+        self._names: List[str] = []
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_country: Dict[Optional[str], List[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        for i, rec in enumerate(self.records):
+            name = normalize_company_name(rec.get("nama_perusahaan"))
+            self._names.append(name)
+            if name:
+                self._by_name.setdefault(name, []).append(i)
+                for gram in _trigrams(name):
+                    self._trigrams.setdefault(gram, set()).add(i)
+            country = (rec.get("extras") or {}).get("country")
+            self._by_country.setdefault(normalize_country_name(country or ""), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _scope(self, country: Optional[str]) -> Optional[Sequence[int]]:
+        """Record indices for a country filter, or None when unfiltered."""
+        if not country:
+            return None
+        return self._by_country.get(normalize_country_name(country), [])
+
+    def records_for(self, country: Optional[str] = None, limit: Optional[int] = None, *, compact: bool = False) -> List[Dict[str, Any]]:
+        """Records in source order, optionally filtered by country and truncated.
+
+        compact=True returns the precomputed compact view of the same records.
+        """
+        source = self.compact_records if compact else self.records
+        scope = self._scope(country)
+        if scope is None:
+            return list(source[:limit] if limit else source)
+        idx = scope[:limit] if limit else scope
+        return [source[i] for i in idx]
+
+    def count(self, country: Optional[str] = None, limit: Optional[int] = None) -> int:
+        """len(records_for(country, limit)) without building the list."""
+        scope = self._scope(country)
+        n = len(self.records) if scope is None else len(scope)
+        return min(n, limit) if limit else n
+
+    def matching_indices(self, company: Optional[str], country: Optional[str] = None) -> List[int]:
+        """Indices of records whose normalized name contains the normalized `company`."""
+        key = normalize_company_name(company)
+        scope = self._scope(country)
+        if not key:
+            candidates: Iterable[int] = range(len(self.records)) if scope is None else scope
+            return [i for i in candidates if self._names[i]]
+        if len(key) < 3:
+            candidates = range(len(self.records)) if scope is None else scope
+            return [i for i in candidates if key in self._names[i]]
+        postings = sorted((self._trigrams.get(g, set()) for g in _trigrams(key)), key=len)
+        hits = set(postings[0]).intersection(*postings[1:])
+        if scope is not None:
+            hits.intersection_update(scope)
+        # Trigrams only narrow the candidates; confirm the contiguous substring
+        return sorted(i for i in hits if key in self._names[i])
+
+    def has_iso(self, company: Optional[str], country: Optional[str] = None) -> bool:
+        """True if any record (in `country`, when given) names `company`."""
+        key = normalize_company_name(company)
+        exact = self._by_name.get(key) if key else None
+        if exact:
+            scope = self._scope(country)
+            if scope is None or not set(exact).isdisjoint(scope):
+                return True
+        return bool(self.matching_indices(company, country))
+
+    def find(self, company: Optional[str], country: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Records matching `company` (substring), in source order."""
+        idx = self.matching_indices(company, country)
+        return [self.records[i] for i in (idx[:limit] if limit else idx)]
+
 
 class ISOClient:
     """Client for ISO 14001 certifications (scaffold with sample fallback).
@@ -39,35 +222,110 @@ class ISOClient:
             {"company": "Sustain PT", "country": "ID", "certificate": "ISO 14001", "valid_until": "2027-01-15"},
         ]
 
-    @lru_cache(maxsize=5)
-    def _load_from_csv_or_json(self, url: str) -> List[Dict[str, Any]]:
+    def _load_from_csv_or_json(self, url: str) -> Tuple[Dict[str, Any], ...]:
+        """Remote CSV/JSON rows (empty tuple if the export is unavailable)."""
+        remote = self._remote_rows(url)
+        return remote.rows if remote is not None else ()
+
+    def _remote_rows(self, url: str) -> Optional[RemoteRows]:
+        """Remote export, revalidated at most every ISO_REMOTE_TTL seconds.
+
+        On failure the last good copy (if any) is kept and the fetch is retried
+        after ISO_REMOTE_RETRY seconds instead of on every request.
+        """
+        check_key = ("iso:remote:check", url)
         try:
-            resp = self.session.get(url, timeout=30)
-            ct = (resp.headers.get("Content-Type") or "").lower()
-            text = resp.text
-            if "json" in ct or (text.lstrip().startswith("[") or text.lstrip().startswith("{")):
-                data = resp.json()
-                if isinstance(data, dict):
-                    # common wrapper key
-                    data = data.get("data", [])
-                if not isinstance(data, list):
-                    raise ValueError("Unexpected JSON shape for ISO dataset")
-                return [d for d in data if isinstance(d, dict)]
-            # assume CSV
-            buf = io.StringIO(text)
-            reader = csv.DictReader(buf)
-            return [dict(row) for row in reader]
+            return dataset_cache.get_or_load(check_key, lambda: self._revalidate_remote(url), ttl=ISO_REMOTE_TTL)
         except Exception as e:
             logger.error(f"ISO CSV/JSON load error: {e}")
-            return []
+            previous = dataset_cache.get(("iso:remote", url))
+            dataset_cache.set(check_key, previous, ttl=ISO_REMOTE_RETRY)
+            return previous
 
-    @lru_cache(maxsize=5)
-    def _load_from_excel(self, path: str, sheet_name: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Load ISO 14001 list from Excel. Scans for a sheet and header row containing 'Company'."""
-        rows: List[Dict[str, Any]] = []
+    def _revalidate_remote(self, url: str) -> RemoteRows:
+        """Conditional GET against the export; a 304 reuses the rows parsed last time."""
+        previous: Optional[RemoteRows] = dataset_cache.get(("iso:remote", url))
+        headers: Dict[str, str] = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        resp = self.session.get(url, headers=headers, timeout=30, stream=True)
+        try:
+            if resp.status_code == 304 and previous is not None:
+                current = previous
+            else:
+                resp.raise_for_status()
+                current = RemoteRows(
+                    rows=tuple(self._fetch_csv_or_json(resp)),
+                    etag=resp.headers.get("ETag"),
+                    last_modified=resp.headers.get("Last-Modified"),
+                    fetched_at=time.time(),
+                )
+        finally:
+            resp.close()
+        # Long-lived copy holding the validators for the next revalidation
+        dataset_cache.set(("iso:remote", url), current, ttl=max(ISO_REMOTE_TTL * 24, DATASET_CACHE_TTL))
+        return current
+
+    @staticmethod
+    def _fetch_csv_or_json(resp: requests.Response) -> Iterator[Dict[str, Any]]:
+        """Parse a streamed CSV or JSON export row by row.
+
+        gzip is handled both as Content-Encoding and as a gzipped body (.csv.gz).
+        The format comes from Content-Type or, failing that, the first non-blank
+        byte. JSON arrays (or {"data": [...]}) are parsed incrementally when ijson
+        is installed, otherwise decoded once straight from the stream.
+        """
+        raw = resp.raw
+        if hasattr(raw, "decode_content"):
+            raw.decode_content = True  # undo Content-Encoding: gzip/deflate
+        stream: io.BufferedIOBase = io.BufferedReader(raw)
+        if stream.peek(2)[:2] == b"\x1f\x8b":
+            stream = io.BufferedReader(gzip.GzipFile(fileobj=stream))
+
+        ct = (resp.headers.get("Content-Type") or "").lower()
+        head = stream.peek(512).lstrip(b"\xef\xbb\xbf \t\r\n")
+        if "json" in ct or head[:1] in (b"[", b"{"):
+            if ijson is not None:
+                prefix = "item" if head[:1] == b"[" else "data.item"
+                for item in ijson.items(stream, prefix, use_float=True):
+                    if isinstance(item, dict):
+                        yield item
+                return
+            data = json.load(io.TextIOWrapper(stream, encoding="utf-8-sig"))
+            if isinstance(data, dict):
+                # common wrapper key
+                data = data.get("data", [])
+            if not isinstance(data, list):
+                raise ValueError("Unexpected JSON shape for ISO dataset")
+            yield from (d for d in data if isinstance(d, dict))
+            return
+        # assume CSV
+        encoding = ct.split("charset=", 1)[1].split(";")[0].strip() if "charset=" in ct else "utf-8-sig"
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding=encoding, errors="replace", newline=""))
+        for row in reader:
+            yield dict(row)
+
+    def _load_from_excel(self, path: str, sheet_name: Optional[str] = None) -> Tuple[Dict[str, Any], ...]:
+        """Load ISO 14001 list from Excel, cached (as an immutable tuple) per file path + mtime."""
+        return dataset_cache.get_or_load(
+            ("iso:xlsx", path, sheet_name),
+            lambda: tuple(self._read_excel(path, sheet_name)),
+            version=file_version(path),
+        )
+
+    def _read_excel(self, path: str, sheet_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read ISO 14001 list from Excel. Scans for a sheet and header row containing 'Company'.
+
+        Rows are streamed (read-only workbook); only the company and expiry columns
+        are kept while scanning, and expiry dates are parsed per column in bulk.
+        """
+        if not os.path.exists(path):
+            return []
+        wb = None
         try:
-            if not os.path.exists(path):
-                return rows
             wb = load_workbook(path, read_only=True, data_only=True)
             sh = sheet_name
             if not sh:
@@ -89,94 +347,144 @@ class ISOClient:
                     header_row_index = idx
                     break
             if not header:
-                return rows
-            # Build column map
-            def col_idx(name: str) -> Optional[int]:
-                lname = name.lower()
-                for i, h in enumerate(header):
-                    if h.lower() == lname:
-                        return i
-                return None
-            idx_company = col_idx("Company")
-            idx_eff = col_idx("Effective date")
-            idx_exp = col_idx("Expiry date")
-            # iterate following rows
+                return []
+            lower_header = [h.lower() for h in header]
+            idx_company = lower_header.index("company")
+            idx_exp = lower_header.index("expiry date") if "expiry date" in lower_header else None
+
+            companies: List[str] = []
+            expiry: List[Any] = []
             for r in ws.iter_rows(min_row=header_row_index + 1, values_only=True):
-                cells = [None if c is None else c for c in r]
-                # stop if empty row
-                if not any(c is not None and str(c).strip() for c in cells):
+                comp_cell = r[idx_company] if idx_company < len(r) else None
+                if comp_cell is None:
                     continue
-                comp = str(cells[idx_company]).strip() if (idx_company is not None and idx_company < len(cells) and cells[idx_company] is not None) else ""
+                comp = str(comp_cell).strip()
                 if not comp or comp.lower().startswith("appendix"):
-                    # skip title rows
+                    # skip empty and title rows
                     continue
-                def dt_to_str(val: Any) -> Optional[str]:
-                    try:
-                        from datetime import datetime
-                        if hasattr(val, "strftime"):
-                            return val.strftime("%Y-%m-%d")
-                        s = str(val).strip()
-                        if not s:
-                            return None
-                        # try parse y-m-d or y/m/d
-                        for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S"):
-                            try:
-                                return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
-                            except Exception:
-                                pass
-                        return s
-                    except Exception:
-                        return None
-                valid_until = None
-                if idx_exp is not None and idx_exp < len(cells):
-                    valid_until = dt_to_str(cells[idx_exp])
-                record = {
-                    "company": comp,
-                    "country": None,  # not available in this sheet
-                    "certificate": "ISO 14001",
-                    "valid_until": valid_until,
-                    "_source_sheet": sh,
-                }
-                rows.append(record)
+                companies.append(comp)
+                expiry.append(r[idx_exp] if idx_exp is not None and idx_exp < len(r) else None)
         except Exception as e:
             logger.error(f"ISO Excel load error: {e}")
-        return rows
+            return []
+        finally:
+            if wb is not None:
+                wb.close()
+
+        valid_until = parse_date_column(expiry)
+        return [
+            {
+                "company": comp,
+                "country": None,  # not available in this sheet
+                "certificate": "ISO 14001",
+                "valid_until": until,
+                "_source_sheet": sh,
+            }
+            for comp, until in zip(companies, valid_until)
+        ]
+
+    def _sources_version(self) -> tuple:
+        """Version token over all configured ISO sources."""
+        remote = self._remote_rows(self.csv_url) if self.csv_url else None
+        return (
+            self.csv_url,
+            remote.version if remote is not None else None,
+            self.xlsx_path,
+            file_version(self.xlsx_path),
+            self.api_base,
+        )
+
+    @staticmethod
+    def _version_token(parts: tuple) -> str:
+        return ":".join(str(p) for p in parts if p)
+
+    def get_store(self) -> ISOStore:
+        """Indexed ISO store, built once per source version and shared across requests.
+
+        The store carries the version it was built from, so callers can tag
+        responses without a second (possibly newer) version lookup.
+        """
+        parts = self._sources_version()
+        return dataset_cache.get_or_load(
+            ("iso:store",),
+            lambda: ISOStore(self._load_records(), version=self._version_token(parts)),
+            version=parts,
+            ttl=ISO_REMOTE_TTL if self.api_base else None,
+        )
+
+    def version(self) -> str:
+        """Version token over all configured ISO sources (remote ETag, file mtime, ...)."""
+        return self._version_token(self._sources_version())
+
+    def warm(self) -> str:
+        """Build the indexed store into the shared cache (scheduler prefetch) and return its version."""
+        return self.get_store().version
+
+    def has_iso(self, company: Optional[str], country: Optional[str] = None) -> bool:
+        """True if `company` (substring match) holds an ISO 14001 certificate."""
+        return self.get_store().has_iso(company, country)
 
-    @lru_cache(maxsize=10)
     def get_iso14001_certifications(self, *, country: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
-        data: List[Dict[str, Any]] = []
-        # Prefer explicit CSV URL if provided
+        """Normalized ISO 14001 records, optionally filtered by country."""
+        return self.get_store().records_for(country, limit)
+
+    def _fetch_from_api(self) -> Tuple[Dict[str, Any], ...]:
+        """ISO records from ISO_API_BASE (placeholder endpoint); empty on failure."""
+        try:
+            url = f"{self.api_base}/iso1401"  # adjust when real endpoint available
+            resp = self.session.get(url, timeout=30)
+            if resp.status_code != 200:
+                logger.warning(f"ISO API HTTP {resp.status_code}")
+                return ()
+            data = resp.json()
+            if not isinstance(data, list):
+                raise ValueError("Unexpected ISO response shape")
+            return tuple(d for d in data if isinstance(d, dict))
+        except Exception as e:
+            logger.error(f"ISO API error: {e}")
+            return ()
+
+    def _load_records(self) -> List[Dict[str, Any]]:
+        """Merged raw ISO records from CSV/JSON, Excel and API (sample data if all are empty).
+
+        Source lists come from the dataset cache and are never modified; the merge
+        always builds a new list.
+        """
+        sources: List[Sequence[Dict[str, Any]]] = []
         if self.csv_url:
-            data = self._load_from_csv_or_json(self.csv_url)
-        # Also merge Excel list if available
-        excel_rows = self._load_from_excel(self.xlsx_path)
-        if excel_rows:
-            data.extend(excel_rows)
-        elif self.api_base and not data:
-            # Placeholder for future real API call
-            try:
-                url = f"{self.api_base}/iso1401"  # adjust when real endpoint available
-                params = {"country": country} if country else {}
-                resp = self.session.get(url, params=params, timeout=30)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if not isinstance(data, list):
-                        raise ValueError("Unexpected ISO response shape")
-                else:
-                    logger.warning(f"ISO API HTTP {resp.status_code}, using sample data")
-                    data = self.create_sample_data()
-            except Exception as e:
-                logger.error(f"ISO API error: {e}")
-                data = self.create_sample_data()
-        if not data:
-            data = self.create_sample_data()
-
-        if country:
-            normalized_filter = normalize_country_name(country)
-            data = [d for d in data if normalize_country_name(d.get("country", "")) == normalized_filter]
-        if limit and len(data) > limit:
-            data = data[:limit]
-        return [ensure_iso_cert_schema(rec) for rec in data if isinstance(rec, dict)]
-
-
-__all__ = ["ISOClient"]
+            sources.append(self._load_from_csv_or_json(self.csv_url))
+        sources.append(self._load_from_excel(self.xlsx_path))
+        if self.api_base:
+            sources.append(self._fetch_from_api())
+        data = merge_iso_records(*sources)
+        return data or self.create_sample_data()
+
+
+def merge_iso_records(*sources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Concatenate ISO sources, keeping one record per (company, certificate).
+
+    The first occurrence wins; fields it lacks (e.g. country, which the Excel list
+    does not carry) are filled from later duplicates. Input records are copied,
+    never mutated.
+    """
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for source in sources:
+        for rec in source or ():
+            if not isinstance(rec, dict):
+                continue
+            company = normalize_company_name(rec.get("company") or rec.get("organization"))
+            certificate = str(rec.get("certificate") or rec.get("standard") or "").strip().lower()
+            if not company:
+                continue
+            key = (company, certificate)
+            current = merged.get(key)
+            if current is None:
+                merged[key] = dict(rec)
+                continue
+            for field, value in rec.items():
+                if value not in (None, "") and current.get(field) in (None, ""):
+                    current[field] = value
+    return list(merged.values())
+
+
+__all__ = ["ISOClient", "ISOStore", "merge_iso_records", "normalize_company_name", "parse_date_column"]
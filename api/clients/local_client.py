@@ -173,6 +173,8 @@ class KLHKClient:
             return []
         
         formatted_data = []
+        # Satu stempel waktu untuk seluruh batch
+        retrieved_at = datetime.now().isoformat()
         
         for record in data:
             if isinstance(record, dict):
@@ -200,7 +202,7 @@ class KLHKClient:
                         formatted_record[standard_field] = None
                 
                 # Tambahkan metadata
-                formatted_record['retrieved_at'] = datetime.now().isoformat()
+                formatted_record['retrieved_at'] = retrieved_at
                 formatted_record['source'] = 'PTSP MENLHK'
                 
                 formatted_data.append(formatted_record)
@@ -2,17 +2,31 @@ from __future__ import annotations
 
 from flask import Blueprint, jsonify, request, current_app, g
 from flasgger import swag_from
+import pyarrow as pa
 from datetime import datetime
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import os
 
-from api.clients.global_client import KLHKClient
+from api.clients.global_client import KLHKClient, fetch_epa_permits
 from api.utils import cache as cache_util
+from api.utils.export import (
+	ExportFormatError,
+	export_columns,
+	export_response,
+	parse_export_format,
+	parse_table_format,
+	records_table,
+	table_response,
+)
+from api.utils.http_cache import conditional_response
+from api.utils.json_provider import json_body_response, page_cache
 from api.clients.iso_client import ISOClient
 from api.clients.eea_client import EEAClient
 from api.clients.edgar_client import EDGARClient
-from api.services.cevs_aggregator import compute_cevs_for_company
+from api.services.cevs_aggregator import DETAIL_LEVELS, compute_cevs_for_company
+from api.utils.projection import ProjectionError, compact_records, parse_projection, project
+from api.utils.trend import empty_trend
 
 
 global_bp = Blueprint("global_bp", __name__)
@@ -20,30 +34,19 @@ global_bp = Blueprint("global_bp", __name__)
 logger = logging.getLogger(__name__)
 
 
-def _fetch_and_normalize() -> List[Dict[str, Any]]:
-	"""Fetch fresh EPA emissions data and normalize to our schema."""
-	logger.info("Fetching fresh EPA emissions data (global route)")
-	client = KLHKClient()
+def _get_snapshot(compact: bool = False) -> Tuple[cache_util.Snapshot, List[Dict[str, Any]]]:
+	"""Cached EPA data (compact view when asked) with the snapshot it belongs to."""
+	snap = cache_util.get_snapshot(fetch_epa_permits)
+	data = cache_util.get_derived("compact", compact_records, snapshot=snap) if compact else snap.data
 	try:
-		raw = client.get_status_sk(plain=False)
-		data = raw if (raw and isinstance(raw, list)) else client.create_sample_data()
-	except Exception as e:
-		logger.error(f"Error fetching EPA data: {e}")
-		data = client.create_sample_data()
-
-	normalized = client.format_permit_data(data)
-	return normalized
+		current_app.config["CACHE_TIMESTAMP"] = snap.timestamp
+	except Exception:
+		pass
+	return snap, data
 
 
 def _get_cached_data() -> List[Dict[str, Any]]:
-	data = cache_util.get_or_set(_fetch_and_normalize)
-	ts = cache_util.get_cache_timestamp()
-	if ts:
-		try:
-			current_app.config["CACHE_TIMESTAMP"] = ts
-		except Exception:
-			pass
-	return data
+	return _get_snapshot()[1]
 
 
 def _matches_filters(item: Dict[str, Any], *, state: Optional[str], year: Optional[int], pollutant: Optional[str]) -> bool:
@@ -104,6 +107,29 @@ def _matches_filters(item: Dict[str, Any], *, state: Optional[str], year: Option
             'description': 'Page number for pagination',
             'default': 1
         },
+        {
+            'name': 'format',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['json', 'arrow', 'parquet'],
+            'description': 'json (default), Arrow IPC stream or Parquet bytes of the page; filters and pagination go to the schema metadata',
+            'default': 'json'
+        },
+        {
+            'name': 'view',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['full', 'compact'],
+            'description': 'compact omits extras.raw (the copy of every upstream column)',
+            'default': 'full'
+        },
+        {
+            'name': 'fields',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Comma separated fields to return; dotted names select nested keys',
+            'example': 'nama_perusahaan,tanggal_berlaku,extras.emissions'
+        },
         {
             'name': 'limit',
             'in': 'query',
@@ -181,8 +207,13 @@ def global_emissions():
 	  - pollutant: e.g., CO2
 	  - page: default 1
 	  - limit: default 50 (1..100)
+	  - view: full (default) | compact (without extras.raw)
+	  - fields: comma separated fields, e.g. nama_perusahaan,extras.state
+	  - format: json (default) | arrow | parquet
 	"""
 	try:
+		fmt = parse_table_format(request.args.get("format"))
+		projection = parse_projection(request.args)
 		state = request.args.get("state")
 		year_str = request.args.get("year")
 		pollutant = request.args.get("pollutant")
@@ -195,105 +226,192 @@ def global_emissions():
 		if limit < 1 or limit > 100:
 			limit = 50
 
-		if state or year is not None or pollutant:
+		start_idx = (page - 1) * limit
+		end_idx = start_idx + limit
+		live = bool(state or year is not None or pollutant)
+		if live:
 			# Fetch filtered data directly from EPA to avoid missing matches due to cached base set
 			client = KLHKClient()
 			# Ensure we have enough rows for the requested page
-			end_idx = max(0, (page - 1) * limit + limit)
-			raw = client.get_emissions_power_plants(state=state, limit=end_idx)
+			raw = client.get_emissions_power_plants(state=state, limit=max(0, end_idx))
 			data = client.format_permit_data(raw)
+			# Filter on full records (state may only be present in extras.raw), then project the page
 			filtered = [d for d in data if _matches_filters(d, state=state, year=year, pollutant=pollutant)]
+			paginated = project(filtered[start_idx:end_idx], projection)
 		else:
-			data = _get_cached_data()
-			filtered = [d for d in data if _matches_filters(d, state=state, year=year, pollutant=pollutant)]
-
-		start_idx = (page - 1) * limit
-		end_idx = start_idx + limit
-		paginated = filtered[start_idx:end_idx]
+			snap, filtered = _get_snapshot(projection.compact)
+			paginated = project(filtered[start_idx:end_idx], projection, compacted=True)
+
+		filters = {"state": state, "year": year, "pollutant": pollutant}
+		pagination = {
+			"page": page,
+			"limit": limit,
+			"total_records": len(filtered),
+			"total_pages": (len(filtered) + limit - 1) // limit,
+			"has_next": end_idx < len(filtered),
+			"has_prev": page > 1,
+		}
+		if fmt:
+			def render():
+				table = records_table(paginated, export_columns(projection))
+				return table_response(table, fmt, filename="emissions", metadata={"filters": filters, "pagination": pagination})
+			# Tables carry no retrieved_at, so pages of the cached set are stable per refresh;
+			# filtered queries go to EPA live and have no version to tag
+			if live:
+				return render()
+			return conditional_response(snap.timestamp, render)
 
 		return jsonify({
 			"status": "success",
 			"data": paginated,
-			"filters": {"state": state, "year": year, "pollutant": pollutant},
-			"pagination": {
-				"page": page,
-				"limit": limit,
-				"total_records": len(filtered),
-				"total_pages": (len(filtered) + limit - 1) // limit,
-				"has_next": end_idx < len(filtered),
-				"has_prev": page > 1,
-			},
+			"filters": filters,
+			"pagination": pagination,
 			"retrieved_at": datetime.now().isoformat(),
 		})
 
+	except (ExportFormatError, ProjectionError) as e:
+		return jsonify({"status": "error", "message": str(e)}), 400
 	except Exception as e:
 		logger.error(f"Error in /global/emissions: {e}")
 		return jsonify({"status": "error", "message": str(e)}), 500
 
 
-@global_bp.route("/global/emissions/stats", methods=["GET"])
-def global_emissions_stats():
-	"""Basic stats aggregated by state, pollutant, and year."""
+@global_bp.route("/global/emissions/export", methods=["GET"])
+def global_emissions_export():
+	"""Stream the cached EPA emissions dataset as NDJSON (default), CSV or Parquet.
+
+	Query params:
+	  - format: ndjson | csv | parquet
+	  - state, year, pollutant: optional filters applied while streaming
+	  - view / fields: projection as for /global/emissions
+	"""
 	try:
-		data = _get_cached_data()
+		fmt = parse_export_format(request.args.get("format"))
+		projection = parse_projection(request.args)
+		state = request.args.get("state")
+		year_str = request.args.get("year")
+		year = int(year_str) if year_str and year_str.isdigit() else None
+		pollutant = request.args.get("pollutant")
 
-		by_state: Dict[str, int] = {}
-		by_pollutant: Dict[str, int] = {}
-		by_year: Dict[str, int] = {}
+		if state or year is not None or pollutant:
+			records = (d for d in _get_cached_data() if _matches_filters(d, state=state, year=year, pollutant=pollutant))
+			return export_response(records, fmt, projection=projection, filename="emissions")
+		_, data = _get_snapshot(projection.compact)
+		return export_response(data, fmt, projection=projection, filename="emissions", compacted=True)
 
-		for item in data:
-			raw = (item.get("extras") or {}).get("raw", {})
-			state = str(raw.get("state") or raw.get("state_name") or "Unknown") or "Unknown"
-			pol = str(item.get("judul_kegiatan") or "Unknown") or "Unknown"
-			year = str(item.get("tanggal_berlaku") or "Unknown") or "Unknown"
+	except (ExportFormatError, ProjectionError) as e:
+		return jsonify({"status": "error", "message": str(e)}), 400
+	except Exception as e:
+		logger.error(f"Error in /global/emissions/export: {e}")
+		return jsonify({"status": "error", "message": str(e)}), 500
 
-			by_state[state] = by_state.get(state, 0) + 1
-			by_pollutant[pol] = by_pollutant.get(pol, 0) + 1
-			by_year[year] = by_year.get(year, 0) + 1
 
-		return jsonify({
-			"status": "success",
-			"statistics": {
-				"by_state": by_state,
-				"by_pollutant": by_pollutant,
-				"by_year": by_year,
-				"total_records": len(data),
-			},
-			"retrieved_at": datetime.now().isoformat(),
-		})
+def _emissions_stats(data: List[Dict[str, Any]], retrieved_at: str):
+	"""Payload of /global/emissions/stats."""
+	by_state: Dict[str, int] = {}
+	by_pollutant: Dict[str, int] = {}
+	by_year: Dict[str, int] = {}
+
+	for item in data:
+		raw = (item.get("extras") or {}).get("raw", {})
+		state = str(raw.get("state") or raw.get("state_name") or "Unknown") or "Unknown"
+		pol = str(item.get("judul_kegiatan") or "Unknown") or "Unknown"
+		year = str(item.get("tanggal_berlaku") or "Unknown") or "Unknown"
+
+		by_state[state] = by_state.get(state, 0) + 1
+		by_pollutant[pol] = by_pollutant.get(pol, 0) + 1
+		by_year[year] = by_year.get(year, 0) + 1
+
+	return jsonify({
+		"status": "success",
+		"statistics": {
+			"by_state": by_state,
+			"by_pollutant": by_pollutant,
+			"by_year": by_year,
+			"total_records": len(data),
+		},
+		"retrieved_at": retrieved_at,
+	})
+
+
+@global_bp.route("/global/emissions/stats", methods=["GET"])
+def global_emissions_stats():
+	"""Basic stats aggregated by state, pollutant, and year."""
+	try:
+		snap, data = _get_snapshot()
+		return conditional_response(snap.timestamp, lambda: _emissions_stats(data, snap.retrieved_at))
 
 	except Exception as e:
 		logger.error(f"Error in /global/emissions/stats: {e}")
 		return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def _iso_payload(store, country: Optional[str], limit: int, projection) -> Dict[str, Any]:
+	"""Payload of /global/iso; retrieved_at is when the store was built, so the body is stable per build."""
+	data = store.records_for(country, limit, compact=projection.compact)
+	return {
+		"status": "success",
+		"data": project(data, projection, compacted=True),
+		"filters": {"country": country},
+		"retrieved_at": datetime.fromtimestamp(store.loaded_at).isoformat(),
+	}
+
+
 @global_bp.route("/global/iso", methods=["GET"])
 def global_iso():
 	try:
+		projection = parse_projection(request.args)
 		country = request.args.get("country")
 		limit = int(request.args.get("limit", 50))
-		client = ISOClient()
-		data = client.get_iso14001_certifications(country=country, limit=limit)
-		return jsonify({
-			"status": "success",
-			"data": data,
-			"filters": {"country": country},
-			"retrieved_at": datetime.now().isoformat(),
-		})
+		store = ISOClient().get_store()
+		# Responses only change with the store; serve them pre-serialized per build
+		version = (store.version, store.loaded_at)
+
+		def render():
+			key = ("iso", country, limit, projection)
+			return json_body_response(page_cache.get_or_render(version, key, lambda: _iso_payload(store, country, limit, projection)))
+
+		return conditional_response(version, render)
+	except ProjectionError as e:
+		return jsonify({"status": "error", "message": str(e)}), 400
 	except Exception as e:
 		logger.error(f"Error in /global/iso: {e}")
 		return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@global_bp.route("/global/iso/export", methods=["GET"])
+def global_iso_export():
+	"""Stream all ISO 14001 records (optionally one country) as NDJSON (default), CSV or Parquet."""
+	try:
+		fmt = parse_export_format(request.args.get("format"))
+		projection = parse_projection(request.args)
+		country = request.args.get("country")
+		records = ISOClient().get_store().records_for(country, compact=projection.compact)
+		return export_response(records, fmt, projection=projection, filename="iso14001", compacted=True)
+	except (ExportFormatError, ProjectionError) as e:
+		return jsonify({"status": "error", "message": str(e)}), 400
+	except Exception as e:
+		logger.error(f"Error in /global/iso/export: {e}")
+		return jsonify({"status": "error", "message": str(e)}), 500
+
+
 @global_bp.route("/global/eea", methods=["GET"])
 def global_eea():
 	try:
+		fmt = parse_table_format(request.args.get("format"))
 		country = request.args.get("country")
 		indicator = request.args.get("indicator", "GHG")
 		year = request.args.get("year")
 		year_val = int(year) if year and year.isdigit() else None
 		limit = int(request.args.get("limit", 50))
 		client = EEAClient()
+		if fmt:
+			# Straight from the columnar dataset, no per-row dicts. Not ETag-tagged: the
+			# dataset is synced lazily on the first read, so its version is unknown up front
+			frame = client.get_indicator_frame(indicator=indicator, country=country, year=year_val, limit=limit)
+			table = pa.Table.from_pandas(frame, preserve_index=False)
+			filters = {"country": country, "indicator": indicator, "year": year_val}
+			return table_response(table, fmt, filename="eea", metadata={"filters": filters})
 		data = client.get_indicator(indicator=indicator, country=country, year=year_val, limit=limit)
 		return jsonify({
 			"status": "success",
@@ -301,11 +419,46 @@ def global_eea():
 			"filters": {"country": country, "indicator": indicator, "year": year_val},
 			"retrieved_at": datetime.now().isoformat(),
 		})
+	except ExportFormatError as e:
+		return jsonify({"status": "error", "message": str(e)}), 400
 	except Exception as e:
 		logger.error(f"Error in /global/eea: {e}")
 		return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def _edgar_payload(client: EDGARClient, country: str, pollutant: str, window: int, fmt: Optional[str] = None):
+	"""Payload of /global/edgar; retrieved_at is the workbook mtime so the body is stable per version.
+
+	With fmt (arrow/parquet) the series is a two-column table (year, value) and the
+	remaining fields go to the schema metadata.
+	"""
+	source = os.getenv("EDGAR_XLSX_PATH") or "local:EDGAR_emiss_on_UCDB_2024.xlsx"
+	try:
+		years, values = client.get_country_series_columns(country, pollutant)
+		trend = client.get_country_emissions_trend(country, pollutant=pollutant, window=window)
+		retrieved_at = datetime.fromtimestamp(os.path.getmtime(client.xlsx_path)).isoformat()
+	except FileNotFoundError:
+		# Graceful fallback when EDGAR workbook isn't available in the environment
+		years, values = [], []
+		trend = dict(empty_trend(), pollutant=pollutant)
+		retrieved_at = datetime.now().isoformat()
+
+	if fmt:
+		table = pa.table({"year": pa.array(years, pa.int64()), "value": pa.array(values, pa.float64())})
+		metadata = {"country": country, "pollutant": pollutant, "trend": trend, "retrieved_at": retrieved_at, "source": source}
+		return table_response(table, fmt, filename="edgar", metadata=metadata)
+
+	return jsonify({
+		"status": "success",
+		"country": country,
+		"pollutant": pollutant,
+		"series": [{"year": y, "value": v} for y, v in zip(years, values)],
+		"trend": trend,
+		"retrieved_at": retrieved_at,
+		"source": source,
+	})
+
+
 @global_bp.route("/global/edgar", methods=["GET"])
 def global_edgar():
 	"""Diagnostic endpoint: return EDGAR series and trend for a country.
@@ -314,8 +467,10 @@ def global_edgar():
 	  - country: required country name matching UC_country in EDGAR file
 	  - pollutant: default PM2.5 (also supports NOx, CO2, GWP_100_AR5_GHG if present)
 	  - window: optional int window for trend delta (default 3)
+	  - format: json (default) | arrow | parquet
 	"""
 	try:
+		fmt = parse_table_format(request.args.get("format"))
 		country = request.args.get("country")
 		pollutant = request.args.get("pollutant", "PM2.5")
 		window_str = request.args.get("window")
@@ -323,44 +478,97 @@ def global_edgar():
 
 		if not country:
 			return jsonify({"status": "error", "message": "country is required"}), 400
+		client = EDGARClient()
+		if not os.path.exists(client.xlsx_path):
+			# No workbook, no version to tag the fallback payload with
+			return _edgar_payload(client, country, pollutant, window, fmt)
+		return conditional_response(client.version(), lambda: _edgar_payload(client, country, pollutant, window, fmt))
+	except ExportFormatError as e:
+		return jsonify({"status": "error", "message": str(e)}), 400
+	except Exception as e:
+		logger.error(f"Error in /global/edgar: {e}")
+		return jsonify({"status": "error", "message": str(e)}), 500
+
+
+EDGAR_BATCH_MAX_COUNTRIES = 50
+EDGAR_BATCH_MAX_POLLUTANTS = 10
+
+
+def _split_csv_param(value: Optional[str]) -> List[str]:
+	return [p.strip() for p in (value or "").split(",") if p.strip()]
+
+
+@global_bp.route("/global/edgar/batch", methods=["GET"])
+def global_edgar_batch():
+	"""EDGAR series and trends for many countries and pollutants in one call.
+
+	Query params:
+	  - countries: required comma-separated list (max 50)
+	  - pollutants: comma-separated list, default PM2.5 (max 10)
+	  - window: optional int window for trend delta (default 3)
+	"""
+	try:
+		countries = _split_csv_param(request.args.get("countries"))
+		pollutants = _split_csv_param(request.args.get("pollutants")) or ["PM2.5"]
+		window_str = request.args.get("window")
+		window = int(window_str) if window_str and window_str.isdigit() else 3
+
+		if not countries:
+			return jsonify({"status": "error", "message": "countries is required"}), 400
+		if len(countries) > EDGAR_BATCH_MAX_COUNTRIES or len(pollutants) > EDGAR_BATCH_MAX_POLLUTANTS:
+			return jsonify({
+				"status": "error",
+				"message": f"at most {EDGAR_BATCH_MAX_COUNTRIES} countries and {EDGAR_BATCH_MAX_POLLUTANTS} pollutants per request",
+			}), 400
+
 		try:
-			client = EDGARClient()
-			series = client.get_country_series(country, pollutant)
-			trend = client.get_country_emissions_trend(country, pollutant=pollutant, window=window)
+			series = EDGARClient().get_series_batch(countries, pollutants, window=window)
 		except FileNotFoundError:
-			# Graceful fallback when EDGAR workbook isn't available in the environment
-			series = []
-			trend = {"pollutant": pollutant, "slope": 0.0, "increase": False, "years": []}
+			series = {
+				c: {p: {"years": [], "values": [], "trend": dict(empty_trend(), pollutant=p)} for p in pollutants}
+				for c in countries
+			}
 
 		return jsonify({
 			"status": "success",
-			"country": country,
-			"pollutant": pollutant,
+			"countries": countries,
+			"pollutants": pollutants,
+			"window": window,
 			"series": series,
-			"trend": trend,
 			"retrieved_at": datetime.now().isoformat(),
 			"source": os.getenv("EDGAR_XLSX_PATH") or "local:EDGAR_emiss_on_UCDB_2024.xlsx",
 		})
 	except Exception as e:
-		logger.error(f"Error in /global/edgar: {e}")
+		logger.error(f"Error in /global/edgar/batch: {e}")
 		return jsonify({"status": "error", "message": str(e)}), 500
 
 
 @global_bp.route("/global/cevs/<company_name>", methods=["GET"])
 def global_cevs(company_name: str):
+	"""CEVS score for a company.
+
+	Query params:
+	  - country: company country (enables renewables, EDGAR and policy inputs)
+	  - detail: none | summary | full (default); "full" adds the EPA and ISO record lists
+	"""
 	try:
 		country = request.args.get("country")
-		result = compute_cevs_for_company(company_name, company_country=country)
-		return jsonify({
+		detail = (request.args.get("detail") or "full").strip().lower()
+		if detail not in DETAIL_LEVELS:
+			return jsonify({"status": "error", "message": f"detail must be one of: {', '.join(DETAIL_LEVELS)}"}), 400
+		result = compute_cevs_for_company(company_name, company_country=country, detail=detail)
+		payload = {
 			"status": "success",
 			"company": company_name,
 			"country": country,
 			"score": result["score"],
 			"components": result["components"],
 			"sources": result["sources"],
-			"details": result["details"],
 			"retrieved_at": datetime.now().isoformat(),
-		})
+		}
+		if "details" in result:
+			payload["details"] = result["details"]
+		return jsonify(payload)
 	except Exception as e:
 		logger.error(f"Error in /global/cevs/{company_name}: {e}")
 		return jsonify({"status": "error", "message": str(e)}), 500
@@ -4,6 +4,8 @@ import os
 import sys
 from datetime import datetime
 
+from api.services.dataset_scheduler import scheduler
+
 health_bp = Blueprint("health_bp", __name__)
 
 @health_bp.route("/health", methods=["GET"])
@@ -53,6 +55,19 @@ health_bp = Blueprint("health_bp", __name__)
                                 'example': 'active'
                             }
                         }
+                    },
+                    'datasets': {
+                        'type': 'object',
+                        'description': 'Background prefetch state and per-dataset load time, version and last success',
+                        'properties': {
+                            'prefetch': {
+                                'type': 'string',
+                                'example': 'running'
+                            },
+                            'sources': {
+                                'type': 'object'
+                            }
+                        }
                     }
                 }
             }
@@ -81,6 +96,10 @@ def health_check():
             "api_server": "running",
             "security": "enabled" if os.getenv("API_KEYS") else "disabled",
             "rate_limiting": "active"
+        },
+        "datasets": {
+            "prefetch": "running" if scheduler.started else "disabled",
+            "sources": scheduler.status(),
         }
     }
     
@@ -95,12 +114,41 @@ def health_check():
     return jsonify(health_status), 200
 
 @health_bp.route("/ready", methods=["GET"])  
+@swag_from({
+    'tags': ['Health'],
+    'summary': 'Readiness Check Endpoint',
+    'description': 'Returns 503 while the datasets listed in READY_REQUIRED_DATASETS (default: epa, edgar, eea_renewables, iso) are still warming, so the load balancer only routes traffic to warm workers. After READY_TIMEOUT seconds the worker reports "degraded" with 200 and serves the missing datasets on demand.',
+    'responses': {
+        200: {
+            'description': 'Required datasets are loaded (status "ready") or the warm-up timeout expired (status "degraded")',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'status': {'type': 'string', 'example': 'ready'},
+                    'required': {'type': 'array', 'items': {'type': 'string'}, 'example': ['epa', 'edgar', 'eea_renewables', 'iso']},
+                    'pending': {'type': 'array', 'items': {'type': 'string'}},
+                    'errors': {'type': 'object'},
+                    'elapsed': {'type': 'number', 'example': 4.2},
+                    'timeout': {'type': 'number', 'example': 120}
+                }
+            }
+        },
+        503: {
+            'description': 'Required datasets are still warming (status "warming")'
+        }
+    }
+})
 def readiness_check():
     """
     Kubernetes/container readiness check.
-    Simple endpoint that returns 200 when service is ready to accept traffic.
+    Returns 200 once every required dataset has loaded successfully. While background
+    prefetch is still warming them it returns 503 with the pending datasets.
     """
-    return jsonify({"status": "ready"}), 200
+    if not scheduler.started:
+        # Prefetch disabled: datasets load lazily on first use
+        return jsonify({"status": "ready"}), 200
+    readiness = scheduler.readiness()
+    return jsonify(readiness), (503 if readiness["status"] == "warming" else 200)
 
 @health_bp.route("/live", methods=["GET"])
 def liveness_check():
@@ -1,41 +1,54 @@
 from flask import Blueprint, jsonify, request, current_app
-from datetime import datetime
 import urllib.parse
 import logging
 
-from api.clients.global_client import KLHKClient
+from api.clients.global_client import KLHKClient, fetch_epa_permits
 from api.utils import cache as cache_util
+from api.utils.export import ExportFormatError, export_response, parse_export_format
+from api.utils.http_cache import conditional_response
+from api.utils.json_provider import json_body_response, page_cache
+from api.utils.projection import ProjectionError, compact_records, parse_projection, select_fields
 
 permits_bp = Blueprint("permits_bp", __name__)
 
 logger = logging.getLogger(__name__)
 
-def _fetch_and_normalize():
-	"""Fetcher used by cache layer to get fresh data and normalize to schema."""
-	logger.info("Fetching fresh EPA emissions data")
-	client = KLHKClient()
-	try:
-		raw = client.get_status_sk(plain=False)
-		data = raw if (raw and isinstance(raw, list)) else client.create_sample_data()
-	except Exception as e:
-		logger.error(f"Error fetching EPA data: {e}")
-		data = client.create_sample_data()
-
-	# Normalize via client helper (uses ensure_epa_emission_schema)
-	normalized = client.format_permit_data(data)
-	return normalized
-
-
-def _get_cached_data():
-	data = cache_util.get_or_set(_fetch_and_normalize)
+def _get_snapshot(view="full"):
+	"""Cached permit data with the snapshot (timestamp, retrieved_at) it belongs to."""
+	snap = cache_util.get_snapshot(fetch_epa_permits)
+	data = snap.data
+	if view == "compact":
+		# Precomputed once per cache refresh rather than per request
+		data = cache_util.get_derived("compact", compact_records, snapshot=snap)
 	# Update app config timestamp for health
-	ts = cache_util.get_cache_timestamp()
-	if ts:
-		try:
-			current_app.config["CACHE_TIMESTAMP"] = ts
-		except Exception:
-			pass
-	return data
+	try:
+		current_app.config["CACHE_TIMESTAMP"] = snap.timestamp
+	except Exception:
+		pass
+	return snap, data
+
+
+def _get_cached_data(view="full"):
+	return _get_snapshot(view)[1]
+
+
+def _permits_page(data, page, limit, projection, retrieved_at):
+	"""Payload of one /permits page."""
+	start_idx = (page - 1) * limit
+	end_idx = start_idx + limit
+	return {
+		'status': 'success',
+		'data': select_fields(data[start_idx:end_idx], projection.fields),
+		'pagination': {
+			'page': page,
+			'limit': limit,
+			'total_records': len(data),
+			'total_pages': (len(data) + limit - 1) // limit,
+			'has_next': end_idx < len(data),
+			'has_prev': page > 1
+		},
+		'retrieved_at': retrieved_at
+	}
 
 
 @permits_bp.route('/permits', methods=['GET'])
@@ -50,31 +63,45 @@ def get_all_permits():
 		if limit < 1 or limit > 100:
 			limit = 50
 
-		data = _get_cached_data()
+		projection = parse_projection(request.args)
+		# Data and version come from one snapshot, so a refresh cannot pair them up wrongly
+		snap, data = _get_snapshot(projection.view)
 
-		start_idx = (page - 1) * limit
-		end_idx = start_idx + limit
-		paginated_data = data[start_idx:end_idx]
+		# Pages only change when the cached dataset is refreshed; serve them pre-serialized
+		version = snap.timestamp
 
-		return jsonify({
-			'status': 'success',
-			'data': paginated_data,
-			'pagination': {
-				'page': page,
-				'limit': limit,
-				'total_records': len(data),
-				'total_pages': (len(data) + limit - 1) // limit,
-				'has_next': end_idx < len(data),
-				'has_prev': page > 1
-			},
-			'retrieved_at': datetime.now().isoformat()
-		})
+		def render():
+			key = ('permits', page, limit, projection)
+			return json_body_response(page_cache.get_or_render(version, key, lambda: _permits_page(data, page, limit, projection, snap.retrieved_at)))
+
+		return conditional_response(version, render)
 
+	except ProjectionError as e:
+		return jsonify({'status': 'error', 'message': str(e)}), 400
 	except Exception as e:
 		logger.error(f"Error in get_all_permits: {e}")
 		return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@permits_bp.route('/permits/export', methods=['GET'])
+def export_permits():
+	"""Stream the whole cached permit dataset as NDJSON (default), CSV or Parquet.
+
+	Query params: format=ndjson|csv|parquet, view=full|compact, fields=...
+	"""
+	try:
+		fmt = parse_export_format(request.args.get('format'))
+		projection = parse_projection(request.args)
+		data = _get_cached_data(projection.view)
+		return export_response(data, fmt, projection=projection, filename='permits', compacted=True)
+
+	except (ExportFormatError, ProjectionError) as e:
+		return jsonify({'status': 'error', 'message': str(e)}), 400
+	except Exception as e:
+		logger.error(f"Error in export_permits: {e}")
+		return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 @permits_bp.route('/permits/search', methods=['GET'])
 def search_permits():
 	"""Search permits by company name or other parameters."""
@@ -89,7 +116,8 @@ def search_permits():
 				'message': 'At least one search parameter required (nama, jenis, or status)'
 			}), 400
 
-		data = _get_cached_data()
+		projection = parse_projection(request.args)
+		snap, data = _get_snapshot(projection.view)
 		filtered_data = []
 
 		for permit in data:
@@ -115,16 +143,18 @@ def search_permits():
 
 		return jsonify({
 			'status': 'success',
-			'data': filtered_data,
+			'data': select_fields(filtered_data, projection.fields),
 			'search_params': {
 				'nama': nama,
 				'jenis': jenis,
 				'status': status
 			},
 			'total_found': len(filtered_data),
-			'retrieved_at': datetime.now().isoformat()
+			'retrieved_at': snap.retrieved_at
 		})
 
+	except ProjectionError as e:
+		return jsonify({'status': 'error', 'message': str(e)}), 400
 	except Exception as e:
 		logger.error(f"Error in search_permits: {e}")
 		return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -134,19 +164,22 @@ def search_permits():
 def get_active_permits():
 	"""Get only active permits."""
 	try:
-		data = _get_cached_data()
+		projection = parse_projection(request.args)
+		snap, data = _get_snapshot(projection.view)
 
 		client = KLHKClient()
 		active_permits = client.filter_active_permits(data)
 
 		return jsonify({
 			'status': 'success',
-			'data': active_permits,
+			'data': select_fields(active_permits, projection.fields),
 			'total_active': len(active_permits),
 			'total_all': len(data),
-			'retrieved_at': datetime.now().isoformat()
+			'retrieved_at': snap.retrieved_at
 		})
 
+	except ProjectionError as e:
+		return jsonify({'status': 'error', 'message': str(e)}), 400
 	except Exception as e:
 		logger.error(f"Error in get_active_permits: {e}")
 		return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -157,19 +190,22 @@ def get_permits_by_company(company_name):
 	"""Get permits for a specific company."""
 	try:
 		company_name = urllib.parse.unquote(company_name)
-		data = _get_cached_data()
+		projection = parse_projection(request.args)
+		snap, data = _get_snapshot(projection.view)
 
 		client = KLHKClient()
 		company_permits = client.search_permits_by_company(company_name, data)
 
 		return jsonify({
 			'status': 'success',
-			'data': company_permits,
+			'data': select_fields(company_permits, projection.fields),
 			'company_name': company_name,
 			'total_found': len(company_permits),
-			'retrieved_at': datetime.now().isoformat()
+			'retrieved_at': snap.retrieved_at
 		})
 
+	except ProjectionError as e:
+		return jsonify({'status': 'error', 'message': str(e)}), 400
 	except Exception as e:
 		logger.error(f"Error in get_permits_by_company: {e}")
 		return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -180,7 +216,8 @@ def get_permits_by_type(permit_type):
 	"""Get permits by permit type."""
 	try:
 		permit_type = urllib.parse.unquote(permit_type)
-		data = _get_cached_data()
+		projection = parse_projection(request.args)
+		snap, data = _get_snapshot(projection.view)
 
 		type_permits = []
 		for permit in data:
@@ -190,47 +227,53 @@ def get_permits_by_type(permit_type):
 
 		return jsonify({
 			'status': 'success',
-			'data': type_permits,
+			'data': select_fields(type_permits, projection.fields),
 			'permit_type': permit_type,
 			'total_found': len(type_permits),
-			'retrieved_at': datetime.now().isoformat()
+			'retrieved_at': snap.retrieved_at
 		})
 
+	except ProjectionError as e:
+		return jsonify({'status': 'error', 'message': str(e)}), 400
 	except Exception as e:
 		logger.error(f"Error in get_permits_by_type: {e}")
 		return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+def _permits_stats(data, retrieved_at):
+	"""Payload of /permits/stats."""
+	client = KLHKClient()
+	total_permits = len(data)
+	active_permits = len(client.filter_active_permits(data))
+
+	type_counts = {}
+	status_counts = {}
+	for permit in data:
+		jenis = permit.get('jenis_layanan', 'Unknown') or 'Unknown'
+		type_counts[jenis] = type_counts.get(jenis, 0) + 1
+
+		status = permit.get('status', 'Unknown') or 'Unknown'
+		status_counts[status] = status_counts.get(status, 0) + 1
+
+	return jsonify({
+		'status': 'success',
+		'statistics': {
+			'total_permits': total_permits,
+			'active_permits': active_permits,
+			'inactive_permits': total_permits - active_permits,
+			'by_permit_type': type_counts,
+			'by_status': status_counts
+		},
+		'retrieved_at': retrieved_at
+	})
+
+
 @permits_bp.route('/permits/stats', methods=['GET'])
 def get_permits_stats():
 	"""Get statistics about permits data."""
 	try:
-		data = _get_cached_data()
-
-		client = KLHKClient()
-		total_permits = len(data)
-		active_permits = len(client.filter_active_permits(data))
-
-		type_counts = {}
-		status_counts = {}
-		for permit in data:
-			jenis = permit.get('jenis_layanan', 'Unknown') or 'Unknown'
-			type_counts[jenis] = type_counts.get(jenis, 0) + 1
-
-			status = permit.get('status', 'Unknown') or 'Unknown'
-			status_counts[status] = status_counts.get(status, 0) + 1
-
-		return jsonify({
-			'status': 'success',
-			'statistics': {
-				'total_permits': total_permits,
-				'active_permits': active_permits,
-				'inactive_permits': total_permits - active_permits,
-				'by_permit_type': type_counts,
-				'by_status': status_counts
-			},
-			'retrieved_at': datetime.now().isoformat()
-		})
+		snap, data = _get_snapshot()
+		return conditional_response(snap.timestamp, lambda: _permits_stats(data, snap.retrieved_at))
 
 	except Exception as e:
 		logger.error(f"Error in get_permits_stats: {e}")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 import os
 
 from api.clients.global_client import KLHKClient as EPAClient
@@ -9,15 +9,17 @@ from api.clients.iso_client import ISOClient
 from api.clients.eea_client import EEAClient
 from api.clients.edgar_client import EDGARClient
 from api.utils.policy import load_best_practices, practices_for_country
+from api.utils.schema import epa_company_name
+from api.utils.trend import empty_trend
 
 logger = logging.getLogger(__name__)
 
+# How much of the supporting data compute_cevs_for_company returns under "details"
+DETAIL_LEVELS = ("none", "summary", "full")
 
-def _normalize_name(name: Optional[str]) -> str:
-    return (name or "").strip().lower()
 
-
-def compute_cevs_for_company(company_name: str, *, company_country: Optional[str] = None) -> Dict[str, Any]:
+def compute_cevs_for_company(company_name: str, *, company_country: Optional[str] = None,
+                             detail: str = "full") -> Dict[str, Any]:
     """Compute a simple CEVS score by combining EPA, ISO, and EEA data.
 
     Current heuristic:
@@ -25,42 +27,48 @@ def compute_cevs_for_company(company_name: str, *, company_country: Optional[str
       - +30 if company has ISO 14001 certification
       - - up to 30 penalty based on EPA results count in the company's state (proxy via name contains)
       - + up to 20 boost for EEA indicator improvements (placeholder)
+
+    `detail` controls the "details" entry: "none" omits it, "summary" keeps the
+    renewables/pollution/policy breakdowns, "full" adds the matched EPA records and
+    the country's ISO records. Those lists are only built for "full".
     """
-    company_key = _normalize_name(company_name)
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail must be one of: {', '.join(DETAIL_LEVELS)}")
 
-    # EPA: use permits data normalized list, then filter by company name
+    # EPA: match the company on the raw records; only matches are normalized, and only for details
     epa_client = EPAClient()
     # Try a short-timeout EPA fetch for responsiveness
     try:
         epa_records_raw = epa_client.get_emissions_power_plants(limit=200, timeout=5.0)
     except Exception:
         epa_records_raw = epa_client.create_sample_data()
-    epa_norm = epa_client.format_permit_data(epa_records_raw)
-    epa_matches = epa_client.search_permits_by_company(company_name, epa_norm)
+    term = company_name.lower()
+    epa_matches_raw = [
+        r for r in (epa_records_raw or [])
+        if isinstance(r, dict) and term in str(epa_company_name(r) or "").lower()
+    ]
 
-    # ISO: sample-backed; filter by country if provided, and by company name contains
-    iso_client = ISOClient()
-    iso_norm = iso_client.get_iso14001_certifications(country=company_country, limit=100)
-    has_iso = any(_normalize_name(r.get("nama_perusahaan")) and company_key in _normalize_name(r.get("nama_perusahaan")) for r in iso_norm)
+    # ISO: indexed store; filter by country if provided, and by company name contains
+    iso_store = ISOClient().get_store()
+    iso_count = iso_store.count(company_country, limit=100)
+    has_iso = iso_store.has_iso(company_name, company_country)
 
     # EEA: use new Parquet-based datasets (renewables and industrial pollution)
     eea_client = EEAClient()
     # New: country renewables row and EU average row for comparison
     renew_row = eea_client.get_country_renewables(company_country) if company_country else None
-    renew_all = eea_client.get_countries_renewables()
-    eu_row = next((r for r in renew_all if (r.get("country") or "").strip().lower() in ("eu-27", "eu27", "eu 27", "eu")), None)
+    eu_row = eea_client.get_eu_renewables()
     # New: industrial pollution timeseries/trend from EEA (global, not per company)
     pol_series = eea_client.get_industrial_pollution()
-    pol_trend = eea_client.compute_pollution_trend(pol_series) if pol_series else {"total_n": {"increase": False}, "total_p": {"increase": False}}
     # New: EDGAR country trends as fallback/augmentation if country provided
     edgar_details: Dict[str, Any] = {}
+    edgar_series: Dict[str, Dict[str, Any]] = {}
     if company_country:
         try:
             edgar_client = EDGARClient()
-            # Prefer PM2.5 and NOx as air-quality related proxies
-            pm_tr = edgar_client.compute_country_trend(company_country, pollutant="PM2.5")
-            nox_tr = edgar_client.compute_country_trend(company_country, pollutant="NOx")
-            edgar_details = {"pm25": pm_tr, "nox": nox_tr}
+            # Prefer PM2.5 and NOx as air-quality related proxies; one batch lookup serves both
+            edgar_series = edgar_client.get_series_batch([company_country], ["PM2.5", "NOx"], window=3).get(company_country, {})
+            edgar_details = {"pm25": edgar_series["PM2.5"]["trend"], "nox": edgar_series["NOx"]["trend"]}
         except Exception as e:
             logger.warning(f"EDGAR trend load failed: {e}")
 
@@ -80,7 +88,7 @@ def compute_cevs_for_company(company_name: str, *, company_country: Optional[str
         score += 30.0
 
     # EPA penalty: more matches imply more emission-related footprint; cap at 30
-    epa_penalty = min(30.0, float(len(epa_matches)) * 2.5)
+    epa_penalty = min(30.0, float(len(epa_matches_raw)) * 2.5)
     components["epa_penalty"] = -epa_penalty
     score -= epa_penalty
 
@@ -128,23 +136,15 @@ def compute_cevs_for_company(company_name: str, *, company_country: Optional[str
     else:
         chosen_source = "eea"
 
-    if chosen_source == "eea" and isinstance(pol_trend, dict):
-        def slope_for(key: str) -> Dict[str, Any]:
-            vals = [r.get(key) for r in pol_series if isinstance(r.get(key), (int, float))]
-            if len(vals) < 2:
-                return {"slope": 0.0, "increase": False}
-            sel = vals[-3:] if len(vals) >= 3 else vals
-            s = float(sel[-1] - sel[0])
-            return {"slope": s, "increase": s > 0.0}
-
+    if chosen_source == "eea":
         keys_weights = {"cd_hg_ni_pb": 6.0, "total_n": 4.0, "total_p": 4.0, "toc": 3.0}
-        trend_all: Dict[str, Any] = {}
+        trend_all: Dict[str, Any] = eea_client.compute_pollution_trend(pol_series, keys=list(keys_weights)) if pol_series else {}
         for k, w in keys_weights.items():
-            tr = slope_for(k)
-            trend_all[k] = tr
+            tr = trend_all.setdefault(k, empty_trend())
             if tr.get("increase"):
-                slope = float(tr.get("slope") or 0.0)
-                intensity = min(max(slope / 10.0, 0.0), 1.0)
+                # Scale on the window delta so penalty magnitudes stay comparable with earlier releases
+                delta = float(tr.get("delta") or 0.0)
+                intensity = min(max(delta / 10.0, 0.0), 1.0)
                 pol_penalty += w * intensity
         pol_details = {"source": "eea", "trends": trend_all, "weights": keys_weights, "scaled_penalty": round(pol_penalty, 2)}
         if edgar_details:
@@ -153,12 +153,12 @@ def compute_cevs_for_company(company_name: str, *, company_country: Optional[str
         weights = {"PM2.5": 8.0, "NOx": 7.0}
         trends: Dict[str, Any] = {}
         try:
-            edgar_client = EDGARClient()
             for pol, w in [("PM2.5", weights["PM2.5"]), ("NOx", weights["NOx"])]:
-                tr = edgar_client.get_country_emissions_trend(company_country, pollutant=pol)
-                series = edgar_client.get_country_series(company_country, pol)
-                end_val = float(series[-1]["value"]) if series else 0.0
-                delta = float(tr.get("slope") or 0.0)
+                entry = edgar_series.get(pol) or {}
+                tr = entry.get("trend") or dict(empty_trend(), pollutant=pol)
+                values = entry.get("values") or []
+                end_val = float(values[-1]) if values else 0.0
+                delta = float(tr.get("delta") or 0.0)
                 rel = (delta / max(abs(end_val), 1.0)) if tr.get("increase") else 0.0
                 intensity = min(max(rel, 0.0), 1.0)
                 pol_penalty += w * intensity
@@ -189,25 +189,36 @@ def compute_cevs_for_company(company_name: str, *, company_country: Optional[str
     # Clamp score to [0, 100]
     score = max(0.0, min(100.0, score))
 
-    return {
+    result: Dict[str, Any] = {
         "company": company_name,
         "country": company_country,
         "score": round(score, 2),
         "components": components,
         "sources": {
-            "epa_matches": len(epa_matches),
-            "iso_count": len(iso_norm),
+            "epa_matches": len(epa_matches_raw),
+            "iso_count": iso_count,
             "renewables_source": os.getenv("EEA_RENEWABLES_SOURCE") or "EEA Parquet API",
             "pollution_source": os.getenv("EEA_POLLUTION_SOURCE") or "EEA Parquet API",
             "edgar_source": os.getenv("EDGAR_XLSX_PATH") or "local:EDGAR_emiss_on_UCDB_2024.xlsx",
             "policy_source": os.getenv("POLICY_XLSX_PATH") or "local:Annex III_Best practices and justifications.xlsx",
             "pollution_trend_source": os.getenv("CEVS_POLLUTION_SOURCE") or "auto",
         },
-        "details": {
-            "epa": epa_matches,
-            "iso": iso_norm,
-            "renewables": {"country_row": renew_row, "eu_row": eu_row, "bonus_calc": renew_details},
-            "pollution_trend": pol_details or pol_trend,
-            "policy": policy_details,
-        },
     }
+    if detail == "none":
+        return result
+
+    if not pol_details:
+        pol_details = eea_client.compute_pollution_trend(pol_series) if pol_series else {"total_n": {"increase": False}, "total_p": {"increase": False}}
+    details: Dict[str, Any] = {
+        "renewables": {"country_row": renew_row, "eu_row": eu_row, "bonus_calc": renew_details},
+        "pollution_trend": pol_details,
+        "policy": policy_details,
+    }
+    if detail == "full":
+        details = {
+            "epa": epa_client.format_permit_data(epa_matches_raw),
+            "iso": iso_store.records_for(company_country, limit=100),
+            **details,
+        }
+    result["details"] = details
+    return result
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from api.clients.edgar_client import EDGARClient
+from api.clients.eea_client import EEAClient, POLLUTION_DATASET, RENEWABLES_DATASET
+from api.clients.global_client import fetch_epa_permits
+from api.clients.iso_client import ISOClient
+from api.utils import cache as cache_util
+from api.utils.dataset_cache import file_version
+from api.utils.policy import DEFAULT_POLICY_XLSX, load_best_practices
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a failed load is retried (capped by the source's own interval)
+RETRY_INTERVAL = int(os.getenv("DATASET_RETRY_INTERVAL", "300"))
+
+# Seconds after start before /ready stops waiting for required datasets (0 = wait forever)
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "120"))
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+class DatasetSource:
+    """A reference dataset the scheduler keeps warm.
+
+    `loader` loads (or revalidates) the dataset into the shared caches and returns
+    a version token (ETag, file mtime, ...) or None.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any], *, interval: int, required: bool = False) -> None:
+        self.name = name
+        self.loader = loader
+        self.interval = interval
+        self.required = required
+        self.lock = threading.Lock()
+        self.state = "pending"  # pending | loading | ready | failed
+        self.version: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.last_attempt: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.attempts = 0
+        self.next_run: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "version": self.version,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "last_attempt": _iso(self.last_attempt),
+            "last_success": _iso(self.last_success),
+            "last_error": self.last_error,
+            "refresh_interval": self.interval,
+            "next_refresh": _iso(self.next_run) if self.attempts else None,
+        }
+
+
+class DatasetScheduler:
+    """Warms reference datasets in the background and refreshes them on a schedule.
+
+    Warm-up runs every source in parallel once at start; afterwards a single daemon
+    thread re-runs each loader when its interval elapses. Loaders share the
+    process-wide dataset cache, so request handlers see warm data.
+    """
+
+    def __init__(self, *, max_workers: int = 4, ready_timeout: float = READY_TIMEOUT) -> None:
+        self.max_workers = max_workers
+        self.ready_timeout = ready_timeout
+        self._sources: Dict[str, DatasetSource] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+
+    # ---- Registration ----
+    def register(self, name: str, loader: Callable[[], Any], *, interval: int, required: bool = False) -> DatasetSource:
+        source = DatasetSource(name, loader, interval=interval, required=required)
+        self._sources[name] = source
+        return source
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    # ---- Execution ----
+    def refresh(self, name: str) -> bool:
+        """Run one source's loader now and record the outcome. Returns True on success."""
+        source = self._sources[name]
+        if not source.lock.acquire(blocking=False):
+            return False  # already running
+        try:
+            source.attempts += 1
+            source.last_attempt = time.time()
+            if source.state != "ready":
+                source.state = "loading"
+            source.last_error = None
+            t0 = time.perf_counter()
+            try:
+                version = source.loader()
+            except Exception as e:
+                source.last_error = f"{type(e).__name__}: {e}"
+                if source.state != "ready":
+                    source.state = "failed"
+                logger.warning(f"Dataset '{name}' load failed: {e}")
+                return False
+            finally:
+                # Failed sources are retried sooner than the regular refresh interval
+                delay = source.interval if source.last_error is None else min(source.interval, RETRY_INTERVAL)
+                source.next_run = time.time() + delay
+            source.load_seconds = time.perf_counter() - t0
+            source.version = None if version is None else str(version)
+            source.last_success = time.time()
+            source.state = "ready"
+            logger.info(f"Dataset '{name}' loaded in {source.load_seconds:.2f}s (version={source.version})")
+            return True
+        finally:
+            source.lock.release()
+
+    def warm_up(self) -> None:
+        """Load every registered source once, in parallel, and wait for completion."""
+        names = list(self._sources)
+        if not names:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names)), thread_name_prefix="dataset-warmup") as pool:
+            list(pool.map(self.refresh, names))
+
+    def _run(self) -> None:
+        self.warm_up()
+        while not self._stop.is_set():
+            now = time.time()
+            due = [s.name for s in self._sources.values() if s.next_run <= now]
+            for name in due:
+                if self._stop.is_set():
+                    break
+                self.refresh(name)
+            next_run = min((s.next_run for s in self._sources.values()), default=now + 60)
+            self._stop.wait(max(1.0, next_run - time.time()))
+
+    def start(self) -> None:
+        """Start background warm-up and the refresh loop (idempotent)."""
+        if self._thread is not None:
+            return
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dataset-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    # ---- Introspection ----
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: s.to_dict() for name, s in self._sources.items()}
+
+    def pending_required(self) -> List[str]:
+        """Required sources that have not loaded successfully yet."""
+        return [s.name for s in self._sources.values() if s.required and s.state != "ready"]
+
+    def timed_out(self, now: Optional[float] = None) -> bool:
+        """True once the warm-up has run longer than `ready_timeout`."""
+        if not self.ready_timeout or self.started_at is None:
+            return False
+        return ((now if now is not None else time.time()) - self.started_at) >= self.ready_timeout
+
+    def is_ready(self) -> bool:
+        return not self.pending_required() or self.timed_out()
+
+    def readiness(self) -> Dict[str, Any]:
+        """Readiness summary for /ready.
+
+        status is "ready" when every required source has loaded, "warming" while
+        some are still missing, and "degraded" when the timeout expired first
+        (traffic is accepted, missing datasets load on demand).
+        """
+        pending = self.pending_required()
+        if not pending:
+            status = "ready"
+        elif self.timed_out():
+            status = "degraded"
+        else:
+            status = "warming"
+        result: Dict[str, Any] = {"status": status, "required": [s.name for s in self._sources.values() if s.required]}
+        if pending:
+            result["pending"] = pending
+            result["errors"] = {n: self._sources[n].last_error for n in pending if self._sources[n].last_error}
+        if self.started_at is not None:
+            result["elapsed"] = round(time.time() - self.started_at, 1)
+            result["timeout"] = self.ready_timeout
+        return result
+
+
+# ---- Default sources ----
+def _load_epa() -> Optional[str]:
+    return str(int(cache_util.get_snapshot(fetch_epa_permits).timestamp))
+
+
+def _load_eea_renewables() -> Optional[str]:
+    return EEAClient().warm(RENEWABLES_DATASET, revalidate=True)
+
+
+def _load_eea_pollution() -> Optional[str]:
+    return EEAClient().warm(POLLUTION_DATASET, revalidate=True)
+
+
+def _load_iso() -> Optional[str]:
+    return ISOClient().warm()
+
+
+def _load_edgar() -> Optional[str]:
+    return EDGARClient().warm()
+
+
+def _load_policy() -> Optional[str]:
+    path = os.getenv("POLICY_XLSX_PATH") or DEFAULT_POLICY_XLSX
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Policy workbook not found: {path}")
+    load_best_practices(path)
+    return file_version(path)
+
+
+# Datasets /ready waits for unless READY_REQUIRED_DATASETS says otherwise
+DEFAULT_REQUIRED_DATASETS = "epa,edgar,eea_renewables,iso"
+
+
+def required_datasets() -> List[str]:
+    """Names from READY_REQUIRED_DATASETS (comma separated; empty = none required)."""
+    raw = os.getenv("READY_REQUIRED_DATASETS", DEFAULT_REQUIRED_DATASETS)
+    return [n.strip().lower() for n in raw.split(",") if n.strip()]
+
+
+def register_default_sources(sched: DatasetScheduler) -> DatasetScheduler:
+    """Register EPA, EEA, ISO, EDGAR and policy datasets with per-source refresh intervals."""
+    eea_interval = int(os.getenv("EEA_REFRESH_INTERVAL", os.getenv("EEA_CACHE_TTL", "86400")))
+    iso_interval = int(os.getenv("ISO_REFRESH_INTERVAL", os.getenv("ISO_REMOTE_TTL", "3600")))
+    local_interval = int(os.getenv("LOCAL_DATASET_REFRESH_INTERVAL", "3600"))
+    required = set(required_datasets())
+    sources = [
+        ("epa", _load_epa, cache_util.CACHE_DURATION),
+        ("eea_renewables", _load_eea_renewables, eea_interval),
+        ("eea_pollution", _load_eea_pollution, eea_interval),
+        ("iso", _load_iso, iso_interval),
+        ("edgar", _load_edgar, local_interval),
+        ("policy", _load_policy, local_interval),
+    ]
+    unknown = required - {name for name, _, _ in sources}
+    if unknown:
+        logger.warning(f"READY_REQUIRED_DATASETS lists unknown datasets: {sorted(unknown)}")
+    for name, loader, interval in sources:
+        sched.register(name, loader, interval=interval, required=name in required)
+    return sched
+
+
+# Process-wide scheduler; started by the WSGI/server entry points
+scheduler = register_default_sources(DatasetScheduler())
+
+
+def start_dataset_scheduler() -> DatasetScheduler:
+    """Start background prefetch unless disabled with DATASET_PREFETCH=false."""
+    if os.getenv("DATASET_PREFETCH", "true").strip().lower() in ("1", "true", "yes"):
+        scheduler.start()
+    return scheduler
+
+
+__all__ = [
+    "DatasetScheduler",
+    "DatasetSource",
+    "scheduler",
+    "register_default_sources",
+    "required_datasets",
+    "start_dataset_scheduler",
+]
@@ -3,53 +3,110 @@ Simple in-memory cache utilities for permit data.
 This module is Flask-agnostic.
 """
 
-from typing import Any, Callable, Optional
+from datetime import datetime
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
 import os
 import time
 
-# Global cache state
-_data_cache: Any = None
-_cache_timestamp: Optional[float] = None
+
+class Snapshot(NamedTuple):
+	"""Cached data together with its cache timestamp and batch `retrieved_at`."""
+	data: Any
+	timestamp: float
+	retrieved_at: str
+
+
+# Global cache state: replaced as a whole so readers never mix two refreshes
+_snapshot: Optional[Snapshot] = None
+
+# Views derived from the cached data, keyed by name -> (cache timestamp, value)
+_derived: Dict[str, Tuple[Optional[float], Any]] = {}
 
 # Default TTL (seconds)
 CACHE_DURATION: int = int(os.getenv("CACHE_DURATION", "3600"))
 
 
-def is_cache_valid(now: Optional[float] = None, ttl: Optional[int] = None) -> bool:
-	"""Return True if cache exists and is within TTL."""
-	global _cache_timestamp
-	if _cache_timestamp is None:
+def _is_fresh(snap: Optional[Snapshot], now_ts: float, ttl: Optional[int]) -> bool:
+	if snap is None:
 		return False
-	now_ts = now if now is not None else time.time()
 	dur = ttl if ttl is not None else CACHE_DURATION
-	return (now_ts - _cache_timestamp) < dur
+	return (now_ts - snap.timestamp) < dur
 
 
-def get_or_set(fetcher: Callable[[], Any], *, ttl: Optional[int] = None) -> Any:
+def is_cache_valid(now: Optional[float] = None, ttl: Optional[int] = None) -> bool:
+	"""Return True if cache exists and is within TTL."""
+	return _is_fresh(_snapshot, now if now is not None else time.time(), ttl)
+
+
+def get_snapshot(fetcher: Callable[[], Any], *, ttl: Optional[int] = None) -> Snapshot:
 	"""
-	Return cached value if valid, else fetch using fetcher(), cache it, and return it.
+	Return the cached Snapshot if valid, else fetch using fetcher(), cache and return it.
+	Use this when data and its version (timestamp, retrieved_at) must belong together.
 	"""
-	global _data_cache, _cache_timestamp
+	global _snapshot
 	now_ts = time.time()
-	if is_cache_valid(now_ts, ttl):
-		return _data_cache
+	snap = _snapshot
+	if _is_fresh(snap, now_ts, ttl):
+		return snap
 
 	data = fetcher()
-	_data_cache = data
-	_cache_timestamp = now_ts
-	return data
+	snap = Snapshot(data, now_ts, _batch_stamp(data) or datetime.fromtimestamp(now_ts).isoformat())
+	_snapshot = snap
+	_derived.clear()
+	return snap
+
+
+def get_or_set(fetcher: Callable[[], Any], *, ttl: Optional[int] = None) -> Any:
+	"""
+	Return cached value if valid, else fetch using fetcher(), cache it, and return it.
+	"""
+	return get_snapshot(fetcher, ttl=ttl).data
+
+
+def _batch_stamp(data: Any) -> Optional[str]:
+	"""The shared `retrieved_at` of a normalized batch (taken when its fetch started)."""
+	if isinstance(data, list) and data and isinstance(data[0], dict):
+		stamp = data[0].get("retrieved_at")
+		return stamp if isinstance(stamp, str) else None
+	return None
+
+
+def get_derived(name: str, builder: Callable[[Any], Any], *, snapshot: Optional[Snapshot] = None) -> Any:
+	"""
+	Return builder(cached data), computed once per cache refresh (e.g. a compact view).
+	Pass the Snapshot the caller is working with; otherwise call after get_or_set so
+	the cached data is current.
+	"""
+	snap = snapshot if snapshot is not None else _snapshot
+	if snap is None:
+		return builder(None)
+	entry = _derived.get(name)
+	if entry is not None and entry[0] == snap.timestamp:
+		return entry[1]
+	value = builder(snap.data)
+	if snap is _snapshot:
+		# Only views of the current data are kept; an outdated snapshot's view is not
+		_derived[name] = (snap.timestamp, value)
+	return value
 
 
 def clear_cache() -> None:
 	"""Clear the cache and timestamp."""
-	global _data_cache, _cache_timestamp
-	_data_cache = None
-	_cache_timestamp = None
+	global _snapshot
+	_snapshot = None
+	_derived.clear()
 
 
 def get_cache_timestamp() -> Optional[float]:
 	"""Get the last cache update timestamp (epoch seconds)."""
-	return _cache_timestamp
+	snap = _snapshot
+	return snap.timestamp if snap is not None else None
+
+
+def get_retrieved_at() -> Optional[str]:
+	"""Batch `retrieved_at` of the cached data: the same stamp its records carry."""
+	snap = _snapshot
+	return snap.retrieved_at if snap is not None else None
 
 
 def set_cache_duration(seconds: int) -> None:
@@ -0,0 +1,147 @@
+"""
+Response compression (gzip, and br when the optional `brotli` package is installed).
+
+An after_request hook negotiates Content-Encoding from Accept-Encoding and
+compresses JSON/text bodies of at least COMPRESS_MIN_SIZE bytes. Responses
+with a strong ETag identify their body, so their compressed variants are kept
+in a small LRU keyed by ETag and encoding: cached pages are compressed once
+per dataset version instead of on every request.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from flask import Flask, Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+# Compressed variants of ETag-tagged responses kept in memory
+COMPRESS_CACHE_SIZE = int(os.getenv("COMPRESS_CACHE_SIZE", "256"))
+
+COMPRESSIBLE_MIMETYPES = frozenset({
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/plain",
+})
+
+# Preferred first when the client weights them equally
+SUPPORTED_ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output byte-identical for identical input
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """ETag of the `encoding` variant of a representation tagged `etag`."""
+    return f"{etag}-{encoding}"
+
+
+class _VariantCache:
+    """LRU of compressed bodies keyed by (strong ETag, encoding)."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, etag: str, encoding: str, data: bytes) -> bytes:
+        key = (etag, encoding)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+        body = compress(data, encoding)
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = body
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+variant_cache = _VariantCache(COMPRESS_CACHE_SIZE)
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Best supported encoding the client accepts (None = send identity)."""
+    return request.accept_encodings.best_match(SUPPORTED_ENCODINGS)
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook: compress eligible responses for the negotiated encoding."""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding()
+    if encoding is None or (response.content_length or 0) < COMPRESS_MIN_SIZE:
+        return response
+
+    data = response.get_data()
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        body = variant_cache.get_or_compress(etag, encoding, data)
+        response.set_etag(variant_etag(etag, encoding))
+    else:
+        body = compress(data, encoding)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """Register response compression unless COMPRESS_ENABLED=false."""
+    enabled = os.getenv("COMPRESS_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+    app.extensions["compression"] = enabled
+    if enabled:
+        app.after_request(compress_response)
+
+
+def response_encoding() -> Optional[str]:
+    """Encoding compress_response would pick for this request (None when disabled)."""
+    if not current_app.extensions.get("compression"):
+        return None
+    return negotiate_encoding()
+
+
+__all__ = [
+    "COMPRESS_MIN_SIZE",
+    "SUPPORTED_ENCODINGS",
+    "compress",
+    "compress_response",
+    "init_compression",
+    "negotiate_encoding",
+    "response_encoding",
+    "variant_cache",
+    "variant_etag",
+]
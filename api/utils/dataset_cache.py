@@ -0,0 +1,124 @@
+"""
+Process-wide cache for reference datasets (EEA Parquet, ISO workbook/CSV, ...).
+
+Unlike functools.lru_cache on bound methods, entries are shared by every client
+instance and keyed by dataset id plus a version token (file mtime, ETag, ...),
+so a changed source is reloaded while an unchanged one is reused across requests.
+This module is Flask-agnostic.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import os
+import threading
+import time
+
+# Default TTL (seconds) and capacity, overridable per call / via env
+DATASET_CACHE_TTL: int = int(os.getenv("DATASET_CACHE_TTL", "86400"))
+DATASET_CACHE_MAX_ENTRIES: int = int(os.getenv("DATASET_CACHE_MAX_ENTRIES", "64"))
+
+
+class DatasetCache:
+	"""Thread-safe LRU cache with per-entry version and TTL.
+
+	An entry is a hit only if its version equals the requested version and it is
+	younger than its TTL. Loads for the same key are serialized so concurrent
+	requests trigger a single download/parse.
+	"""
+
+	def __init__(self, *, max_entries: int = DATASET_CACHE_MAX_ENTRIES, ttl: Optional[int] = DATASET_CACHE_TTL) -> None:
+		self.max_entries = max_entries
+		self.ttl = ttl
+		# key -> (version, loaded_at, ttl, value)
+		self._entries: "OrderedDict[Hashable, Tuple[Any, float, Optional[int], Any]]" = OrderedDict()
+		self._lock = threading.RLock()
+		# key -> [lock, holders]; only keys with a load in flight have a lock
+		self._key_locks: Dict[Hashable, List[Any]] = {}
+
+	def _lookup(self, key: Hashable, version: Any, now: float) -> Tuple[bool, Any]:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return False, None
+			ver, loaded_at, ttl, value = entry
+			if ver != version or (ttl is not None and (now - loaded_at) >= ttl):
+				return False, None
+			self._entries.move_to_end(key)
+			return True, value
+
+	def get(self, key: Hashable, *, version: Any = None, default: Any = None) -> Any:
+		"""Return the cached value for key/version, or `default`."""
+		hit, value = self._lookup(key, version, time.time())
+		return value if hit else default
+
+	def set(self, key: Hashable, value: Any, *, version: Any = None, ttl: Optional[int] = None) -> None:
+		with self._lock:
+			self._entries[key] = (version, time.time(), ttl if ttl is not None else self.ttl, value)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def get_or_load(self, key: Hashable, loader: Callable[[], Any], *, version: Any = None, ttl: Optional[int] = None) -> Any:
+		"""Return cached value if valid, else call loader(), cache and return it.
+
+		Exceptions from the loader propagate and nothing is cached.
+		"""
+		hit, value = self._lookup(key, version, time.time())
+		if hit:
+			return value
+		with self._lock:
+			slot = self._key_locks.get(key)
+			if slot is None:
+				slot = self._key_locks[key] = [threading.Lock(), 0]
+			slot[1] += 1
+		try:
+			with slot[0]:
+				# Another thread may have loaded it while we waited
+				hit, value = self._lookup(key, version, time.time())
+				if hit:
+					return value
+				value = loader()
+				self.set(key, value, version=version, ttl=ttl)
+				return value
+		finally:
+			with self._lock:
+				slot[1] -= 1
+				if slot[1] == 0:
+					del self._key_locks[key]
+
+	def entry_info(self, key: Hashable) -> Optional[Dict[str, Any]]:
+		"""Version and load time of an entry, regardless of expiry."""
+		with self._lock:
+			entry = self._entries.get(key)
+		if entry is None:
+			return None
+		ver, loaded_at, ttl, _ = entry
+		return {"version": ver, "loaded_at": loaded_at, "ttl": ttl}
+
+	def invalidate(self, key: Optional[Hashable] = None) -> None:
+		"""Drop one entry, or everything when key is None."""
+		with self._lock:
+			if key is None:
+				self._entries.clear()
+			else:
+				self._entries.pop(key, None)
+
+	def __len__(self) -> int:
+		with self._lock:
+			return len(self._entries)
+
+
+def file_version(path: str) -> Optional[str]:
+	"""Version token for a local file (mtime + size), or None if missing."""
+	try:
+		st = os.stat(path)
+	except OSError:
+		return None
+	return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+# Shared instance used by the data clients
+dataset_cache = DatasetCache()
+
+__all__ = ["DatasetCache", "dataset_cache", "file_version", "DATASET_CACHE_TTL", "DATASET_CACHE_MAX_ENTRIES"]
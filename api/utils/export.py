@@ -0,0 +1,212 @@
+"""
+Streaming export of permit-shaped records as NDJSON, CSV or Parquet, and
+Arrow IPC / Parquet bodies for `format=arrow|parquet` on the global endpoints.
+
+Records are consumed lazily in batches of EXPORT_BATCH_SIZE and every batch is
+encoded and yielded on its own (one Parquet row group per batch), so the
+response is never held in memory as a whole. CSV and Parquet columns are the
+top-level record fields; nested values (extras) are written as JSON text.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Response, current_app
+
+from api.utils.projection import Projection, project
+from api.utils.schema import PERMIT_FIELDS
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_FORMATS: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+# Binary table formats for format=arrow|parquet (json stays the default)
+TABLE_FORMATS: Dict[str, Tuple[str, str]] = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportFormatError(ValueError):
+    """Unsupported `format` query parameter."""
+
+
+def parse_export_format(value: Optional[str]) -> str:
+    fmt = (value or "ndjson").strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ExportFormatError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return fmt
+
+
+def parse_table_format(value: Optional[str]) -> Optional[str]:
+    """"arrow" or "parquet"; None for the default JSON response."""
+    fmt = (value or "json").strip().lower()
+    if fmt == "json":
+        return None
+    if fmt not in TABLE_FORMATS:
+        raise ExportFormatError(f"format must be one of: json, {', '.join(TABLE_FORMATS)}")
+    return fmt
+
+
+def export_columns(projection: Projection) -> List[str]:
+    """CSV/Parquet columns: top-level names of `fields`, else the Permit fields."""
+    if projection.fields:
+        return list(dict.fromkeys(path[0] for path in projection.fields))
+    return list(PERMIT_FIELDS)
+
+
+def _batches(records: Iterable[Dict[str, Any]], projection: Projection, compacted: bool) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(records)
+    while True:
+        batch = list(islice(it, EXPORT_BATCH_SIZE))
+        if not batch:
+            return
+        yield project(batch, projection, compacted=compacted)
+
+
+def _cell(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=str, ensure_ascii=False, sort_keys=True)
+    return str(value)
+
+
+def iter_ndjson(batches: Iterable[List[Dict[str, Any]]], dumps: Callable[[Any], bytes]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(dumps(rec) + b"\n" for rec in batch)
+
+
+def iter_csv(batches: Iterable[List[Dict[str, Any]]], columns: Sequence[str]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for batch in batches:
+        for rec in batch:
+            writer.writerow([_cell(rec.get(c)) or "" for c in columns])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file handing Parquet bytes back to the generator as they are written."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def records_table(records: Sequence[Dict[str, Any]], columns: Sequence[str]) -> pa.Table:
+    """String columns of permit-shaped records (nested values as JSON text)."""
+    schema = pa.schema([(c, pa.string()) for c in columns])
+    return pa.Table.from_pydict({c: [_cell(rec.get(c)) for rec in records] for c in columns}, schema=schema)
+
+
+def iter_parquet(batches: Iterable[List[Dict[str, Any]]], columns: Sequence[str]) -> Iterator[bytes]:
+    schema = pa.schema([(c, pa.string()) for c in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for batch in batches:
+            writer.write_table(records_table(batch, columns))
+            yield sink.pop()
+    finally:
+        writer.close()
+    yield sink.pop()
+
+
+def export_response(
+    records: Iterable[Dict[str, Any]],
+    fmt: str,
+    *,
+    projection: Projection,
+    filename: str,
+    compacted: bool = False,
+) -> Response:
+    """Streaming response of `records` in `fmt`; pass compacted=True for a precomputed compact view."""
+    batches = _batches(records, projection, compacted)
+    if fmt == "csv":
+        body = iter_csv(batches, export_columns(projection))
+    elif fmt == "parquet":
+        body = iter_parquet(batches, export_columns(projection))
+    else:
+        # Resolve the encoder now: the body is iterated after the app context is gone
+        provider = current_app.json
+        dumps = getattr(provider, "dumps_bytes", None) or (lambda obj: provider.dumps(obj).encode("utf-8"))
+        body = iter_ndjson(batches, dumps)
+    return current_app.response_class(
+        body,
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+def table_response(table: pa.Table, fmt: str, *, filename: str, metadata: Optional[Mapping[str, Any]] = None) -> Response:
+    """Arrow IPC stream or Parquet body for `table`; `metadata` values are stored as JSON in the schema."""
+    if metadata:
+        merged = dict(table.schema.metadata or {})
+        merged.update({k.encode("utf-8"): json.dumps(v, default=str).encode("utf-8") for k, v in metadata.items()})
+        table = table.replace_schema_metadata(merged)
+    if fmt == "arrow":
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        body = sink.getvalue().to_pybytes()
+    else:
+        buf = io.BytesIO()
+        pq.write_table(table, buf, compression="snappy")
+        body = buf.getvalue()
+    mimetype, ext = TABLE_FORMATS[fmt]
+    return current_app.response_class(
+        body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{ext}"'},
+    )
+
+
+__all__ = [
+    "EXPORT_BATCH_SIZE",
+    "EXPORT_FORMATS",
+    "TABLE_FORMATS",
+    "ExportFormatError",
+    "export_columns",
+    "export_response",
+    "iter_csv",
+    "iter_ndjson",
+    "iter_parquet",
+    "parse_export_format",
+    "parse_table_format",
+    "records_table",
+    "table_response",
+]
@@ -0,0 +1,68 @@
+"""
+Conditional GET support for responses that only change with their dataset.
+
+The ETag is derived from the dataset version (cache timestamp, file mtime, ...)
+plus the request path and query string, so it can be computed before the body
+is rendered; a matching If-None-Match gets a 304 without any rendering.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Any, Callable
+
+from flask import Response, current_app, g, request
+
+from api.utils.compression import response_encoding, variant_etag
+
+# Cache-Control max-age (seconds) for versioned responses
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "60"))
+
+# Query params that do not change the response body
+_IGNORED_PARAMS = frozenset({"api_key"})
+
+
+def compute_etag(version: Any) -> str:
+    """Strong ETag value (unquoted) for the current request at `version`."""
+    params = sorted((k, v) for k, v in request.args.items(multi=True) if k not in _IGNORED_PARAMS)
+    digest = hashlib.sha256(repr((request.path, str(version), params)).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def conditional_response(version: Any, render: Callable[[], Any], *, max_age: int | None = None) -> Response:
+    """Return 304 when If-None-Match matches, else render() tagged with ETag and Cache-Control.
+
+    Cache-Control is `public` for open routes and `private` when the request was
+    authenticated with an API key.
+
+    `render` returns anything a view may return; only 200 responses are tagged.
+    """
+    etag = compute_etag(version)
+    # Compressed variants carry a suffixed ETag (see api.utils.compression); one only
+    # matches when this request would be served that same encoding again
+    encoding = response_encoding()
+    candidates = (etag,) if encoding is None else (etag, variant_etag(etag, encoding))
+    matched = next((tag for tag in candidates if request.if_none_match.contains_weak(tag)), None)
+    if matched is not None:
+        resp = current_app.response_class(status=304)
+        resp.set_etag(matched)
+        if current_app.extensions.get("compression"):
+            # Same Vary as the 200 so caches key the revalidated entry per encoding
+            resp.vary.add("Accept-Encoding")
+    else:
+        resp = current_app.make_response(render())
+        if resp.status_code != 200:
+            return resp
+        resp.set_etag(etag)
+    if getattr(g, "api_key", None):
+        # API-key gated routes: only the client's own cache may store the body, so a
+        # shared cache can never replay it past the key check and rate limiting
+        resp.cache_control.private = True
+        resp.vary.update(("Authorization", "X-API-Key"))
+    else:
+        resp.cache_control.public = True
+    resp.cache_control.max_age = HTTP_CACHE_MAX_AGE if max_age is None else max_age
+    return resp
+
+
+__all__ = ["HTTP_CACHE_MAX_AGE", "compute_etag", "conditional_response"]
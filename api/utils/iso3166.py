@@ -0,0 +1,268 @@
+"""
+ISO 3166-1 country table used for country name normalization.
+
+Each row is (alpha-2, alpha-3, common name, *aliases). The common name and the
+aliases (official ISO short names, frequent spellings in EEA/EDGAR/World Bank
+exports) are matched both exactly and on word boundaries; alpha codes are only
+matched exactly. Names are written in lower case ASCII; matching folds accents
+and punctuation the same way.
+This module is Flask-agnostic.
+"""
+from __future__ import annotations
+
+from typing import Tuple
+
+ISO3166_COUNTRIES: Tuple[Tuple[str, ...], ...] = (
+    ("af", "afg", "afghanistan"),
+    ("ax", "ala", "aland islands"),
+    ("al", "alb", "albania"),
+    ("dz", "dza", "algeria"),
+    ("as", "asm", "american samoa"),
+    ("ad", "and", "andorra"),
+    ("ao", "ago", "angola"),
+    ("ai", "aia", "anguilla"),
+    ("aq", "ata", "antarctica"),
+    ("ag", "atg", "antigua and barbuda"),
+    ("ar", "arg", "argentina"),
+    ("am", "arm", "armenia"),
+    ("aw", "abw", "aruba"),
+    ("au", "aus", "australia"),
+    ("at", "aut", "austria"),
+    ("az", "aze", "azerbaijan"),
+    ("bs", "bhs", "bahamas", "the bahamas", "bahamas the"),
+    ("bh", "bhr", "bahrain"),
+    ("bd", "bgd", "bangladesh"),
+    ("bb", "brb", "barbados"),
+    ("by", "blr", "belarus"),
+    ("be", "bel", "belgium"),
+    ("bz", "blz", "belize"),
+    ("bj", "ben", "benin"),
+    ("bm", "bmu", "bermuda"),
+    ("bt", "btn", "bhutan"),
+    ("bo", "bol", "bolivia", "bolivia plurinational state of"),
+    ("bq", "bes", "bonaire sint eustatius and saba", "caribbean netherlands"),
+    ("ba", "bih", "bosnia and herzegovina", "bosnia herzegovina"),
+    ("bw", "bwa", "botswana"),
+    ("bv", "bvt", "bouvet island"),
+    ("br", "bra", "brazil"),
+    ("io", "iot", "british indian ocean territory"),
+    ("bn", "brn", "brunei", "brunei darussalam"),
+    ("bg", "bgr", "bulgaria"),
+    ("bf", "bfa", "burkina faso"),
+    ("bi", "bdi", "burundi"),
+    ("cv", "cpv", "cabo verde", "cape verde"),
+    ("kh", "khm", "cambodia"),
+    ("cm", "cmr", "cameroon"),
+    ("ca", "can", "canada"),
+    ("ky", "cym", "cayman islands"),
+    ("cf", "caf", "central african republic"),
+    ("td", "tcd", "chad"),
+    ("cl", "chl", "chile"),
+    ("cn", "chn", "china", "people s republic of china"),
+    ("cx", "cxr", "christmas island"),
+    ("cc", "cck", "cocos keeling islands", "cocos islands"),
+    ("co", "col", "colombia"),
+    ("km", "com", "comoros"),
+    ("cg", "cog", "congo", "republic of the congo", "congo rep", "congo brazzaville"),
+    ("cd", "cod", "democratic republic of the congo", "congo democratic republic of the", "congo dem rep", "dr congo", "congo kinshasa"),
+    ("ck", "cok", "cook islands"),
+    ("cr", "cri", "costa rica"),
+    ("ci", "civ", "cote d ivoire", "ivory coast"),
+    ("hr", "hrv", "croatia"),
+    ("cu", "cub", "cuba"),
+    ("cw", "cuw", "curacao"),
+    ("cy", "cyp", "cyprus"),
+    ("cz", "cze", "czech republic", "czechia"),
+    ("dk", "dnk", "denmark"),
+    ("dj", "dji", "djibouti"),
+    ("dm", "dma", "dominica"),
+    ("do", "dom", "dominican republic"),
+    ("ec", "ecu", "ecuador"),
+    ("eg", "egy", "egypt", "egypt arab rep"),
+    ("sv", "slv", "el salvador"),
+    ("gq", "gnq", "equatorial guinea"),
+    ("er", "eri", "eritrea"),
+    ("ee", "est", "estonia"),
+    ("sz", "swz", "eswatini", "swaziland"),
+    ("et", "eth", "ethiopia"),
+    ("fk", "flk", "falkland islands", "falkland islands malvinas"),
+    ("fo", "fro", "faroe islands", "faeroe islands"),
+    ("fj", "fji", "fiji"),
+    ("fi", "fin", "finland"),
+    ("fr", "fra", "france"),
+    ("gf", "guf", "french guiana"),
+    ("pf", "pyf", "french polynesia"),
+    ("tf", "atf", "french southern territories"),
+    ("ga", "gab", "gabon"),
+    ("gm", "gmb", "gambia", "the gambia", "gambia the"),
+    ("ge", "geo", "georgia"),
+    ("de", "deu", "germany"),
+    ("gh", "gha", "ghana"),
+    ("gi", "gib", "gibraltar"),
+    ("gr", "grc", "greece"),
+    ("gl", "grl", "greenland"),
+    ("gd", "grd", "grenada"),
+    ("gp", "glp", "guadeloupe"),
+    ("gu", "gum", "guam"),
+    ("gt", "gtm", "guatemala"),
+    ("gg", "ggy", "guernsey"),
+    ("gn", "gin", "guinea"),
+    ("gw", "gnb", "guinea bissau"),
+    ("gy", "guy", "guyana"),
+    ("ht", "hti", "haiti"),
+    ("hm", "hmd", "heard island and mcdonald islands"),
+    ("va", "vat", "holy see", "vatican city", "vatican"),
+    ("hn", "hnd", "honduras"),
+    ("hk", "hkg", "hong kong", "hong kong sar china", "hong kong sar"),
+    ("hu", "hun", "hungary"),
+    ("is", "isl", "iceland"),
+    ("in", "ind", "india"),
+    ("id", "idn", "indonesia"),
+    ("ir", "irn", "iran", "iran islamic republic of", "iran islamic rep"),
+    ("iq", "irq", "iraq"),
+    ("ie", "irl", "ireland", "republic of ireland"),
+    ("im", "imn", "isle of man"),
+    ("il", "isr", "israel"),
+    ("it", "ita", "italy"),
+    ("jm", "jam", "jamaica"),
+    ("jp", "jpn", "japan"),
+    ("je", "jey", "jersey"),
+    ("jo", "jor", "jordan"),
+    ("kz", "kaz", "kazakhstan"),
+    ("ke", "ken", "kenya"),
+    ("ki", "kir", "kiribati"),
+    ("kp", "prk", "north korea", "korea democratic people s republic of", "democratic people s republic of korea", "korea dem people s rep"),
+    ("kr", "kor", "south korea", "korea republic of", "republic of korea", "korea rep"),
+    ("xk", "xkx", "kosovo"),
+    ("kw", "kwt", "kuwait"),
+    ("kg", "kgz", "kyrgyzstan", "kyrgyz republic"),
+    ("la", "lao", "laos", "lao people s democratic republic", "lao pdr"),
+    ("lv", "lva", "latvia"),
+    ("lb", "lbn", "lebanon"),
+    ("ls", "lso", "lesotho"),
+    ("lr", "lbr", "liberia"),
+    ("ly", "lby", "libya"),
+    ("li", "lie", "liechtenstein"),
+    ("lt", "ltu", "lithuania"),
+    ("lu", "lux", "luxembourg"),
+    ("mo", "mac", "macao", "macau", "macao sar china"),
+    ("mg", "mdg", "madagascar"),
+    ("mw", "mwi", "malawi"),
+    ("my", "mys", "malaysia"),
+    ("mv", "mdv", "maldives"),
+    ("ml", "mli", "mali"),
+    ("mt", "mlt", "malta"),
+    ("mh", "mhl", "marshall islands"),
+    ("mq", "mtq", "martinique"),
+    ("mr", "mrt", "mauritania"),
+    ("mu", "mus", "mauritius"),
+    ("yt", "myt", "mayotte"),
+    ("mx", "mex", "mexico"),
+    ("fm", "fsm", "micronesia", "micronesia federated states of", "micronesia fed sts"),
+    ("md", "mda", "moldova", "moldova republic of", "republic of moldova"),
+    ("mc", "mco", "monaco"),
+    ("mn", "mng", "mongolia"),
+    ("me", "mne", "montenegro"),
+    ("ms", "msr", "montserrat"),
+    ("ma", "mar", "morocco"),
+    ("mz", "moz", "mozambique"),
+    ("mm", "mmr", "myanmar", "burma"),
+    ("na", "nam", "namibia"),
+    ("nr", "nru", "nauru"),
+    ("np", "npl", "nepal"),
+    ("nl", "nld", "netherlands", "the netherlands", "netherlands the"),
+    ("nc", "ncl", "new caledonia"),
+    ("nz", "nzl", "new zealand"),
+    ("ni", "nic", "nicaragua"),
+    ("ne", "ner", "niger"),
+    ("ng", "nga", "nigeria"),
+    ("nu", "niu", "niue"),
+    ("nf", "nfk", "norfolk island"),
+    ("mk", "mkd", "north macedonia", "macedonia", "republic of north macedonia", "former yugoslav republic of macedonia"),
+    ("mp", "mnp", "northern mariana islands"),
+    ("no", "nor", "norway"),
+    ("om", "omn", "oman"),
+    ("pk", "pak", "pakistan"),
+    ("pw", "plw", "palau"),
+    ("ps", "pse", "palestine", "palestine state of", "state of palestine", "west bank and gaza"),
+    ("pa", "pan", "panama"),
+    ("pg", "png", "papua new guinea"),
+    ("py", "pry", "paraguay"),
+    ("pe", "per", "peru"),
+    ("ph", "phl", "philippines"),
+    ("pn", "pcn", "pitcairn", "pitcairn islands"),
+    ("pl", "pol", "poland"),
+    ("pt", "prt", "portugal"),
+    ("pr", "pri", "puerto rico"),
+    ("qa", "qat", "qatar"),
+    ("re", "reu", "reunion"),
+    ("ro", "rou", "romania"),
+    ("ru", "rus", "russia", "russian federation"),
+    ("rw", "rwa", "rwanda"),
+    ("bl", "blm", "saint barthelemy"),
+    ("sh", "shn", "saint helena", "saint helena ascension and tristan da cunha"),
+    ("kn", "kna", "saint kitts and nevis", "st kitts and nevis"),
+    ("lc", "lca", "saint lucia", "st lucia"),
+    ("mf", "maf", "saint martin", "saint martin french part"),
+    ("pm", "spm", "saint pierre and miquelon"),
+    ("vc", "vct", "saint vincent and the grenadines", "st vincent and the grenadines"),
+    ("ws", "wsm", "samoa"),
+    ("sm", "smr", "san marino"),
+    ("st", "stp", "sao tome and principe"),
+    ("sa", "sau", "saudi arabia"),
+    ("sn", "sen", "senegal"),
+    ("rs", "srb", "serbia"),
+    ("sc", "syc", "seychelles"),
+    ("sl", "sle", "sierra leone"),
+    ("sg", "sgp", "singapore"),
+    ("sx", "sxm", "sint maarten", "sint maarten dutch part"),
+    ("sk", "svk", "slovakia", "slovak republic"),
+    ("si", "svn", "slovenia"),
+    ("sb", "slb", "solomon islands"),
+    ("so", "som", "somalia"),
+    ("za", "zaf", "south africa"),
+    ("gs", "sgs", "south georgia and the south sandwich islands"),
+    ("ss", "ssd", "south sudan"),
+    ("es", "esp", "spain"),
+    ("lk", "lka", "sri lanka"),
+    ("sd", "sdn", "sudan"),
+    ("sr", "sur", "suriname"),
+    ("sj", "sjm", "svalbard and jan mayen"),
+    ("se", "swe", "sweden"),
+    ("ch", "che", "switzerland"),
+    ("sy", "syr", "syria", "syrian arab republic"),
+    ("tw", "twn", "taiwan", "taiwan province of china"),
+    ("tj", "tjk", "tajikistan"),
+    ("tz", "tza", "tanzania", "tanzania united republic of", "united republic of tanzania"),
+    ("th", "tha", "thailand"),
+    ("tl", "tls", "timor leste", "east timor"),
+    ("tg", "tgo", "togo"),
+    ("tk", "tkl", "tokelau"),
+    ("to", "ton", "tonga"),
+    ("tt", "tto", "trinidad and tobago"),
+    ("tn", "tun", "tunisia"),
+    ("tr", "tur", "turkey", "turkiye"),
+    ("tm", "tkm", "turkmenistan"),
+    ("tc", "tca", "turks and caicos islands"),
+    ("tv", "tuv", "tuvalu"),
+    ("ug", "uga", "uganda"),
+    ("ua", "ukr", "ukraine"),
+    ("ae", "are", "united arab emirates"),
+    ("gb", "gbr", "united kingdom", "united kingdom of great britain and northern ireland", "great britain", "northern ireland"),
+    ("us", "usa", "united states", "united states of america"),
+    ("um", "umi", "united states minor outlying islands"),
+    ("uy", "ury", "uruguay"),
+    ("uz", "uzb", "uzbekistan"),
+    ("vu", "vut", "vanuatu"),
+    ("ve", "ven", "venezuela", "venezuela bolivarian republic of", "venezuela rb"),
+    ("vn", "vnm", "vietnam", "viet nam"),
+    ("vg", "vgb", "british virgin islands", "virgin islands british"),
+    ("vi", "vir", "us virgin islands", "virgin islands u s", "virgin islands us"),
+    ("wf", "wlf", "wallis and futuna"),
+    ("eh", "esh", "western sahara"),
+    ("ye", "yem", "yemen", "yemen rep"),
+    ("zm", "zmb", "zambia"),
+    ("zw", "zwe", "zimbabwe"),
+)
+
+__all__ = ["ISO3166_COUNTRIES"]
@@ -0,0 +1,146 @@
+"""
+JSON provider for the Flask app.
+
+Uses orjson when it is installed (optional dependency) and falls back to the
+stdlib encoder otherwise; select with JSON_PROVIDER=auto|orjson|stdlib.
+Output matches Flask's default provider: sorted keys, compact separators,
+indented in debug mode, and the same rendering of dates, decimals, UUIDs and
+dataclasses.
+
+Also holds a small cache of pre-serialized response bodies for pages of the
+cached datasets, which do not change until the dataset is refreshed.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from flask import Flask, Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Number of serialized pages kept by page_cache
+JSON_PAGE_CACHE_SIZE = int(os.getenv("JSON_PAGE_CACHE_SIZE", "256"))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes with orjson when available."""
+
+    def __init__(self, app: Flask, *, use_orjson: Optional[bool] = None) -> None:
+        super().__init__(app)
+        self.use_orjson = (orjson is not None) if use_orjson is None else (use_orjson and orjson is not None)
+
+    def _orjson_options(self, indent: bool = False) -> int:
+        opts = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        # Let DefaultJSONProvider.default render these so output matches the stdlib path
+        opts |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            opts |= orjson.OPT_SORT_KEYS
+        if indent:
+            opts |= orjson.OPT_INDENT_2
+        return opts
+
+    def dumps_bytes(self, obj: Any, *, indent: bool = False) -> bytes:
+        """Serialize to UTF-8 bytes (compact unless `indent`)."""
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+            except TypeError:
+                # e.g. integers beyond 64 bits; the stdlib encoder handles them
+                pass
+        if indent:
+            return self.dumps(obj, indent=2).encode("utf-8")
+        return self.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def _indent(self) -> bool:
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj, indent=self._indent()) + b"\n", mimetype=self.mimetype)
+
+
+def init_json_provider(app: Flask) -> FastJSONProvider:
+    """Install FastJSONProvider on `app` according to JSON_PROVIDER."""
+    choice = os.getenv("JSON_PROVIDER", "auto").strip().lower()
+    if choice == "orjson" and orjson is None:
+        logger.warning("JSON_PROVIDER=orjson but orjson is not installed; using the stdlib encoder")
+    provider = FastJSONProvider(app, use_orjson=choice != "stdlib")
+    app.json = provider
+    logger.info(f"JSON provider: {'orjson' if provider.use_orjson else 'stdlib json'}")
+    return provider
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize with the current app's provider as a response body would be."""
+    provider = current_app.json
+    if isinstance(provider, FastJSONProvider):
+        return provider.dumps_bytes(obj, indent=provider._indent()) + b"\n"
+    return (provider.dumps(obj) + "\n").encode("utf-8")
+
+
+class PageCache:
+    """LRU of serialized JSON bodies keyed by (dataset version, request key).
+
+    A new dataset version makes older entries unreachable; they age out of the LRU.
+    """
+
+    def __init__(self, maxsize: int = JSON_PAGE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, version: Hashable, key: Hashable, build: Callable[[], Any]) -> bytes:
+        """Return the cached body for `key`, else serialize build() and keep it."""
+        cache_key = (version, key)
+        with self._lock:
+            body = self._entries.get(cache_key)
+            if body is not None:
+                self._entries.move_to_end(cache_key)
+                return body
+        body = dumps_bytes(build())
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[cache_key] = body
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def json_body_response(body: bytes, status: int = 200) -> Response:
+    """Response for an already serialized JSON body."""
+    return current_app.response_class(body, status=status, mimetype=current_app.json.mimetype)
+
+
+page_cache = PageCache()
+
+
+__all__ = [
+    "FastJSONProvider",
+    "PageCache",
+    "dumps_bytes",
+    "init_json_provider",
+    "json_body_response",
+    "page_cache",
+]
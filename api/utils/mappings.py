@@ -4,13 +4,19 @@ This ensures reliable data joining across different data sources (EDGAR, EEA, IS
 """
 from __future__ import annotations
 
-from typing import Dict, Optional, Set
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
 import logging
+import re
+import unicodedata
+
+from api.utils.iso3166 import ISO3166_COUNTRIES
 
 logger = logging.getLogger(__name__)
 
-# Comprehensive country name mapping for consistent data joining
-# Key: normalized name, Value: set of alternative names/spellings
+# Canonical names used across the data sources, with extra spellings matched exactly.
+# Key: normalized name, Value: set of alternative names/spellings. Every other
+# ISO 3166 country comes from api.utils.iso3166 (see _build_country_tables).
 COUNTRY_NAME_MAPPING: Dict[str, Set[str]] = {
     "austria": {"austria", "at", "aut"},
     "belgium": {"belgium", "be", "bel"},
@@ -23,7 +29,7 @@ COUNTRY_NAME_MAPPING: Dict[str, Set[str]] = {
     "finland": {"finland", "fi", "fin"},
     "france": {"france", "fr", "fra"},
     "germany": {"germany", "de", "deu", "deutschland"},
-    "greece": {"greece", "gr", "grc", "hellenic republic"},
+    "greece": {"greece", "gr", "el", "grc", "hellenic republic"},
     "hungary": {"hungary", "hu", "hun"},
     "ireland": {"ireland", "ie", "irl"},
     "italy": {"italy", "it", "ita"},
@@ -66,17 +72,110 @@ COUNTRY_NAME_MAPPING: Dict[str, Set[str]] = {
     "ukraine": {"ukraine", "ua", "ukr"},
 }
 
-# Reverse mapping for fast lookup
-_REVERSE_MAPPING: Dict[str, str] = {}
-for canonical, variants in COUNTRY_NAME_MAPPING.items():
-    for variant in variants:
-        _REVERSE_MAPPING[variant.lower().strip()] = canonical
+# Bounded memo for normalize_country_name, keyed by raw input
+COUNTRY_CACHE_SIZE: int = 4096
+
+
+def _fold(text: str) -> str:
+    """Lower-case ASCII words: accents stripped, punctuation collapsed to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    ascii_text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", ascii_text).split())
+
+
+def _build_country_tables() -> Tuple[Dict[str, str], Dict[str, List[Tuple[Tuple[str, ...], str]]]]:
+    """Exact alias table and word-phrase table, built once at import.
+
+    Canonical keys of COUNTRY_NAME_MAPPING are kept (joined via the alpha-3 code)
+    so existing country-keyed caches stay valid; other ISO 3166 countries use
+    their common name in snake_case.
+    """
+    legacy_by_alpha3 = {
+        variant: canonical
+        for canonical, variants in COUNTRY_NAME_MAPPING.items()
+        for variant in variants
+        if len(variant) == 3
+    }
+    exact: Dict[str, str] = {}
+    phrases: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+    for alpha2, alpha3, *names in ISO3166_COUNTRIES:
+        canonical = legacy_by_alpha3.get(alpha3) or _fold(names[0]).replace(" ", "_")
+        for alias in (alpha2, alpha3, canonical.replace("_", " "), *names):
+            exact.setdefault(_fold(alias), canonical)
+        for name in names:
+            words = tuple(_fold(name).split())
+            phrases.setdefault(words[0], []).append((words, canonical))
+    # Legacy spellings (deutschland, holland, uk, ...) match exactly only
+    for canonical, variants in COUNTRY_NAME_MAPPING.items():
+        for variant in (canonical, *variants):
+            exact.setdefault(_fold(variant.replace("_", " ")), canonical)
+    for candidates in phrases.values():
+        candidates.sort(key=lambda item: len(item[0]), reverse=True)
+    return exact, phrases
+
+
+# Exact lookup: folded alpha-2/alpha-3 codes, names and aliases -> canonical name
+_REVERSE_MAPPING: Dict[str, str]
+# Word-boundary lookup: first word -> [(name words, canonical)], longest first
+_PHRASES_BY_FIRST_WORD: Dict[str, List[Tuple[Tuple[str, ...], str]]]
+_REVERSE_MAPPING, _PHRASES_BY_FIRST_WORD = _build_country_tables()
+
+_VARIANTS_BY_CANONICAL: Dict[str, Set[str]] = {}
+for _alias, _canonical in _REVERSE_MAPPING.items():
+    _VARIANTS_BY_CANONICAL.setdefault(_canonical, set()).add(_alias)
+
+
+# Sub-national places whose names contain a country name; words inside one of
+# these never count as that country ("New Jersey" is not Jersey)
+_SUBNATIONAL_PHRASES: Tuple[Tuple[str, ...], ...] = (
+    ("new", "jersey"),
+    ("jersey", "city"),
+    ("new", "mexico"),
+    ("new", "guinea"),
+)
+
+
+def _subnational_spans(words: List[str]) -> List[Tuple[int, int]]:
+    spans = []
+    for i in range(len(words)):
+        for phrase in _SUBNATIONAL_PHRASES:
+            if tuple(words[i:i + len(phrase)]) == phrase:
+                spans.append((i, i + len(phrase)))
+    return spans
+
+
+def _match_country_words(folded: str) -> Optional[str]:
+    """Canonical name of the longest country name occurring as whole words.
+
+    Ties go to the earliest occurrence, so "Taiwan, China" is Taiwan and
+    "Equatorial Guinea" never resolves to Guinea. Names inside a known
+    sub-national place (_SUBNATIONAL_PHRASES) are skipped. Codes are never
+    matched here.
+    """
+    words = folded.split()
+    excluded = _subnational_spans(words)
+    best: Optional[Tuple[int, str]] = None
+    for i, word in enumerate(words):
+        for phrase, canonical in _PHRASES_BY_FIRST_WORD.get(word, ()):
+            n = len(phrase)
+            if tuple(words[i:i + n]) == phrase:
+                if any(start <= i and i + n <= end for start, end in excluded):
+                    continue
+                if best is None or n > best[0]:
+                    best = (n, canonical)
+                break
+    return best[1] if best else None
 
 
 def normalize_country_name(country: Optional[str]) -> Optional[str]:
     """
     Normalize country name to a canonical form for consistent data joining.
     
+    Matches ISO 3166 alpha-2/alpha-3 codes, names and known aliases exactly, then
+    country names appearing as whole words (e.g. "Germany (until 1990 ...)").
+    Unknown names are returned cleaned and snake_cased; there is no substring
+    matching, so "Indonesia" can no longer resolve to India.
+    
     Args:
         country: Raw country name from any data source
         
@@ -93,21 +192,20 @@ def normalize_country_name(country: Optional[str]) -> Optional[str]:
     """
     if not country:
         return None
-    
+    return _normalize_country_cached(country)
+
+
+@lru_cache(maxsize=COUNTRY_CACHE_SIZE)
+def _normalize_country_cached(country: str) -> str:
     # Clean and normalize input
     cleaned = country.strip().lower()
     cleaned = cleaned.replace("-", " ").replace("_", " ")
+    folded = _fold(cleaned)
     
-    # Direct lookup
-    canonical = _REVERSE_MAPPING.get(cleaned)
+    canonical = _REVERSE_MAPPING.get(folded) or _match_country_words(folded)
     if canonical:
         return canonical
     
-    # Partial matching for common patterns
-    for variant, canonical in _REVERSE_MAPPING.items():
-        if cleaned in variant or variant in cleaned:
-            return canonical
-    
     # Log unmapped countries for future improvement
     logger.debug(f"Unmapped country name: '{country}' -> '{cleaned}'")
     
@@ -123,9 +221,9 @@ def get_country_variants(canonical_name: str) -> Set[str]:
         canonical_name: Canonical country name
         
     Returns:
-        Set of all known variants/spellings
+        Set of all known variants/spellings (folded to lower-case ASCII)
     """
-    return COUNTRY_NAME_MAPPING.get(canonical_name, {canonical_name})
+    return set(_VARIANTS_BY_CANONICAL.get(canonical_name, {canonical_name}))
 
 
 # Pollutant mapping for EDGAR client consistency
@@ -5,6 +5,8 @@ from typing import Any, Dict, List, Optional
 
 from openpyxl import load_workbook  # type: ignore
 
+from api.utils.dataset_cache import dataset_cache, file_version
+
 
 DEFAULT_POLICY_XLSX = os.path.join(
     os.getcwd(), "reference", "Annex III_Best practices and justifications.xlsx"
@@ -28,6 +30,15 @@ def load_best_practices(path: Optional[str] = None, sheet_name: str = "Best prac
     p = path or os.getenv("POLICY_XLSX_PATH") or DEFAULT_POLICY_XLSX
     if not os.path.exists(p):
         return []
+    # Cached per file path + mtime; callers must treat the rows as read-only
+    return dataset_cache.get_or_load(
+        ("policy:xlsx", p, sheet_name),
+        lambda: _read_best_practices(p, sheet_name),
+        version=file_version(p),
+    )
+
+
+def _read_best_practices(p: str, sheet_name: str) -> List[Dict[str, Any]]:
     wb = load_workbook(p, read_only=True, data_only=True)
     if sheet_name not in wb.sheetnames:
         # fallback to first sheet
@@ -0,0 +1,92 @@
+"""
+Response projection for permit-shaped records (`view=` and `fields=` query params).
+
+`view=compact` drops `extras.raw` (the copy of every upstream column);
+`fields=a,b,extras.state` keeps only the listed keys, dotted names reaching
+into nested dicts. Projection runs on the record lists before JSON encoding.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+VIEWS = ("full", "compact")
+
+
+class ProjectionError(ValueError):
+	"""Invalid `view` / `fields` query parameter."""
+
+
+class Projection(NamedTuple):
+	view: str = "full"
+	fields: Tuple[Tuple[str, ...], ...] = ()
+
+	@property
+	def compact(self) -> bool:
+		return self.view == "compact"
+
+
+def parse_projection(args: Mapping[str, Any]) -> Projection:
+	"""Read `view` and `fields` from request args."""
+	view = str(args.get("view") or "full").strip().lower()
+	if view not in VIEWS:
+		raise ProjectionError(f"view must be one of: {', '.join(VIEWS)}")
+	names = [f.strip() for f in str(args.get("fields") or "").split(",") if f.strip()]
+	fields = tuple(tuple(name.split(".")) for name in dict.fromkeys(names))
+	if any("" in path for path in fields):
+		raise ProjectionError("fields must be comma separated names, e.g. nama_perusahaan,extras.state")
+	return Projection(view, fields)
+
+
+def compact_record(record: Dict[str, Any]) -> Dict[str, Any]:
+	"""Record without `extras.raw` (returned as-is when there is nothing to drop)."""
+	extras = record.get("extras")
+	if not isinstance(extras, dict) or "raw" not in extras:
+		return record
+	out = dict(record)
+	out["extras"] = {k: v for k, v in extras.items() if k != "raw"}
+	return out
+
+
+def compact_records(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+	return [compact_record(r) for r in records]
+
+
+def _select(record: Dict[str, Any], fields: Tuple[Tuple[str, ...], ...]) -> Dict[str, Any]:
+	out: Dict[str, Any] = {}
+	for path in fields:
+		value: Any = record
+		for key in path:
+			if not isinstance(value, dict) or key not in value:
+				break
+			value = value[key]
+		else:
+			dst = out
+			for key in path[:-1]:
+				dst = dst.setdefault(key, {})
+			dst[path[-1]] = value
+	return out
+
+
+def select_fields(records: Iterable[Dict[str, Any]], fields: Tuple[Tuple[str, ...], ...]) -> List[Dict[str, Any]]:
+	"""Keep only `fields` (parsed paths) in each record; missing fields are omitted."""
+	if not fields:
+		return list(records)
+	return [_select(r, fields) for r in records]
+
+
+def project(records: Iterable[Dict[str, Any]], projection: Projection, *, compacted: bool = False) -> List[Dict[str, Any]]:
+	"""Apply `projection` to records; pass compacted=True when they already come from a compact view."""
+	if projection.compact and not compacted:
+		records = compact_records(records)
+	return select_fields(records, projection.fields)
+
+
+__all__ = [
+	"VIEWS",
+	"Projection",
+	"ProjectionError",
+	"parse_projection",
+	"compact_record",
+	"compact_records",
+	"select_fields",
+	"project",
+]
@@ -1,11 +1,19 @@
 """
 Permit data schema and normalization helpers.
+
+`retrieved_at` is the time a batch was fetched: batch normalizers stamp it once
+and share the same string across all records of the batch.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, fields
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+
+def now_iso() -> str:
+	"""Current local time as an ISO-8601 string (one stamp per fetched batch)."""
+	return datetime.now().isoformat()
 
 
 @dataclass
@@ -18,7 +26,7 @@ class Permit:
 	judul_kegiatan: Optional[str] = None
 	status: Optional[str] = None
 	source: str = "PTSP MENLHK"
-	retrieved_at: str = datetime.now().isoformat()
+	retrieved_at: str = field(default_factory=now_iso)
 	extras: Dict[str, Any] = field(default_factory=dict)
 
 	def to_dict(self) -> Dict[str, Any]:
@@ -37,7 +45,7 @@ class EPAEmission:
 	emissions: Optional[float] = None
 	unit: Optional[str] = None
 	source: str = "EPA Envirofacts"
-	retrieved_at: str = datetime.now().isoformat()
+	retrieved_at: str = field(default_factory=now_iso)
 	raw: Dict[str, Any] = field(default_factory=dict)
 
 	def to_dict(self) -> Dict[str, Any]:
@@ -51,7 +59,7 @@ class ISOCert:
 	certificate: Optional[str] = None
 	valid_until: Optional[str] = None
 	source: str = "ISO"
-	retrieved_at: str = datetime.now().isoformat()
+	retrieved_at: str = field(default_factory=now_iso)
 	raw: Dict[str, Any] = field(default_factory=dict)
 
 	def to_dict(self) -> Dict[str, Any]:
@@ -66,130 +74,255 @@ class EEAEnv:
 	value: Optional[float] = None
 	unit: Optional[str] = None
 	source: str = "EEA"
-	retrieved_at: str = datetime.now().isoformat()
+	retrieved_at: str = field(default_factory=now_iso)
 	raw: Dict[str, Any] = field(default_factory=dict)
 
 	def to_dict(self) -> Dict[str, Any]:
 		return asdict(self)
 
 
-def ensure_permit_schema(record: Dict[str, Any]) -> Dict[str, Any]:
+# Key layout shared by every Permit-shaped record (same order as the dataclass)
+PERMIT_FIELDS = tuple(f.name for f in fields(Permit))
+
+
+def _permit_record(
+	nama_perusahaan: Any = None,
+	alamat: Any = None,
+	jenis_layanan: Any = None,
+	nomor_sk: Any = None,
+	tanggal_berlaku: Any = None,
+	judul_kegiatan: Any = None,
+	status: Any = None,
+	source: str = Permit.source,
+	extras: Optional[Dict[str, Any]] = None,
+	retrieved_at: Optional[str] = None,
+) -> Dict[str, Any]:
+	"""Permit-shaped dict built directly, without a dataclass and asdict() deep copy.
+
+	`extras` is stored as given; callers pass freshly built dicts. A missing
+	`retrieved_at` is stamped now.
+	"""
+	return {
+		"nama_perusahaan": nama_perusahaan,
+		"alamat": alamat,
+		"jenis_layanan": jenis_layanan,
+		"nomor_sk": nomor_sk,
+		"tanggal_berlaku": tanggal_berlaku,
+		"judul_kegiatan": judul_kegiatan,
+		"status": status,
+		"source": source,
+		"retrieved_at": retrieved_at or now_iso(),
+		"extras": {} if extras is None else extras,
+	}
+
+
+def _pick(record: Dict[str, Any], keys) -> Any:
+	for k in keys:
+		if k in record and record[k] not in (None, ""):
+			return record[k]
+	return None
+
+
+def ensure_permit_schema(record: Dict[str, Any], *, retrieved_at: Optional[str] = None) -> Dict[str, Any]:
 	"""Map a loose record to our standard Permit fields with sensible defaults."""
 	if not isinstance(record, dict):
-		return Permit().to_dict()
+		return _permit_record(retrieved_at=retrieved_at)
+
+	return _permit_record(
+		nama_perusahaan=_pick(record, ["nama_perusahaan", "perusahaan", "nama", "pemohon", "company_name"]),
+		alamat=_pick(record, ["alamat", "address", "lokasi"]),
+		jenis_layanan=_pick(record, ["jenis_layanan", "layanan", "service_type", "jenis"]),
+		nomor_sk=_pick(record, ["nomor_sk", "no_sk", "sk_number", "nomor"]),
+		tanggal_berlaku=_pick(record, ["tanggal_berlaku", "berlaku", "valid_date", "tanggal"]),
+		judul_kegiatan=_pick(record, ["judul_kegiatan", "kegiatan", "activity", "judul"]),
+		status=_pick(record, ["status", "keaktifan"]),
+		retrieved_at=retrieved_at)
+
+
+_ISO_MAPPED_KEYS = frozenset({"company", "organization", "country", "certificate", "standard", "valid_until", "expiry"})
+_EEA_MAPPED_KEYS = frozenset({"country", "indicator", "year", "value", "unit"})
+
+# EPA source columns, in order of preference, for each normalized field
+_EPA_COMPANY_KEYS = ("facility_name", "plant_name", "company_name", "nama_perusahaan", "facility")
+_EPA_STATE_KEYS = ("state", "state_name", "state_abbr")
+_EPA_COUNTY_KEYS = ("county", "county_name")
+_EPA_PLANT_ID_KEYS = ("plant_id", "facility_id", "tri_facility_id", "registry_id")
+_EPA_MAPPED_KEYS = frozenset({"facility_name", "plant_name", "company_name", "state", "county", "year", "pollutant", "emissions", "unit", "plant_id", "facility_id"})
+
+
+def epa_company_name(record: Dict[str, Any]) -> Any:
+	"""Name an EPA record normalizes to (`nama_perusahaan`), without normalizing it."""
+	return _pick(record, _EPA_COMPANY_KEYS)
+
+
+class _EPAPlan:
+	"""Column-to-field mapping resolved once for a record key layout.
 
-	def _pick(keys):
-		for k in keys:
-			if k in record and record[k] not in (None, ""):
-				return record[k]
-		return None
+	All rows of an efservice table share their keys, so the candidate scans and
+	the set of raw (unmapped) columns are computed once per layout instead of once
+	per row.
+	"""
 
-	mapped = Permit(
-		nama_perusahaan=_pick(["nama_perusahaan", "perusahaan", "nama", "pemohon", "company_name"]),
-		alamat=_pick(["alamat", "address", "lokasi"]),
-		jenis_layanan=_pick(["jenis_layanan", "layanan", "service_type", "jenis"]),
-		nomor_sk=_pick(["nomor_sk", "no_sk", "sk_number", "nomor"]),
-		tanggal_berlaku=_pick(["tanggal_berlaku", "berlaku", "valid_date", "tanggal"]),
-		judul_kegiatan=_pick(["judul_kegiatan", "kegiatan", "activity", "judul"]),
-		status=_pick(["status", "keaktifan"]))
+	__slots__ = ("company", "state", "county", "plant_id", "raw")
 
-	return mapped.to_dict()
+	def __init__(self, keys: Iterable[str]) -> None:
+		keys = tuple(keys)
+		present = set(keys)
+		self.company = tuple(k for k in _EPA_COMPANY_KEYS if k in present)
+		self.state = tuple(k for k in _EPA_STATE_KEYS if k in present)
+		self.county = tuple(k for k in _EPA_COUNTY_KEYS if k in present)
+		self.plant_id = tuple(k for k in _EPA_PLANT_ID_KEYS if k in present)
+		self.raw = tuple(k for k in keys if k not in _EPA_MAPPED_KEYS)
 
+	def apply(self, record: Dict[str, Any], retrieved_at: str) -> Dict[str, Any]:
+		company = None
+		for k in self.company:
+			v = record[k]
+			if v is not None and v != "":
+				company = v
+				break
+		state = None
+		for k in self.state:
+			state = record[k]
+			if state:
+				break
+		else:
+			state = record.get("state_abbr")
+		county = None
+		for k in self.county:
+			county = record[k]
+			if county:
+				break
+		else:
+			county = record.get("county_name")
+		plant_id = None
+		for k in self.plant_id:
+			plant_id = record[k]
+			if plant_id:
+				break
+		else:
+			plant_id = record.get("registry_id")
+		if county and state:
+			alamat = f"{county}, {state}"
+		elif county or state:
+			alamat = str(county or state)
+		else:
+			alamat = None
+		year = record.get("year")
+		pollutant = record.get("pollutant")
+		# Same key layout as _permit_record, built inline for the batch hot path
+		return {
+			"nama_perusahaan": company,
+			"alamat": alamat,
+			"jenis_layanan": "EPA Emission Data",
+			"nomor_sk": None,
+			"tanggal_berlaku": str(year) if year is not None else None,
+			"judul_kegiatan": str(pollutant) if pollutant is not None else None,
+			"status": None,
+			"source": "EPA Envirofacts",
+			"retrieved_at": retrieved_at,
+			"extras": {
+				"plant_id": plant_id,
+				"emissions": record.get("emissions"),
+				"unit": record.get("unit"),
+				"state": state,
+				"county": county,
+				"raw": {k: record[k] for k in self.raw},
+			},
+		}
 
-def ensure_epa_emission_schema(record: Dict[str, Any]) -> Dict[str, Any]:
+
+def ensure_epa_emission_schema(record: Dict[str, Any], *, retrieved_at: Optional[str] = None) -> Dict[str, Any]:
 	"""Normalize EPA emissions record to the Permit schema + extras."""
 	if not isinstance(record, dict):
-		return Permit().to_dict()
-
-	def _pick(keys):
-		for k in keys:
-			if k in record and record[k] not in (None, ""):
-				return record[k]
-		return None
-
-	company = _pick(["facility_name", "plant_name", "company_name", "nama_perusahaan", "facility"])
-	state = record.get("state") or record.get("state_name") or record.get("state_abbr")
-	county = record.get("county") or record.get("county_name")
-	addr_parts = [str(x) for x in [county, state] if x]
-	alamat = ", ".join(addr_parts) if addr_parts else None
-
-	mapped = Permit(
-		nama_perusahaan=company,
-		alamat=alamat,
-		jenis_layanan="EPA Emission Data",
-		nomor_sk=None,
-		tanggal_berlaku=str(record.get("year")) if record.get("year") is not None else None,
-		judul_kegiatan=str(record.get("pollutant")) if record.get("pollutant") is not None else None,
-		status=None,
-		source="EPA Envirofacts",
-		extras={
-			"plant_id": record.get("plant_id") or record.get("facility_id") or record.get("tri_facility_id") or record.get("registry_id"),
-			"emissions": record.get("emissions"),
-			"unit": record.get("unit"),
-			"state": state,
-			"county": county,
-			"raw": {k: v for k, v in record.items() if k not in {"facility_name", "plant_name", "company_name", "state", "county", "year", "pollutant", "emissions", "unit", "plant_id", "facility_id"}},
-		},
-	)
+		return _permit_record(retrieved_at=retrieved_at)
+	return _EPAPlan(record).apply(record, retrieved_at or now_iso())
 
-	return mapped.to_dict()
 
+def normalize_epa_batch(
+	records: Iterable[Any],
+	*,
+	retrieved_at: Optional[str] = None,
+	columnar: bool = False,
+) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
+	"""Normalize an EPA response, resolving the column mapping once per key layout.
 
-def ensure_iso_cert_schema(record: Dict[str, Any]) -> Dict[str, Any]:
+	Non-dict entries are skipped. With `columnar=True` the result is a dict of
+	PERMIT_FIELDS -> list of values instead of a list of records.
+	"""
+	stamp = retrieved_at or now_iso()
+	plans: Dict[Tuple[str, ...], _EPAPlan] = {}
+	out: List[Dict[str, Any]] = []
+	for rec in records:
+		if not isinstance(rec, dict):
+			continue
+		layout = tuple(rec)
+		plan = plans.get(layout)
+		if plan is None:
+			plan = plans[layout] = _EPAPlan(layout)
+		out.append(plan.apply(rec, stamp))
+	if columnar:
+		return {name: [row[name] for row in out] for name in PERMIT_FIELDS}
+	return out
+
+
+def ensure_iso_cert_schema(record: Dict[str, Any], *, retrieved_at: Optional[str] = None) -> Dict[str, Any]:
 	if not isinstance(record, dict):
 		return ISOCert().to_dict()
-	company = record.get("company") or record.get("organization")
 	country = record.get("country")
-	certificate = record.get("certificate") or record.get("standard")
-	valid_until = record.get("valid_until") or record.get("expiry")
-	mapped = ISOCert(
-		company=company,
-		country=country,
-		certificate=certificate,
-		valid_until=valid_until,
-		raw={k: v for k, v in record.items() if k not in {"company", "organization", "country", "certificate", "standard", "valid_until", "expiry"}},
-	)
-	# also provide Permit-like view
-	permit_like = Permit(
-		nama_perusahaan=company,
-		alamat=None,
+	# Permit-like view of the certificate
+	return _permit_record(
+		nama_perusahaan=record.get("company") or record.get("organization"),
 		jenis_layanan="ISO Certification",
-		nomor_sk=None,
-		tanggal_berlaku=valid_until,
-		judul_kegiatan=certificate,
-		status=None,
+		tanggal_berlaku=record.get("valid_until") or record.get("expiry"),
+		judul_kegiatan=record.get("certificate") or record.get("standard"),
 		source="ISO",
-		extras={"country": country, "raw": mapped.raw},
+		extras={"country": country, "raw": {k: v for k, v in record.items() if k not in _ISO_MAPPED_KEYS}},
+		retrieved_at=retrieved_at,
 	)
-	return permit_like.to_dict()
 
 
-def ensure_eea_env_schema(record: Dict[str, Any]) -> Dict[str, Any]:
+def ensure_eea_env_schema(record: Dict[str, Any], *, retrieved_at: Optional[str] = None) -> Dict[str, Any]:
 	if not isinstance(record, dict):
 		return EEAEnv().to_dict()
-	country = record.get("country")
-	indicator = record.get("indicator")
 	year = record.get("year")
 	value = record.get("value")
-	unit = record.get("unit")
-	mapped = EEAEnv(
-		country=country,
-		indicator=indicator,
-		year=int(year) if year is not None else None,
-		value=float(value) if value is not None else None,
-		unit=unit,
-		raw={k: v for k, v in record.items() if k not in {"country", "indicator", "year", "value", "unit"}},
-	)
+	year = int(year) if year is not None else None
 	# Permit-like normalized output
-	permit_like = Permit(
-		nama_perusahaan=None,
-		alamat=country,
+	return _permit_record(
+		alamat=record.get("country"),
 		jenis_layanan="EEA Indicator",
-		nomor_sk=None,
-		tanggal_berlaku=str(mapped.year) if mapped.year is not None else None,
-		judul_kegiatan=indicator,
-		status=None,
+		tanggal_berlaku=str(year) if year is not None else None,
+		judul_kegiatan=record.get("indicator"),
 		source="EEA",
-		extras={"value": mapped.value, "unit": mapped.unit, "raw": mapped.raw},
+		extras={
+			"value": float(value) if value is not None else None,
+			"unit": record.get("unit"),
+			"raw": {k: v for k, v in record.items() if k not in _EEA_MAPPED_KEYS},
+		},
+		retrieved_at=retrieved_at,
 	)
-	return permit_like.to_dict()
+
+
+_NORMALIZERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+	"permit": ensure_permit_schema,
+	"epa": ensure_epa_emission_schema,
+	"iso": ensure_iso_cert_schema,
+	"eea": ensure_eea_env_schema,
+}
+
+
+def normalize_many(records: Iterable[Any], kind: str = "permit", *, retrieved_at: Optional[str] = None) -> List[Dict[str, Any]]:
+	"""Normalize a batch of records with the `kind` normalizer ("permit", "epa", "iso", "eea").
+
+	Non-dict entries are skipped. Every record shares one `retrieved_at` stamp
+	(the given one, or now).
+	"""
+	try:
+		normalize = _NORMALIZERS[kind]
+	except KeyError:
+		raise ValueError(f"Unknown record kind: {kind!r}") from None
+	stamp = retrieved_at or now_iso()
+	if kind == "epa":
+		return normalize_epa_batch(records, retrieved_at=stamp)
+	return [normalize(rec, retrieved_at=stamp) for rec in records if isinstance(rec, dict)]
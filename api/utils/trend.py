@@ -0,0 +1,124 @@
+"""
+Vectorized trend statistics shared by the EDGAR, EEA and CEVS code paths.
+
+All series in a call are evaluated together with NumPy over the trailing
+`window` points of each (year, value) series:
+  - slope: ordinary least-squares slope (value units per year)
+  - delta: last value minus first value in the window
+  - pct_change: delta relative to the first value, in percent
+  - cagr: compound annual growth rate between first and last point
+  - r2: coefficient of determination of the linear fit (confidence)
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_WINDOW = 3
+
+Series = Tuple[Sequence[float], Sequence[float]]
+
+
+def empty_trend() -> Dict[str, Any]:
+	"""Trend dict returned for series with fewer than two points."""
+	return {
+		"slope": 0.0,
+		"delta": 0.0,
+		"pct_change": None,
+		"cagr": None,
+		"r2": None,
+		"increase": False,
+		"years": [],
+	}
+
+
+def _opt(v: float) -> Optional[float]:
+	return float(v) if np.isfinite(v) else None
+
+
+def compute_trends(series: Sequence[Series], window: int = DEFAULT_WINDOW) -> List[Dict[str, Any]]:
+	"""Compute trend statistics for many (years, values) series at once.
+
+	Each series must already be sorted by year. Non-finite values are dropped
+	before the window is applied. `window <= 0` uses the full series.
+	Returns one trend dict per input series, in input order.
+	"""
+	if not series:
+		return []
+
+	cleaned: List[Tuple[np.ndarray, np.ndarray]] = []
+	for years, values in series:
+		x = np.asarray(years, dtype=float)
+		y = np.asarray(values, dtype=float)
+		keep = np.isfinite(x) & np.isfinite(y)
+		x, y = x[keep], y[keep]
+		if window and window > 0:
+			x, y = x[-window:], y[-window:]
+		cleaned.append((x, y))
+
+	width = max((len(x) for x, _ in cleaned), default=0)
+	if width == 0:
+		return [empty_trend() for _ in cleaned]
+
+	# Right-align every series into a (n_series, width) matrix padded with NaN
+	X = np.full((len(cleaned), width), np.nan)
+	Y = np.full((len(cleaned), width), np.nan)
+	for i, (x, y) in enumerate(cleaned):
+		if len(x):
+			X[i, width - len(x):] = x
+			Y[i, width - len(y):] = y
+
+	mask = ~np.isnan(Y)
+	n = mask.sum(axis=1)
+	safe_n = np.where(n > 0, n, 1)
+	Xz = np.where(mask, X, 0.0)
+	Yz = np.where(mask, Y, 0.0)
+	x_mean = Xz.sum(axis=1) / safe_n
+	y_mean = Yz.sum(axis=1) / safe_n
+	dx = np.where(mask, X - x_mean[:, None], 0.0)
+	dy = np.where(mask, Y - y_mean[:, None], 0.0)
+	sxx = (dx * dx).sum(axis=1)
+	sxy = (dx * dy).sum(axis=1)
+	syy = (dy * dy).sum(axis=1)
+
+	first_idx = width - n
+	rows = np.arange(len(cleaned))
+	first_y = Y[rows, np.minimum(first_idx, width - 1)]
+	first_x = X[rows, np.minimum(first_idx, width - 1)]
+	last_y = Y[:, -1]
+	last_x = X[:, -1]
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		slope = np.where(sxx > 0, sxy / sxx, 0.0)
+		delta = last_y - first_y
+		pct = np.where(first_y != 0, delta / np.abs(first_y) * 100.0, np.nan)
+		span = last_x - first_x
+		growth_ok = (first_y > 0) & (last_y > 0) & (span > 0)
+		cagr = np.where(growth_ok, np.power(last_y / first_y, 1.0 / np.where(span > 0, span, 1.0)) - 1.0, np.nan)
+		r2 = np.where((sxx > 0) & (syy > 0), (sxy * sxy) / (sxx * syy), np.where(sxx > 0, 1.0, np.nan))
+
+	out: List[Dict[str, Any]] = []
+	for i, (x, _) in enumerate(cleaned):
+		if n[i] < 2:
+			out.append(empty_trend())
+			continue
+		d = float(delta[i])
+		out.append({
+			"slope": float(slope[i]),
+			"delta": d,
+			"pct_change": _opt(pct[i]),
+			"cagr": _opt(cagr[i]),
+			"r2": _opt(r2[i]),
+			"increase": d > 0.0,
+			"years": [int(v) for v in x],
+		})
+	return out
+
+
+def compute_trend(years: Sequence[float], values: Sequence[float], window: int = DEFAULT_WINDOW) -> Dict[str, Any]:
+	"""Single-series convenience wrapper around `compute_trends`."""
+	return compute_trends([(years, values)], window=window)[0]
+
+
+__all__ = ["compute_trends", "compute_trend", "empty_trend", "DEFAULT_WINDOW"]
@@ -31,6 +31,10 @@ def main():
     
     # Import after path setup
     from api.api_server import app
+    from api.services.dataset_scheduler import start_dataset_scheduler
+
+    # Warm reference datasets in the background before traffic arrives
+    start_dataset_scheduler()
     
     # Configure for production/cloud deployment
     port = int(os.environ.get('PORT', 5000))
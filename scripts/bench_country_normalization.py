@@ -0,0 +1,69 @@
+"""Throughput benchmark for api.utils.mappings.normalize_country_name.
+
+Run from the repository root:
+
+    python -m scripts.bench_country_normalization [--rows 200000]
+
+Builds a row stream resembling EDGAR/EEA/ISO country columns (ISO names, codes,
+aliases, decorated labels and unknown aggregates) and reports rows/second for a
+cold memo (every distinct value resolved once) and a warm memo.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from api.utils import mappings
+from api.utils.iso3166 import ISO3166_COUNTRIES
+
+DECORATED = [
+    "Germany (until 1990 former territory of the FRG)",
+    "Korea, Rep.",
+    "Congo, Dem. Rep.",
+    "Hong Kong SAR, China",
+    "Netherlands (the)",
+    "Côte d'Ivoire",
+    "Kosovo*",
+    "EU-27",
+    "European Union (27 countries)",
+    "World",
+]
+
+
+def build_inputs(rows: int, seed: int = 42) -> list:
+    values = list(DECORATED)
+    for alpha2, alpha3, *names in ISO3166_COUNTRIES:
+        values += [alpha2.upper(), alpha3.upper(), names[0].title(), *names[1:]]
+    rng = random.Random(seed)
+    return [rng.choice(values) for _ in range(rows)]
+
+
+def run(inputs: list) -> float:
+    t0 = time.perf_counter()
+    for value in inputs:
+        mappings.normalize_country_name(value)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    inputs = build_inputs(args.rows)
+    distinct = list(dict.fromkeys(inputs))
+
+    mappings._normalize_country_cached.cache_clear()
+    cold = run(distinct)
+    warm = run(inputs)
+    info = mappings._normalize_country_cached.cache_info()
+
+    print(f"distinct inputs : {len(distinct)}")
+    print(f"cold (uncached) : {len(distinct) / cold:,.0f} names/s ({cold * 1e6 / len(distinct):.1f} us/name)")
+    print(f"warm ({args.rows} rows): {args.rows / warm:,.0f} rows/s ({warm:.3f}s)")
+    print(f"memo            : hits={info.hits} misses={info.misses} size={info.currsize}/{info.maxsize}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+import pytest
+
+from api.utils import security
+
+
+@pytest.fixture(autouse=True)
+def _reset_rate_limits():
+    """Each test starts with an empty per-key request window (the suite shares one API key)."""
+    security._rate_limit_storage.clear()
+    yield
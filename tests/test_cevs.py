@@ -150,3 +150,47 @@ def test_data_source_consistency():
     source_descriptions = ["renewables_source", "pollution_source", "edgar_source", "policy_source"]
     for desc_key in source_descriptions:
         assert isinstance(sources[desc_key], str) and len(sources[desc_key]) > 0
+
+
+def test_detail_levels_share_score_and_build_lists_only_for_full(monkeypatch):
+    from api.clients.global_client import KLHKClient
+
+    raw = [
+        {"facility_name": "Acme Power", "state": "TX", "year": 2022},
+        {"facility_name": "", "plant_name": "acme north", "state": "CA"},
+        {"plant_name": "Other", "company_name": "Acme Holdings"},  # name resolves to "Other"
+        "not a record",
+    ]
+    monkeypatch.setattr(KLHKClient, "get_emissions_power_plants", lambda self, **kw: raw)
+    calls = []
+    original = KLHKClient.format_permit_data
+    monkeypatch.setattr(KLHKClient, "format_permit_data", lambda self, data, **kw: calls.append(len(data)) or original(self, data, **kw))
+
+    full = compute_cevs_for_company("Acme", detail="full")
+    summary = compute_cevs_for_company("Acme", detail="summary")
+    none = compute_cevs_for_company("Acme", detail="none")
+
+    assert full["score"] == summary["score"] == none["score"]
+    assert full["components"] == none["components"]
+    assert full["sources"]["epa_matches"] == 2
+    assert calls == [2]  # only the matches of the "full" call were normalized
+
+    client = KLHKClient()
+    assert full["details"]["epa"] == client.search_permits_by_company("Acme", original(client, raw, retrieved_at=full["details"]["epa"][0]["retrieved_at"]))
+    assert len(full["details"]["iso"]) == full["sources"]["iso_count"]
+    assert "epa" not in summary["details"] and "iso" not in summary["details"]
+    assert set(summary["details"]) == {"renewables", "pollution_trend", "policy"}
+    assert "details" not in none
+
+    with pytest.raises(ValueError):
+        compute_cevs_for_company("Acme", detail="everything")
+
+
+def test_cevs_route_detail_param():
+    from api.api_server import app
+
+    client = app.test_client()
+    headers = {"X-API-KEY": os.getenv("TEST_API_KEY", "")}
+    resp = client.get("/global/cevs/Acme?detail=none", headers=headers)
+    assert resp.status_code == 200 and "details" not in resp.get_json()
+    assert client.get("/global/cevs/Acme?detail=huge", headers=headers).status_code == 400
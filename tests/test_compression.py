@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+
+from api.utils import cache as cache_util
+from api.utils.compression import variant_cache
+
+
+@pytest.fixture
+def client():
+    from api.api_server import app
+
+    cache_util.clear_cache()
+    cache_util.get_or_set(lambda: [{"nama_perusahaan": f"Plant {i}", "extras": {"raw": {"n": i}}} for i in range(60)])
+    variant_cache.clear()
+    yield app.test_client()
+    cache_util.clear_cache()
+
+
+def test_gzip_negotiated_above_threshold(client):
+    plain = client.get("/permits?limit=50")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    zipped = client.get("/permits?limit=50", headers={"Accept-Encoding": "gzip;q=1.0, identity;q=0.5"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert int(zipped.headers["Content-Length"]) < len(plain.get_data())
+    assert gzip.decompress(zipped.get_data()) == plain.get_data()
+
+    refused = client.get("/permits?limit=50", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in refused.headers
+
+    small = client.get("/permits?limit=1", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+
+def test_compressed_variant_cached_per_etag(client):
+    headers = {"Accept-Encoding": "gzip"}
+    first = client.get("/permits?limit=50", headers=headers)
+    base = client.get("/permits?limit=50").headers["ETag"]
+    assert first.headers["ETag"] == base[:-1] + '-gzip"'
+    assert len(variant_cache) == 1
+
+    second = client.get("/permits?limit=50", headers=headers)
+    assert second.get_data() == first.get_data() and len(variant_cache) == 1
+
+    revalidated = client.get("/permits?limit=50", headers=dict(headers, **{"If-None-Match": first.headers["ETag"]}))
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == first.headers["ETag"]
+
+
+def test_uncached_responses_are_compressed_per_request(client):
+    resp = client.get("/permits/active", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(resp.get_data()))["data"]) == 60
+    assert len(variant_cache) == 0
+
+
+def test_variant_etag_only_revalidates_for_the_same_encoding(client):
+    zipped = client.get("/permits?limit=50", headers={"Accept-Encoding": "gzip"})
+    variant = zipped.headers["ETag"]
+
+    not_modified = client.get("/permits?limit=50", headers={"Accept-Encoding": "gzip", "If-None-Match": variant})
+    assert not_modified.status_code == 304
+    assert "Accept-Encoding" in not_modified.headers["Vary"]
+
+    # A client that no longer accepts gzip must get the identity body, not a 304 for the gzip variant
+    identity = client.get("/permits?limit=50", headers={"Accept-Encoding": "identity", "If-None-Match": variant})
+    assert identity.status_code == 200
+    assert "Content-Encoding" not in identity.headers
+    assert identity.headers["ETag"] == variant[:-len('-gzip"')] + '"'
+
+    base = client.get("/permits?limit=50", headers={"If-None-Match": identity.headers["ETag"]})
+    assert base.status_code == 304 and "Accept-Encoding" in base.headers["Vary"]
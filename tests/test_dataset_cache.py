@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from api.utils.dataset_cache import DatasetCache, file_version
+
+
+def test_hit_requires_same_version():
+    cache = DatasetCache(max_entries=4, ttl=60)
+    calls = []
+    loader = lambda: calls.append(1) or len(calls)
+
+    assert cache.get_or_load("ds", loader, version="v1") == 1
+    assert cache.get_or_load("ds", loader, version="v1") == 1
+    assert cache.get_or_load("ds", loader, version="v2") == 2
+    assert len(calls) == 2
+
+
+def test_ttl_expiry_and_lru_eviction(monkeypatch):
+    cache = DatasetCache(max_entries=2, ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr("api.utils.dataset_cache.time.time", lambda: now[0])
+
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"  # touch a so b is least recently used
+    cache.set("c", "C")
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    now[0] += 11
+    assert cache.get("a") is None
+
+
+def test_loader_errors_are_not_cached():
+    cache = DatasetCache()
+
+    def boom():
+        raise RuntimeError("network down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("ds", boom)
+    assert cache.get_or_load("ds", lambda: "ok") == "ok"
+
+
+def test_concurrent_loads_share_one_call_and_release_key_locks():
+    cache = DatasetCache(max_entries=2)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("ds", slow_loader))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == ["value"] * 4 and calls == [1]
+
+    # Many distinct keys (most evicted from the LRU) must not leave locks behind
+    for i in range(100):
+        cache.get_or_load(("q", i), lambda: i)
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("bad", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    assert cache._key_locks == {}
+
+
+def test_file_version_tracks_changes(tmp_path):
+    p = tmp_path / "data.csv"
+    assert file_version(str(p)) is None
+    p.write_text("a")
+    v1 = file_version(str(p))
+    p.write_text("abc")
+    assert file_version(str(p)) != v1
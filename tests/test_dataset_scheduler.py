@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+
+from api.services.dataset_scheduler import DatasetScheduler
+
+
+def test_warm_up_loads_sources_in_parallel_and_records_status():
+    sched = DatasetScheduler(max_workers=3)
+    barrier = threading.Barrier(2, timeout=5)
+
+    def parallel_loader(version):
+        def load():
+            barrier.wait()  # deadlocks unless both loaders run concurrently
+            return version
+        return load
+
+    sched.register("a", parallel_loader("v-a"), interval=60, required=True)
+    sched.register("b", parallel_loader("v-b"), interval=60)
+    assert sched.pending_required() == ["a"]
+
+    sched.warm_up()
+
+    status = sched.status()
+    assert status["a"]["state"] == "ready" and status["a"]["version"] == "v-a"
+    assert status["b"]["version"] == "v-b"
+    assert status["a"]["last_success"] is not None
+    assert status["a"]["load_seconds"] >= 0
+    assert sched.is_ready()
+
+
+def test_refresh_failure_keeps_last_good_version():
+    sched = DatasetScheduler()
+    outcomes = iter(["v1", RuntimeError("source down")])
+
+    def flaky():
+        result = next(outcomes)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    sched.register("flaky", flaky, interval=60, required=True)
+    assert sched.refresh("flaky") is True
+    assert sched.refresh("flaky") is False
+
+    status = sched.status()["flaky"]
+    assert status["state"] == "ready"
+    assert status["version"] == "v1"
+    assert "source down" in status["last_error"]
+    assert sched.is_ready()
+
+
+def test_health_reports_datasets_and_ready_when_prefetch_disabled():
+    from api.api_server import app
+
+    client = app.test_client()
+    health = client.get("/health").get_json()
+    assert "datasets" in health
+    assert {"iso", "edgar", "policy", "eea_renewables", "eea_pollution"} <= set(health["datasets"]["sources"])
+    assert client.get("/ready").status_code == 200
+
+
+def test_readiness_requires_success_until_timeout(monkeypatch):
+    sched = DatasetScheduler(ready_timeout=30)
+    now = [1000.0]
+    monkeypatch.setattr("api.services.dataset_scheduler.time.time", lambda: now[0])
+
+    def down():
+        raise RuntimeError("workbook missing")
+
+    sched.register("edgar", down, interval=60, required=True)
+    sched.register("eea", down, interval=60)
+    sched.started_at = now[0]
+    sched.warm_up()
+
+    # A failed attempt does not count as warm
+    readiness = sched.readiness()
+    assert readiness["status"] == "warming"
+    assert readiness["pending"] == ["edgar"]
+    assert "workbook missing" in readiness["errors"]["edgar"]
+    assert not sched.is_ready()
+
+    now[0] += 31
+    assert sched.readiness()["status"] == "degraded"
+    assert sched.is_ready()
+
+
+def test_ready_endpoint_returns_503_while_warming(monkeypatch):
+    from api.api_server import app
+
+    sched = DatasetScheduler(ready_timeout=0)
+    sched.register("iso", lambda: None, interval=60, required=True)
+    sched.started_at = 0.0
+    sched._thread = object()  # mark as started without running the refresh loop
+    monkeypatch.setattr("api.routes.health.scheduler", sched)
+
+    client = app.test_client()
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    assert resp.get_json()["pending"] == ["iso"]
+
+    sched.refresh("iso")
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    assert resp.get_json()["status"] == "ready"
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+from openpyxl import Workbook
+
+from api.clients.edgar_client import EDGARClient
+from api.utils.trend import empty_trend
+
+
+@pytest.fixture
+def edgar_xlsx(tmp_path):
+    """Small EDGAR-shaped workbook: two sectors per pollutant, years out of order."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "EDGAR_emiss_on_UCDB_2024"
+    ws.append([
+        "ID_UC_G0", "UC_name", "UC_country",
+        "EMI_PM2.5_ENE_2020", "EMI_PM2.5_IND_2020",
+        "EMI_PM2.5_ENE_2000", "EMI_PM2.5_IND_2000",
+        "EMI_PM2.5_ENE_2015", "EMI_NOx_ENE_2000", "EMI_NOx_ENE_2020",
+    ])
+    ws.append([1, "Berlin", "Germany", 10, 5, 4, 1, 7, 20, 10])
+    ws.append([2, "Hamburg", "Germany", 2, None, 1, None, 1, 5, 5])
+    ws.append([3, "Lyon", "France", 3, 3, 9, 0, 6, 1, 2])
+    path = tmp_path / "edgar.xlsx"
+    wb.save(path)
+    EDGARClient._GLOBAL_CACHE.clear()
+    yield str(path)
+    EDGARClient._GLOBAL_CACHE.clear()
+
+
+def test_country_series_sorted_and_summed(edgar_xlsx):
+    client = EDGARClient(xlsx_path=edgar_xlsx)
+    series = client.get_country_series("Germany", "PM2.5")
+    assert [r["year"] for r in series] == [2000, 2015, 2020]
+    assert [r["value"] for r in series] == [6.0, 8.0, 17.0]
+
+
+def test_series_batch_matches_single_lookups(edgar_xlsx):
+    client = EDGARClient(xlsx_path=edgar_xlsx)
+    batch = client.get_series_batch(["Germany", "FR", "Atlantis"], ["PM2.5", "NOx"], window=3)
+
+    assert set(batch) == {"Germany", "FR", "Atlantis"}
+    de_pm = batch["Germany"]["PM2.5"]
+    assert de_pm["years"] == [2000, 2015, 2020]
+    assert de_pm["values"] == [r["value"] for r in client.get_country_series("Germany", "PM2.5")]
+    assert de_pm["trend"] == client.compute_country_trend("Germany", pollutant="PM2.5", window=3)
+    assert batch["FR"]["NOx"]["values"] == [1.0, 2.0]
+    assert batch["Atlantis"]["PM2.5"] == {
+        "years": [],
+        "values": [],
+        "trend": dict(empty_trend(), pollutant="PM2.5"),
+    }
+
+
+def test_series_batch_without_window_has_no_trend(edgar_xlsx):
+    client = EDGARClient(xlsx_path=edgar_xlsx)
+    batch = client.get_series_batch(["Germany"], ["NOx"])
+    assert "trend" not in batch["Germany"]["NOx"]
+
+
+def test_non_default_window_trend_computed_on_demand(edgar_xlsx):
+    client = EDGARClient(xlsx_path=edgar_xlsx)
+    tr = client.compute_country_trend("Germany", pollutant="PM2.5", window=2)
+    assert tr["years"] == [2015, 2020]
+    assert tr["delta"] == 9.0
+    assert tr["pollutant"] == "PM2.5"
+
+
+def test_warm_aggregates_once_and_returns_workbook_version(edgar_xlsx):
+    client = EDGARClient(xlsx_path=edgar_xlsx)
+    version = client.warm()
+    assert version == client.version() and version.startswith(edgar_xlsx)
+    # A fresh client reuses the shared aggregation for the same workbook version
+    other = EDGARClient(xlsx_path=edgar_xlsx)
+    other._load_sheet = lambda: pytest.fail("workbook re-read after warm()")
+    assert other.warm() == version
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import io
+import os
+
+import pandas as pd
+import pytest
+import requests
+
+from api.clients.eea_client import EEAClient
+from api.utils.dataset_cache import dataset_cache
+
+RENEWABLES_ID = "share-of-energy-from-renewable-sources"
+
+
+def _parquet_bytes(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    return buf.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None, content=b"", headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self._content = content
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self._content), chunk_size):
+            yield self._content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Serves one Parquet file with an ETag and honours If-None-Match."""
+
+    def __init__(self, body: bytes, etag: str = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.calls = []
+        self.headers = {}
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.calls.append((url, dict(headers or {})))
+        if url.endswith("/files"):
+            return FakeResponse(payload=[{"name": "data.parquet", "links": {"download": "https://eea.test/data.parquet"}}])
+        if (headers or {}).get("If-None-Match") == self.etag:
+            return FakeResponse(status_code=304)
+        return FakeResponse(content=self.body, headers={"ETag": self.etag, "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+
+@pytest.fixture
+def renewables_df():
+    return pd.DataFrame({
+        "Country": ["Sweden", "Austria", "EU-27"],
+        "Renewable energy share 2020": [60.1, 36.5, 22.0],
+        "Renewable energy share 2021 (proxy)": [62.6, 36.4, 21.8],
+        "2020 target": [49.0, 34.0, 20.0],
+    })
+
+
+@pytest.fixture(autouse=True)
+def _clear_dataset_cache():
+    dataset_cache.invalidate()
+    yield
+    dataset_cache.invalidate()
+
+
+def test_download_is_stored_locally_and_revalidated(tmp_path, renewables_df):
+    session = FakeSession(_parquet_bytes(renewables_df))
+    client = EEAClient(data_dir=str(tmp_path))
+    client.session = session
+
+    rows = client.get_countries_renewables()
+    assert [r["country"] for r in rows] == ["Sweden", "Austria", "EU-27"]
+    parquet_path, meta_path = client._local_paths(RENEWABLES_ID)
+    assert os.path.dirname(parquet_path).endswith("renewable-energy")
+    assert os.path.exists(parquet_path) and os.path.exists(meta_path)
+    assert client._load_meta(meta_path)["etag"] == '"v1"'
+
+    # Expire the sync entry: the next load must be conditional and reuse the local copy
+    dataset_cache.invalidate(client._sync_key(RENEWABLES_ID))
+    session.calls.clear()
+    rows_again = client.get_countries_renewables()
+    assert rows_again == rows
+    download_calls = [h for url, h in session.calls if url.endswith(".parquet")]
+    assert download_calls == [{"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}]
+
+
+def test_network_failure_falls_back_to_local_copy(tmp_path, renewables_df):
+    client = EEAClient(data_dir=str(tmp_path))
+    client.session = FakeSession(_parquet_bytes(renewables_df))
+    assert client.get_countries_renewables()
+
+    class DownSession(FakeSession):
+        def get(self, url, headers=None, timeout=None, stream=False):
+            raise requests.exceptions.ConnectionError("offline")
+
+    dataset_cache.invalidate()
+    offline = EEAClient(data_dir=str(tmp_path))
+    offline.session = DownSession(b"")
+    assert [r["country"] for r in offline.get_countries_renewables()] == ["Sweden", "Austria", "EU-27"]
+
+
+def test_clients_with_separate_data_dirs_do_not_share_cached_state(tmp_path, renewables_df):
+    other_df = renewables_df.assign(Country=["Norway", "Finland", "EU-27"])
+    first = EEAClient(data_dir=str(tmp_path / "a"))
+    first.session = FakeSession(_parquet_bytes(renewables_df))
+    second = EEAClient(data_dir=str(tmp_path / "b"))
+    second.session = FakeSession(_parquet_bytes(other_df))
+
+    assert [r["country"] for r in first.get_countries_renewables()][:2] == ["Sweden", "Austria"]
+    assert [r["country"] for r in second.get_countries_renewables()][:2] == ["Norway", "Finland"]
+    # Each client synced (and wrote the sidecar for) its own directory
+    assert second.session.calls and os.path.exists(second._local_paths(RENEWABLES_ID)[1])
+    assert first.warm(RENEWABLES_ID) == second.warm(RENEWABLES_ID) == '"v1"'
+    assert [r["country"] for r in first.get_countries_renewables()][:2] == ["Sweden", "Austria"]
+
+
+def test_interrupted_download_keeps_local_copy_and_leaves_no_temp_files(tmp_path, renewables_df):
+    client = EEAClient(data_dir=str(tmp_path))
+    client.session = FakeSession(_parquet_bytes(renewables_df))
+    assert client.get_countries_renewables()
+    parquet_path, _ = client._local_paths(RENEWABLES_ID)
+    before = open(parquet_path, "rb").read()
+
+    class BrokenStream(FakeResponse):
+        def iter_content(self, chunk_size=1):
+            yield b"PAR1"
+            raise requests.exceptions.ChunkedEncodingError("connection reset")
+
+    class FlakySession(FakeSession):
+        def get(self, url, headers=None, timeout=None, stream=False):
+            if url.endswith(".parquet"):
+                return BrokenStream(headers={"ETag": '"v2"'})
+            return super().get(url, headers=headers, timeout=timeout, stream=stream)
+
+    dataset_cache.invalidate()
+    flaky = EEAClient(data_dir=str(tmp_path))
+    flaky.session = FlakySession(b"", etag='"v2"')
+    assert [r["country"] for r in flaky.get_countries_renewables()] == ["Sweden", "Austria", "EU-27"]
+    assert open(parquet_path, "rb").read() == before
+    assert sorted(os.listdir(os.path.dirname(parquet_path))) == [
+        f"{RENEWABLES_ID}.meta.json",
+        f"{RENEWABLES_ID}.parquet",
+    ]
+
+
+def test_read_parquet_projects_columns(tmp_path, renewables_df):
+    path = tmp_path / "renewables.parquet"
+    df = renewables_df.assign(**{"Unused wide column": ["x" * 100] * len(renewables_df)})
+    path.write_bytes(_parquet_bytes(df))
+
+    projected = EEAClient._read_parquet(str(path), ["country", "2020_target"])
+    assert list(projected.columns) == ["country", "2020_target"]
+    assert projected.iloc[0].to_dict() == {"country": "Sweden", "2020_target": 49.0}
+
+    full = EEAClient._read_parquet(str(path))
+    assert "unused_wide_column" in full.columns
+
+
+def test_pollution_filters_and_limit_are_vectorized(tmp_path):
+    df = pd.DataFrame({
+        "Year": [2019, 2018, 2019, 2020, None],
+        "Country": ["Sweden", "Sweden", "Germany", "SE", "Sweden"],
+        "Total N": [3.0, 2.0, 9.0, float("nan"), 1.0],
+        "Total P": ["0.5", "0.4", "x", "0.6", "0.1"],
+    })
+    client = EEAClient(data_dir=str(tmp_path))
+    client.session = FakeSession(_parquet_bytes(df))
+
+    rows = client.get_indicator(indicator="pollution", country="Sweden", limit=2)
+    assert [r["year"] for r in rows] == [2018, 2019]
+    assert rows[0]["total_p"] == 0.4
+    assert "_country_norm" not in rows[0]
+
+    rows = client.get_indicator(indicator="pollution", year=2020, limit=10)
+    assert rows == [{"year": 2020, "cd_hg_ni_pb": None, "toc": None, "total_n": None, "total_p": 0.6, "gva": None}]
+    assert client.get_indicator(indicator="pollution", country="Germany", limit=10)[0]["total_p"] is None
+
+
+def test_renewables_index_resolves_country_and_eu_row(tmp_path, renewables_df):
+    client = EEAClient(data_dir=str(tmp_path))
+    client.session = FakeSession(_parquet_bytes(renewables_df))
+
+    assert client.get_country_renewables("SE")["renewable_energy_share_2021_proxy"] == 62.6
+    assert client.get_country_renewables("Sweden") == client.get_country_renewables("se")
+    assert client.get_country_renewables("Xyzzy") is None
+    assert client.get_eu_renewables()["country"] == "EU-27"
+
+    # Lookups are served from the index built once per dataset version
+    data = client._renewables()
+    assert client._renewables() is data
+    assert set(data.by_country) >= {"sweden", "austria"}
+
+
+def test_indicator_frame_matches_record_rows(tmp_path, renewables_df):
+    client = EEAClient(data_dir=str(tmp_path))
+    client.session = FakeSession(_parquet_bytes(renewables_df))
+    for kwargs in ({"indicator": "renewable"}, {"indicator": "renewable", "country": "SE"}, {"indicator": "res", "limit": 1}):
+        frame = client.get_indicator_frame(**kwargs)
+        expected = client.get_indicator(**kwargs)
+        assert frame.astype(object).where(frame.notna(), None).to_dict(orient="records") == expected
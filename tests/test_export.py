@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+
+import pyarrow.parquet as pq
+import pytest
+
+from api.utils import cache as cache_util
+
+HEADERS = {"X-API-KEY": os.getenv("TEST_API_KEY", "")}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from api.api_server import app
+
+    monkeypatch.setattr("api.utils.export.EXPORT_BATCH_SIZE", 4)
+    cache_util.clear_cache()
+    cache_util.get_or_set(lambda: [
+        {"nama_perusahaan": f"Plant {i}", "tanggal_berlaku": str(2020 + i % 2), "extras": {"state": "TX" if i % 3 else "CA", "raw": {"n": i}}}
+        for i in range(10)
+    ])
+    yield app.test_client()
+    cache_util.clear_cache()
+
+
+def test_ndjson_export_streams_every_record_in_batches(client):
+    resp = client.get("/permits/export", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200 and resp.mimetype == "application/x-ndjson"
+    assert resp.is_streamed and "Content-Encoding" not in resp.headers
+    assert "permits.ndjson" in resp.headers["Content-Disposition"]
+    chunks = list(resp.response)
+    assert len(chunks) == 3  # 10 records in batches of 4
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [r["nama_perusahaan"] for r in rows] == [f"Plant {i}" for i in range(10)]
+    assert rows[0]["extras"]["raw"] == {"n": 0}
+
+
+def test_csv_export_with_projection(client):
+    resp = client.get("/global/emissions/export?format=csv&view=compact&fields=nama_perusahaan,extras", headers=HEADERS)
+    rows = list(csv.reader(io.StringIO(resp.get_data(as_text=True))))
+    assert rows[0] == ["nama_perusahaan", "extras"]
+    assert len(rows) == 11
+    assert json.loads(rows[1][1]) == {"state": "CA"}
+
+
+def test_parquet_export_with_filters(client):
+    resp = client.get("/global/emissions/export?format=parquet&state=TX&year=2021", headers=HEADERS)
+    assert resp.mimetype == "application/vnd.apache.parquet"
+    table = pq.read_table(io.BytesIO(resp.get_data()))
+    assert table.column("nama_perusahaan").to_pylist() == ["Plant 1", "Plant 5", "Plant 7"]
+    assert table.num_rows == 3 and table.column_names[0] == "nama_perusahaan"
+
+
+def test_export_rejects_unknown_format(client):
+    assert client.get("/permits/export?format=xml").status_code == 400
+    resp = client.get("/global/iso/export?format=ndjson", headers=HEADERS)
+    assert resp.status_code == 200
+    assert all("nama_perusahaan" in json.loads(line) for line in resp.get_data().splitlines())
@@ -165,3 +165,22 @@ class TestGlobalRoutes:
         trend = data["trend"]
         assert "pollutant" in trend
         assert trend["pollutant"] == "NOx"
+
+    def test_global_edgar_batch_response(self, client, auth_headers):
+        """Test /global/edgar/batch returns series per country and pollutant."""
+        resp = client.get("/global/edgar/batch?countries=Germany,France&pollutants=PM2.5,NOx", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["status"] == "success"
+        assert set(data["series"]) == {"Germany", "France"}
+        for per_pollutant in data["series"].values():
+            assert set(per_pollutant) == {"PM2.5", "NOx"}
+            for entry in per_pollutant.values():
+                assert len(entry["years"]) == len(entry["values"])
+                assert "trend" in entry
+
+    def test_global_edgar_batch_missing_countries(self, client, auth_headers):
+        """Test /global/edgar/batch returns 400 when countries parameter is missing."""
+        resp = client.get("/global/edgar/batch?pollutants=NOx", headers=auth_headers)
+        assert resp.status_code == 400
+        assert "countries is required" in resp.get_json()["message"]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from api.utils import cache as cache_util
+from tests.test_edgar_client import edgar_xlsx  # noqa: F401 (fixture)
+
+
+@pytest.fixture
+def client(edgar_xlsx, monkeypatch):
+    from api.api_server import app
+
+    monkeypatch.setenv("EDGAR_XLSX_PATH", edgar_xlsx)
+    cache_util.clear_cache()
+    cache_util.get_or_set(lambda: [{"nama_perusahaan": "Plant A", "tanggal_berlaku": "2022", "extras": {"raw": {"state": "TX"}}}])
+    yield app.test_client()
+    cache_util.clear_cache()
+
+
+@pytest.mark.parametrize("path", ["/permits?limit=10", "/permits/stats", "/global/emissions/stats", "/global/edgar?country=Germany", "/global/iso?limit=5"])
+def test_versioned_endpoints_answer_304_for_matching_etag(client, path):
+    headers = {"X-API-KEY": os.getenv("TEST_API_KEY", "")}
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert not first.headers["ETag"].startswith("W/")
+    assert "max-age" in first.headers["Cache-Control"]
+
+    again = client.get(path, headers=headers)
+    assert again.headers["ETag"] == etag and again.get_data() == first.get_data()
+
+    cached = client.get(path, headers=dict(headers, **{"If-None-Match": etag}))
+    assert cached.status_code == 304 and cached.get_data() == b""
+    assert cached.headers["ETag"] == etag
+
+
+def test_iso_pages_are_serialized_once_per_store_build(client, monkeypatch):
+    from api.routes import global_data
+    from api.utils.dataset_cache import dataset_cache
+    from api.utils.json_provider import page_cache
+
+    page_cache.clear()
+    calls = []
+    real = global_data._iso_payload
+    monkeypatch.setattr(global_data, "_iso_payload", lambda *a: calls.append(1) or real(*a))
+    headers = {"X-API-KEY": os.getenv("TEST_API_KEY", "")}
+
+    first = client.get("/global/iso?limit=5&view=compact", headers=headers)
+    again = client.get("/global/iso?limit=5&view=compact", headers=headers)
+    assert again.get_data() == first.get_data() and len(calls) == 1
+
+    # A rebuilt store is a new version: new ETag, body rendered again
+    dataset_cache.invalidate(("iso:store",))
+    rebuilt = client.get("/global/iso?limit=5&view=compact", headers=headers)
+    assert rebuilt.headers["ETag"] != first.headers["ETag"] and len(calls) == 2
+    page_cache.clear()
+
+
+def test_edgar_without_workbook_is_not_tagged(client, monkeypatch):
+    monkeypatch.setenv("EDGAR_XLSX_PATH", "/nonexistent/edgar.xlsx")
+    resp = client.get("/global/edgar?country=Germany", headers={"X-API-KEY": os.getenv("TEST_API_KEY", "")})
+    assert resp.status_code == 200 and "ETag" not in resp.headers
+
+
+def test_etag_changes_with_params_and_dataset_version(client):
+    etag = client.get("/permits?limit=10").headers["ETag"]
+    assert client.get("/permits?limit=20").headers["ETag"] != etag
+
+    cache_util.clear_cache()
+    cache_util.get_or_set(lambda: [])
+    refreshed = client.get("/permits?limit=10", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200 and refreshed.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("path,headers", [
+    ("/global/emissions/stats", {"X-API-KEY": os.getenv("TEST_API_KEY", "")}),
+    (f"/global/emissions/stats?api_key={os.getenv('TEST_API_KEY', '')}", {}),
+    ("/global/edgar?country=Germany", {"Authorization": f"Bearer {os.getenv('TEST_API_KEY', '')}"}),
+])
+def test_authenticated_responses_are_private(client, path, headers):
+    resp = client.get(path, headers=headers)
+    assert resp.status_code == 200
+    assert resp.cache_control.private and not resp.cache_control.public
+    assert {"Authorization", "X-API-Key"} <= {v.strip() for v in resp.headers["Vary"].split(",")}
+
+    cached = client.get(path, headers=dict(headers, **{"If-None-Match": resp.headers["ETag"]}))
+    assert cached.status_code == 304 and not cached.cache_control.public
+
+
+def test_open_permit_routes_stay_public(client):
+    assert client.get("/permits/stats").cache_control.public
+
+
+def test_retrieved_at_is_the_cached_batch_stamp(client):
+    cache_util.clear_cache()
+    stamp = "2024-05-01T10:00:00.123456"
+    cache_util.get_or_set(lambda: [{"nama_perusahaan": f"Plant {i}", "retrieved_at": stamp} for i in range(3)])
+    headers = {"X-API-KEY": os.getenv("TEST_API_KEY", "")}
+    for path in ("/permits?limit=2", "/permits/stats", "/permits/active", "/global/emissions/stats"):
+        body = client.get(path, headers=headers).get_json()
+        assert body["retrieved_at"] == stamp, path
+    assert {r["retrieved_at"] for r in client.get("/permits").get_json()["data"]} == {stamp}
+
+
+def test_page_and_etag_come_from_one_snapshot(client, monkeypatch):
+    from api.utils.json_provider import page_cache
+
+    page_cache.clear()
+    cache_util.clear_cache()
+    old = cache_util.get_snapshot(lambda: [{"nama_perusahaan": "Old Plant"}])
+    real_get_snapshot = cache_util.get_snapshot
+
+    def refresh_after_read(fetcher, **kw):
+        # Hand out the old snapshot, then let a refresh land before the page is built
+        monkeypatch.setattr(cache_util, "get_snapshot", real_get_snapshot)
+        monkeypatch.setattr(cache_util.time, "time", lambda: old.timestamp + 10)
+        cache_util.clear_cache()
+        cache_util.get_or_set(lambda: [{"nama_perusahaan": "New Plant"}])
+        return old
+
+    monkeypatch.setattr(cache_util, "get_snapshot", refresh_after_read)
+    stale = client.get("/permits?limit=5")
+    assert [r["nama_perusahaan"] for r in stale.get_json()["data"]] == ["Old Plant"]
+
+    fresh = client.get("/permits?limit=5")
+    assert [r["nama_perusahaan"] for r in fresh.get_json()["data"]] == ["New Plant"]
+    assert fresh.headers["ETag"] != stale.headers["ETag"]
+    page_cache.clear()
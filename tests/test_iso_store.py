@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import gzip
+import io
+from datetime import date, datetime
+
+import pytest
+import requests
+
+from api.clients.iso_client import ISOClient, ISOStore, merge_iso_records, parse_date_column
+from api.utils.dataset_cache import dataset_cache
+from api.utils.projection import compact_records
+
+RECORDS = [
+    {"company": "Green Energy Co", "country": "US", "certificate": "ISO 14001"},
+    {"company": "Eco Manufacturing GmbH", "country": "DE", "certificate": "ISO 14001"},
+    {"company": "Sustain PT", "country": "Indonesia", "certificate": "ISO 14001"},
+    {"company": "Acme Metals", "country": None, "certificate": "ISO 14001"},
+]
+
+
+def _scan_has_iso(records, company, country=None):
+    """Reference semantics: linear substring scan over the country-filtered list."""
+    store = ISOStore(records)
+    key = (company or "").strip().lower()
+    for rec in store.records_for(country):
+        name = (rec.get("nama_perusahaan") or "").strip().lower()
+        if name and key in name:
+            return True
+    return False
+
+
+@pytest.mark.parametrize("company,country", [
+    ("Green Energy Co", None),
+    ("green energy", "USA"),
+    ("  ECO MANUFACTURING ", "Germany"),
+    ("manufacturing", "US"),
+    ("acme", None),
+    ("acme", "DE"),
+    ("pt", None),
+    ("e", "Indonesia"),
+    ("", None),
+    ("Nonexistent Ltd", None),
+])
+def test_has_iso_matches_linear_scan(company, country):
+    store = ISOStore(RECORDS)
+    assert store.has_iso(company, country) == _scan_has_iso(RECORDS, company, country)
+
+
+def test_country_index_and_find():
+    store = ISOStore(RECORDS)
+    assert [r["nama_perusahaan"] for r in store.records_for("Deutschland")] == ["Eco Manufacturing GmbH"]
+    assert len(store.records_for(None, limit=2)) == 2
+    assert [r["nama_perusahaan"] for r in store.find("co")] == ["Green Energy Co", "Eco Manufacturing GmbH"]
+
+
+def test_compact_view_is_precomputed_with_the_store():
+    store = ISOStore(RECORDS)
+    assert store.compact_records == tuple(compact_records(store.records))
+    compact = store.records_for("DE", compact=True)
+    assert compact == compact_records(store.records_for("DE"))
+    assert compact[0] is store.compact_records[1]
+    assert all("raw" not in (rec.get("extras") or {}) for rec in compact)
+
+
+def test_client_store_is_built_once_per_source_version(monkeypatch, tmp_path):
+    dataset_cache.invalidate()
+    monkeypatch.delenv("ISO_CSV_URL", raising=False)
+    monkeypatch.delenv("ISO_API_BASE", raising=False)
+    monkeypatch.setenv("ISO_XLSX_PATH", str(tmp_path / "missing.xlsx"))
+    calls = []
+    monkeypatch.setattr(ISOClient, "_load_records", lambda self: calls.append(1) or list(RECORDS))
+
+    assert ISOClient().has_iso("Sustain", "Indonesia")
+    assert not ISOClient().has_iso("Sustain", "DE")
+    assert len(ISOClient().get_iso14001_certifications(limit=10)) == 4
+    assert len(calls) == 1
+    dataset_cache.invalidate()
+
+
+def test_warm_builds_store_and_reports_source_version(monkeypatch, tmp_path):
+    dataset_cache.invalidate()
+    monkeypatch.delenv("ISO_CSV_URL", raising=False)
+    monkeypatch.delenv("ISO_API_BASE", raising=False)
+    path = tmp_path / "iso.xlsx"
+    monkeypatch.setenv("ISO_XLSX_PATH", str(path))
+    calls = []
+    monkeypatch.setattr(ISOClient, "_load_records", lambda self: calls.append(1) or list(RECORDS))
+
+    assert ISOClient().warm() == str(path)
+    assert ISOClient().has_iso("Sustain", "Indonesia") and len(calls) == 1
+    path.write_bytes(b"changed")
+    version = ISOClient().warm()
+    assert version != str(path) and version == ISOClient().version()
+    assert len(calls) == 2
+    dataset_cache.invalidate()
+
+
+def test_merge_dedupes_and_fills_missing_fields():
+    csv_rows = ({"company": "Acme Metals", "certificate": "ISO 14001", "country": "DE"},)
+    excel_rows = (
+        {"company": " ACME metals", "certificate": "ISO 14001", "country": None, "valid_until": "2026-01-01"},
+        {"company": "Other Co", "certificate": "ISO 14001", "country": None},
+    )
+    merged = merge_iso_records(csv_rows, excel_rows)
+    assert [r["company"] for r in merged] == ["Acme Metals", "Other Co"]
+    assert merged[0]["country"] == "DE" and merged[0]["valid_until"] == "2026-01-01"
+    assert "valid_until" not in csv_rows[0]  # inputs untouched
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=b"", headers=None):
+        self.status_code = status_code
+        self.raw = io.BytesIO(body)
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}")
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Serves one export with an ETag and honours If-None-Match."""
+
+    def __init__(self, body: bytes, content_type: str = "text/csv", etag: str = '"v1"'):
+        self.body = body
+        self.content_type = content_type
+        self.etag = etag
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.calls.append(dict(headers or {}))
+        if (headers or {}).get("If-None-Match") == self.etag:
+            return FakeResponse(status_code=304)
+        return FakeResponse(body=self.body, headers={"Content-Type": self.content_type, "ETag": self.etag})
+
+
+CSV_BODY = b"company,country,certificate\r\nGreen Energy Co,US,ISO 14001\r\n"
+
+
+@pytest.fixture
+def remote_client(monkeypatch, tmp_path):
+    dataset_cache.invalidate()
+    monkeypatch.setenv("ISO_CSV_URL", "https://iso.test/list.csv")
+    monkeypatch.delenv("ISO_API_BASE", raising=False)
+    monkeypatch.setenv("ISO_XLSX_PATH", str(tmp_path / "missing.xlsx"))
+    client = ISOClient()
+    yield client
+    dataset_cache.invalidate()
+
+
+def test_repeated_builds_do_not_grow_cached_sources(remote_client, monkeypatch):
+    remote_client.session = FakeSession(CSV_BODY)
+    monkeypatch.setattr(ISOClient, "_read_excel", lambda self, path, sheet=None: [dict(RECORDS[1]), dict(RECORDS[0])])
+
+    for _ in range(3):
+        dataset_cache.invalidate(("iso:store",))
+        assert len(remote_client.get_iso14001_certifications(limit=100)) == 2
+    assert len(remote_client._load_from_csv_or_json(remote_client.csv_url)) == 1
+    assert isinstance(remote_client._load_from_excel(remote_client.xlsx_path), tuple)
+
+
+@pytest.mark.parametrize("body,content_type", [
+    (gzip.compress(CSV_BODY), "application/octet-stream"),
+    (b'  {"data": [{"company": "Green Energy Co", "country": "US", "certificate": "ISO 14001"}]}', "text/plain"),
+    (b'[{"company": "Green Energy Co", "country": "US", "certificate": "ISO 14001"}, 1]', "application/json"),
+])
+def test_remote_export_formats_are_sniffed(remote_client, body, content_type):
+    remote_client.session = FakeSession(body, content_type=content_type)
+    rows = remote_client._load_from_csv_or_json(remote_client.csv_url)
+    assert [(r["company"], r["country"]) for r in rows] == [("Green Energy Co", "US")]
+
+
+def test_remote_export_is_revalidated_conditionally(remote_client):
+    session = remote_client.session = FakeSession(CSV_BODY)
+    first = remote_client._load_from_csv_or_json(remote_client.csv_url)
+    store = remote_client.get_store()
+
+    dataset_cache.invalidate(("iso:remote:check", remote_client.csv_url))
+    assert remote_client._load_from_csv_or_json(remote_client.csv_url) is first
+    assert session.calls[-1] == {"If-None-Match": '"v1"'}
+    # Unchanged ETag keeps the same store version
+    assert remote_client.get_store() is store
+
+
+def test_remote_failure_is_not_retried_per_request(remote_client):
+    class DownSession:
+        calls = 0
+
+        def get(self, *args, **kwargs):
+            DownSession.calls += 1
+            raise requests.exceptions.ConnectionError("offline")
+
+    remote_client.session = DownSession()
+    assert remote_client._load_from_csv_or_json(remote_client.csv_url) == ()
+    assert remote_client._load_from_csv_or_json(remote_client.csv_url) == ()
+    assert DownSession.calls == 1
+
+
+def _strptime_reference(val):
+    """Per-cell behaviour of the original Excel loader."""
+    if val is None:
+        return None
+    if hasattr(val, "strftime"):
+        return val.strftime("%Y-%m-%d")
+    s = str(val).strip()
+    if not s:
+        return None
+    for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return s
+
+
+def test_parse_date_column_matches_per_cell_parsing():
+    values = [
+        None, "", date(2025, 1, 2), datetime(2026, 3, 4, 5, 6), "2024-1-5", "2024/02/03",
+        "13/02/2024", "02/13/2024", "03/04/2024", "2024-01-05 10:00:00", "31/12/9999",
+        "garbage", 45000, " 2024-12-01 ",
+    ]
+    assert parse_date_column(values) == [_strptime_reference(v) for v in values]
+
+
+@pytest.mark.parametrize("country,limit", [(None, None), (None, 2), ("DE", 100), ("Germany", None), ("Nowhere", 5)])
+def test_count_matches_records_for(country, limit):
+    store = ISOStore(RECORDS)
+    assert store.count(country, limit) == len(store.records_for(country, limit))
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from api.utils import cache as cache_util
+from api.utils.json_provider import FastJSONProvider, PageCache
+
+PAYLOAD = {"b": [1, 2.5, None, "ü"], "a": {"when": datetime(2024, 1, 2, 3, 4), "day": date(2024, 1, 2)}, "d": Decimal("1.5")}
+
+
+@pytest.mark.parametrize("use_orjson", [False, True])
+def test_output_matches_flask_default_provider(use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    app = Flask(__name__)
+    fast = FastJSONProvider(app, use_orjson=use_orjson)
+    default = DefaultJSONProvider(app)
+    with app.app_context():
+        body = fast.response(PAYLOAD).get_data()
+        expected = default.response(PAYLOAD).get_data()
+    assert json.loads(body) == json.loads(expected)
+    assert list(json.loads(body)) == ["a", "b", "d"]
+    assert fast.loads(b'{"x": [1]}') == {"x": [1]}
+
+
+def test_page_cache_serializes_once_per_version():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    cache = PageCache(maxsize=2)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"page": 1}
+
+    with app.app_context():
+        first = cache.get_or_render(1.0, "p1", build)
+        assert cache.get_or_render(1.0, "p1", build) is first
+        cache.get_or_render(2.0, "p1", build)
+        cache.get_or_render(2.0, "p2", build)
+    assert len(calls) == 3 and len(cache) == 2
+    assert json.loads(first) == {"page": 1}
+
+
+def test_permits_page_is_served_pre_serialized():
+    from api.api_server import app
+    from api.utils.json_provider import page_cache
+
+    cache_util.clear_cache()
+    cache_util.get_or_set(lambda: [{"nama_perusahaan": f"Plant {i}", "extras": {}} for i in range(5)])
+    try:
+        client = app.test_client()
+        first = client.get("/permits?limit=2&page=2")
+        assert first.mimetype == "application/json"
+        assert [r["nama_perusahaan"] for r in first.get_json()["data"]] == ["Plant 2", "Plant 3"]
+        cached = len(page_cache)
+        assert client.get("/permits?limit=2&page=2").get_data() == first.get_data()
+        assert len(page_cache) == cached
+    finally:
+        cache_util.clear_cache()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import pytest
+
+from api.utils import mappings
+from api.utils.iso3166 import ISO3166_COUNTRIES
+from api.utils.mappings import COUNTRY_NAME_MAPPING, normalize_country_name
+
+
+@pytest.mark.parametrize("country,expected", [
+    ("USA", "united_states"),
+    ("Czech Republic", "czech_republic"),
+    ("  deutschland ", "germany"),
+    ("czech_republic", "czech_republic"),
+    ("EL", "greece"),
+    ("Türkiye", "turkey"),
+    ("Korea, Rep.", "south_korea"),
+    ("Côte d'Ivoire", "cote_d_ivoire"),
+    (None, None),
+    ("", None),
+])
+def test_known_names(country, expected):
+    assert normalize_country_name(country) == expected
+
+
+@pytest.mark.parametrize("country,expected", [
+    # Two-letter codes inside longer names must not match
+    ("Indonesia", "indonesia"),
+    ("ID", "indonesia"),
+    ("Atlantis", "atlantis"),
+    ("EU-27", "eu_27"),
+    ("Latin America", "latin_america"),
+    ("New South Wales", "new_south_wales"),
+    # Country names on word boundaries; the longest name wins
+    ("Germany (until 1990 former territory of the FRG)", "germany"),
+    ("Equatorial Guinea", "equatorial_guinea"),
+    ("Northern Ireland", "united_kingdom"),
+    ("Taiwan, China", "taiwan"),
+    ("Papua New Guinea", "papua_new_guinea"),
+    ("Mexico City", "mexico"),
+    # Sub-national places are not the country their name contains
+    ("New Jersey", "new_jersey"),
+    ("Jersey City", "jersey_city"),
+    ("New Mexico", "new_mexico"),
+    ("New Guinea", "new_guinea"),
+])
+def test_no_partial_false_hits(country, expected):
+    assert normalize_country_name(country) == expected
+
+
+def test_legacy_canonical_keys_are_preserved():
+    for canonical, variants in COUNTRY_NAME_MAPPING.items():
+        assert normalize_country_name(canonical) == canonical
+        for variant in variants:
+            assert normalize_country_name(variant) == canonical, variant
+
+
+def test_every_iso_country_resolves_by_code_and_name_idempotently():
+    for alpha2, alpha3, *names in ISO3166_COUNTRIES:
+        canonical = normalize_country_name(alpha3.upper())
+        assert normalize_country_name(alpha2.upper()) == canonical
+        assert all(normalize_country_name(name.title()) == canonical for name in names)
+        assert normalize_country_name(canonical) == canonical
+    assert len({normalize_country_name(row[1]) for row in ISO3166_COUNTRIES}) == len(ISO3166_COUNTRIES)
+
+
+def test_results_are_memoized():
+    mappings._normalize_country_cached.cache_clear()
+    for _ in range(3):
+        normalize_country_name("Sweden")
+    info = mappings._normalize_country_cached.cache_info()
+    assert info.misses == 1 and info.hits == 2
+    assert info.maxsize == mappings.COUNTRY_CACHE_SIZE
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from api.utils import cache as cache_util
+from api.utils.projection import ProjectionError, compact_record, parse_projection, project
+
+RECORD = {
+    "nama_perusahaan": "Plant A",
+    "tanggal_berlaku": "2022",
+    "extras": {"state": "TX", "emissions": 1.5, "raw": {"registry_id": "R1", "zip": "77001"}},
+}
+
+
+def test_compact_drops_raw_without_touching_source():
+    compact = compact_record(RECORD)
+    assert compact["extras"] == {"state": "TX", "emissions": 1.5}
+    assert "raw" in RECORD["extras"]
+    assert compact_record({"nama_perusahaan": "X"}) == {"nama_perusahaan": "X"}
+
+
+def test_fields_select_top_level_and_nested_keys():
+    projection = parse_projection({"fields": "nama_perusahaan, extras.state,extras.raw.zip,missing"})
+    assert project([RECORD], projection) == [
+        {"nama_perusahaan": "Plant A", "extras": {"state": "TX", "raw": {"zip": "77001"}}}
+    ]
+
+    compact = parse_projection({"view": "compact", "fields": "extras"})
+    assert project([RECORD], compact) == [{"extras": {"state": "TX", "emissions": 1.5}}]
+
+    with pytest.raises(ProjectionError):
+        parse_projection({"view": "tiny"})
+    with pytest.raises(ProjectionError):
+        parse_projection({"fields": "extras..state"})
+
+
+@pytest.fixture
+def seeded_client():
+    from api.api_server import app
+
+    cache_util.clear_cache()
+    cache_util.get_or_set(lambda: [dict(RECORD, nama_perusahaan=f"Plant {i}") for i in range(3)])
+    yield app.test_client(), {"X-API-KEY": os.getenv("TEST_API_KEY", "")}
+    cache_util.clear_cache()
+
+
+def test_routes_serve_precomputed_compact_view(seeded_client):
+    client, headers = seeded_client
+    full = client.get("/permits?limit=2", headers=headers).get_json()
+    assert "raw" in full["data"][0]["extras"]
+
+    compact = client.get("/global/emissions?view=compact&limit=2", headers=headers).get_json()
+    assert [r["extras"] for r in compact["data"]] == [{"state": "TX", "emissions": 1.5}] * 2
+    # Built once per cache refresh; later calls do not rebuild it
+    assert cache_util.get_derived("compact", None)[0]["extras"] == compact["data"][0]["extras"]
+
+    picked = client.get("/permits/search?nama=plant&view=compact&fields=nama_perusahaan", headers=headers).get_json()
+    assert picked["data"] == [{"nama_perusahaan": f"Plant {i}"} for i in range(3)]
+
+    assert client.get("/permits?view=tiny", headers=headers).status_code == 400
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import random
+from dataclasses import asdict
+from datetime import datetime
+
+import pytest
+
+from api.utils.schema import (
+    PERMIT_FIELDS,
+    Permit,
+    ensure_eea_env_schema,
+    ensure_epa_emission_schema,
+    ensure_iso_cert_schema,
+    normalize_epa_batch,
+    normalize_many,
+)
+
+EPA_RECORD = {
+    "facility_name": "Plant A",
+    "state": "TX",
+    "county": "Harris",
+    "year": 2022,
+    "pollutant": "NOx",
+    "emissions": 1.5,
+    "unit": "t",
+    "plant_id": 7,
+    "registry_id": "R1",
+}
+
+
+def test_epa_record_matches_dataclass_layout():
+    expected = asdict(Permit(
+        nama_perusahaan="Plant A",
+        alamat="Harris, TX",
+        jenis_layanan="EPA Emission Data",
+        tanggal_berlaku="2022",
+        judul_kegiatan="NOx",
+        source="EPA Envirofacts",
+        extras={
+            "plant_id": 7,
+            "emissions": 1.5,
+            "unit": "t",
+            "state": "TX",
+            "county": "Harris",
+            "raw": {"registry_id": "R1"},
+        },
+        retrieved_at="2025-01-01T00:00:00",
+    ))
+    result = ensure_epa_emission_schema(EPA_RECORD, retrieved_at="2025-01-01T00:00:00")
+    assert result == expected
+    assert tuple(result) == PERMIT_FIELDS
+
+
+def test_iso_and_eea_records():
+    iso = ensure_iso_cert_schema({"company": "Acme", "country": "DE", "certificate": "ISO 14001", "_source_sheet": "S"})
+    assert iso["nama_perusahaan"] == "Acme" and iso["source"] == "ISO"
+    assert iso["extras"] == {"country": "DE", "raw": {"_source_sheet": "S"}}
+
+    eea = ensure_eea_env_schema({"country": "SE", "indicator": "GHG", "year": "2020", "value": "3.5", "unit": "kt"})
+    assert eea["tanggal_berlaku"] == "2020"
+    assert eea["extras"] == {"value": 3.5, "unit": "kt", "raw": {}}
+
+
+def test_normalize_many_skips_non_dicts_and_copies_raw():
+    records = [EPA_RECORD, None, "x", dict(EPA_RECORD, facility_name="Plant B")]
+    result = normalize_many(records, "epa")
+    assert [r["nama_perusahaan"] for r in result] == ["Plant A", "Plant B"]
+    result[0]["extras"]["raw"]["registry_id"] = "changed"
+    assert EPA_RECORD["registry_id"] == "R1"
+
+    with pytest.raises(ValueError):
+        normalize_many(records, "unknown")
+
+
+def test_batch_shares_one_retrieved_at_stamp():
+    result = normalize_many([EPA_RECORD] * 3, "epa", retrieved_at="2025-01-01T00:00:00")
+    assert {r["retrieved_at"] for r in result} == {"2025-01-01T00:00:00"}
+
+    stamped = normalize_many([EPA_RECORD] * 2, "epa")
+    assert stamped[0]["retrieved_at"] is stamped[1]["retrieved_at"]
+
+
+def test_dataclass_default_is_not_frozen_at_import(monkeypatch):
+    class FixedDatetime:
+        @staticmethod
+        def now():
+            return datetime(2030, 1, 1)
+
+    monkeypatch.setattr("api.utils.schema.datetime", FixedDatetime)
+    assert Permit().retrieved_at == "2030-01-01T00:00:00"
+
+
+def _per_row_reference(record):
+    """Field-by-field EPA mapping as done before plans were cached per layout."""
+    def pick(keys):
+        for k in keys:
+            if k in record and record[k] not in (None, ""):
+                return record[k]
+        return None
+
+    state = record.get("state") or record.get("state_name") or record.get("state_abbr")
+    county = record.get("county") or record.get("county_name")
+    parts = [str(x) for x in [county, state] if x]
+    return {
+        "nama_perusahaan": pick(["facility_name", "plant_name", "company_name", "nama_perusahaan", "facility"]),
+        "alamat": ", ".join(parts) if parts else None,
+        "plant_id": record.get("plant_id") or record.get("facility_id") or record.get("tri_facility_id") or record.get("registry_id"),
+        "state": state,
+        "county": county,
+    }
+
+
+def test_batch_plans_match_per_row_mapping_for_mixed_layouts():
+    rng = random.Random(5)
+    keys = ["facility_name", "plant_name", "company_name", "facility", "state", "state_name", "state_abbr",
+            "county", "county_name", "year", "plant_id", "facility_id", "registry_id", "zip"]
+    values = [None, "", 0, "X", "TX", 2020]
+    records = [{k: rng.choice(values) for k in rng.sample(keys, rng.randint(0, len(keys)))} for _ in range(2000)]
+
+    for record, row in zip(records, normalize_many(records, "epa")):
+        expected = _per_row_reference(record)
+        assert row["nama_perusahaan"] == expected["nama_perusahaan"]
+        assert row["alamat"] == expected["alamat"]
+        assert {k: row["extras"][k] for k in ("plant_id", "state", "county")} == {
+            k: expected[k] for k in ("plant_id", "state", "county")
+        }
+        assert row == ensure_epa_emission_schema(record, retrieved_at=row["retrieved_at"])
+
+
+def test_columnar_output():
+    columns = normalize_epa_batch([EPA_RECORD, dict(EPA_RECORD, facility_name="Plant B")], retrieved_at="t", columnar=True)
+    assert tuple(columns) == PERMIT_FIELDS
+    assert columns["nama_perusahaan"] == ["Plant A", "Plant B"]
+    assert columns["retrieved_at"] == ["t", "t"]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from api.utils import cache as cache_util
+from tests.test_edgar_client import edgar_xlsx  # noqa: F401 (fixture)
+
+HEADERS = {"X-API-KEY": os.getenv("TEST_API_KEY", "")}
+
+
+@pytest.fixture
+def client():
+    from api.api_server import app
+
+    return app.test_client()
+
+
+def test_edgar_arrow_stream_carries_series_and_trend(client, edgar_xlsx, monkeypatch):
+    monkeypatch.setenv("EDGAR_XLSX_PATH", edgar_xlsx)
+    resp = client.get("/global/edgar?country=Germany&format=arrow", headers=HEADERS)
+    assert resp.status_code == 200 and resp.mimetype == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(resp.get_data()).read_all()
+
+    expected = client.get("/global/edgar?country=Germany", headers=HEADERS).get_json()
+    assert table.to_pylist() == expected["series"]
+    assert json.loads(table.schema.metadata[b"trend"]) == expected["trend"]
+    assert resp.headers["ETag"] != client.get("/global/edgar?country=Germany&format=parquet", headers=HEADERS).headers["ETag"]
+
+
+def test_eea_parquet_comes_from_the_indicator_frame(client, monkeypatch):
+    frame = pd.DataFrame({"year": [2019, 2020], "total_n": [1.5, None]})
+    monkeypatch.setattr("api.routes.global_data.EEAClient.get_indicator_frame", lambda self, **kw: frame)
+    resp = client.get("/global/eea?indicator=pollution&format=parquet", headers=HEADERS)
+    assert resp.mimetype == "application/vnd.apache.parquet"
+    assert pq.read_table(io.BytesIO(resp.get_data())).to_pandas().equals(frame)
+
+
+def test_emissions_page_as_parquet_and_unknown_format(client):
+    cache_util.clear_cache()
+    cache_util.get_or_set(lambda: [{"nama_perusahaan": f"Plant {i}", "extras": {"state": "TX"}} for i in range(5)])
+    try:
+        resp = client.get("/global/emissions?limit=2&page=2&format=parquet&fields=nama_perusahaan", headers=HEADERS)
+        table = pq.read_table(io.BytesIO(resp.get_data()))
+        assert table.to_pylist() == [{"nama_perusahaan": "Plant 2"}, {"nama_perusahaan": "Plant 3"}]
+        assert json.loads(table.schema.metadata[b"pagination"])["total_records"] == 5
+
+        assert client.get("/global/emissions?format=xml", headers=HEADERS).status_code == 400
+    finally:
+        cache_util.clear_cache()
+
+
+def test_binary_formats_revalidate_with_etag(client, edgar_xlsx, monkeypatch):
+    monkeypatch.setenv("EDGAR_XLSX_PATH", edgar_xlsx)
+    cache_util.clear_cache()
+    cache_util.get_or_set(lambda: [{"nama_perusahaan": f"Plant {i}"} for i in range(5)])
+    try:
+        for path in ("/global/edgar?country=Germany&format=parquet", "/global/emissions?limit=2&format=parquet"):
+            resp = client.get(path, headers=HEADERS)
+            assert resp.status_code == 200 and resp.headers.get("ETag"), path
+            again = client.get(path, headers=dict(HEADERS, **{"If-None-Match": resp.headers["ETag"]}))
+            assert again.status_code == 304 and again.get_data() == b"", path
+    finally:
+        cache_util.clear_cache()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import math
+
+from api.utils.trend import compute_trend, compute_trends, empty_trend
+
+
+def test_linear_series_has_exact_slope_and_full_confidence():
+    tr = compute_trend([2018, 2019, 2020, 2021], [10.0, 12.0, 14.0, 16.0], window=3)
+    assert tr["years"] == [2019, 2020, 2021]
+    assert math.isclose(tr["slope"], 2.0)
+    assert math.isclose(tr["delta"], 4.0)
+    assert math.isclose(tr["pct_change"], 4.0 / 12.0 * 100.0)
+    assert math.isclose(tr["cagr"], (16.0 / 12.0) ** 0.5 - 1.0)
+    assert math.isclose(tr["r2"], 1.0)
+    assert tr["increase"] is True
+
+
+def test_batch_matches_single_series_and_handles_short_inputs():
+    series = [
+        ([2000, 2010, 2020], [5.0, 3.0, 4.0]),
+        ([2020], [1.0]),
+        ([], []),
+        ([2000, 2005, 2010, 2015], [0.0, 1.0, float("nan"), 3.0]),
+    ]
+    batch = compute_trends(series, window=0)
+    assert batch[0] == compute_trend(*series[0], window=0)
+    assert batch[1] == empty_trend()
+    assert batch[2] == empty_trend()
+    # NaN values are dropped; zero start value has no percent change or CAGR
+    assert batch[3]["years"] == [2000, 2005, 2015]
+    assert batch[3]["pct_change"] is None
+    assert batch[3]["cagr"] is None
+    assert batch[0]["increase"] is False and batch[0]["delta"] == -1.0
+
+
+def test_flat_series_is_not_increasing():
+    tr = compute_trend([2019, 2020, 2021], [7.0, 7.0, 7.0])
+    assert tr["slope"] == 0.0
+    assert tr["increase"] is False
+    assert tr["r2"] == 1.0
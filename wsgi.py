@@ -10,6 +10,10 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
 from api.api_server import app
+from api.services.dataset_scheduler import start_dataset_scheduler
+
+# Warm reference datasets in the background (per worker process)
+start_dataset_scheduler()
 
 # WSGI application
 application = app